@@ -0,0 +1,100 @@
+"""
+응답 문자셋 판별 벤치마크
+
+bench/fixtures/detail/*.html (+ 대체 서버가 만드는 계약 목록 페이지)를
+1) response.apparent_encoding 방식(본문 전체 문자셋 탐지 후 디코딩)
+2) common/encoding.py EncodingResolver - 처음 보는 엔드포인트(<meta> 확인)
+3) EncodingResolver - 같은 엔드포인트 반복(지난번 문자셋 재사용)
+으로 디코딩해 결과 문자열이 모두 같은지 확인하고 페이지당 시간(ms)을 출력한다.
+결과가 하나라도 다르면 종료 코드 1로 끝난다.
+
+사용법: python bench/bench_encoding.py [--rounds 3]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from requests.compat import chardet  # noqa: E402
+
+from common.encoding import EncodingResolver, normalize_encoding  # noqa: E402
+from stub_server import StubConfig, StubData, StubState  # noqa: E402
+
+DETAIL_DIR = os.path.join(BENCH_DIR, "fixtures", "detail")
+LIST_PAGES = 5
+
+
+def load_pages():
+    """[(엔드포인트, 파일명, 본문 bytes)]"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(DETAIL_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append(("detail", os.path.basename(path), f.read()))
+    state = StubState(StubConfig(), StubData())
+    for page_no in range(1, LIST_PAGES + 1):
+        pages.append(("list", f"list_20260105_{page_no}", state.list_page("20260105", page_no)))
+    return pages
+
+
+def decode_apparent(content):
+    """requests의 response.apparent_encoding + response.text와 같은 처리"""
+    encoding = chardet.detect(content)['encoding']
+    return content.decode(normalize_encoding(encoding) or 'utf-8', errors='replace')
+
+
+def measure(pages, decode, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for endpoint, _, content in pages:
+            decode(endpoint, content)
+    elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (len(pages) * rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 문자셋 판별 벤치마크")
+    parser.add_argument("--rounds", type=int, default=3, help="페이지 전체를 반복할 횟수")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    if not pages:
+        print(f"fixture가 없습니다: {DETAIL_DIR} (python bench/make_fixtures.py 먼저 실행)")
+        sys.exit(1)
+
+    # 대체 서버처럼 Content-Type에 charset이 없는 경우
+    content_type = "text/html"
+    mismatches = 0
+    resolver = EncodingResolver()
+    for endpoint, name, content in pages:
+        expected = decode_apparent(content)
+        got, encoding = resolver.decode(content, endpoint, content_type)
+        if got != expected:
+            mismatches += 1
+            print(f"[불일치] {name}: {encoding}")
+    if mismatches:
+        sys.exit(1)
+    print(f"결과 일치 확인: {len(pages)}개 페이지 (판별 방법: {dict(resolver.stats)})")
+
+    def cold(endpoint, content):
+        # 매번 새 resolver: 지난번 문자셋 없이 <meta>로 판별
+        return EncodingResolver().decode(content, endpoint, content_type)
+
+    warm_resolver = EncodingResolver()
+    rates = [
+        ("apparent_encoding", measure(pages, lambda endpoint, content: decode_apparent(content), args.rounds)),
+        ("resolver (meta)", measure(pages, cold, args.rounds)),
+        ("resolver (cached)", measure(pages, lambda endpoint, content: warm_resolver.decode(content, endpoint, content_type),
+                                      args.rounds)),
+    ]
+    baseline = rates[0][1]
+    print(f"{'방법':<20} {'ms/page':>9} {'vs apparent':>12}")
+    for name, ms in rates:
+        print(f"{name:<20} {ms:>9.3f} {baseline / ms:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+상세 페이지 파서 백엔드 벤치마크
+
+bench/fixtures/detail/*.html 을 모든 백엔드(plan_goods/parsers.py)로 파싱해
+1) 결과 dict가 기준 구현(bs4)과 완전히 같은지 확인하고 (빈 문서 / XML 선언 등 EDGE_PAGES 포함)
+2) 백엔드별 초당 처리 페이지 수(pages/sec)를 출력한다.
+결과가 하나라도 다르면 종료 코드 1로 끝난다.
+
+사용법: python bench/bench_parsers.py [--rounds 5] [--backend lxml ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "plan_goods"))
+
+from bs4 import XMLParsedAsHTMLWarning  # noqa: E402
+from parsers import PARSERS  # noqa: E402
+
+# XML 선언 문서는 일부러 넣은 것이므로 bs4 경고는 숨긴다.
+warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+
+DETAIL_DIR = os.path.join(BENCH_DIR, "fixtures", "detail")
+REFERENCE = 'bs4'
+
+# 실제 응답에서 나올 수 있는 특이한 문서 (결과 비교에만 쓰고 속도 측정에서는 뺀다)
+SAMPLE_BODY = ('<html><body><td><img src="/S2BNCustomer/S2B/scrweb/images/remu/icon_navi_view.gif">문구 &gt; 필기구</td>'
+               '<font class="f12_b_black">볼펜 세트</font><font class="f12_b_black">123456</font>'
+               '<table><tr><td class="detail_img" height="276"><img src="/upload/a.jpg"></td></tr></table>'
+               '</body></html>')
+EDGE_PAGES = [
+    ("(빈 문서)", ""),
+    ("(공백 문서)", " \r\n\t "),
+    ("(주석만)", "<!-- 정보 없음 -->"),
+    ("(XML 선언 + 빈 본문)", '<?xml version="1.0" encoding="euc-kr"?>\n'),
+    ("(XML 선언 + 본문)", '<?xml version="1.0" encoding="euc-kr"?>\n' + SAMPLE_BODY),
+]
+
+
+def load_pages():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(DETAIL_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((os.path.basename(path), f.read().decode("euc-kr")))
+    return pages
+
+
+def check_identical(pages, backends):
+    """모든 백엔드 결과가 기준 구현과 같은지 비교하고 불일치 목록을 반환"""
+    mismatches = []
+    for name, html in pages:
+        expected = PARSERS[REFERENCE](html)
+        for backend in backends:
+            try:
+                got = PARSERS[backend](html)
+            except Exception as e:
+                got = f"{type(e).__name__}: {e}"
+            if got != expected:
+                mismatches.append((name, backend, expected, got))
+    return mismatches
+
+
+def measure(pages, backend, rounds):
+    parse = PARSERS[backend]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html in pages:
+            parse(html)
+    elapsed = time.perf_counter() - start
+    return (len(pages) * rounds) / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상세 페이지 파서 백엔드 벤치마크")
+    parser.add_argument("--rounds", type=int, default=5, help="fixture 전체를 반복 파싱할 횟수")
+    parser.add_argument("--backend", action="append", choices=sorted(PARSERS), help="측정할 백엔드 (여러 번 지정 가능)")
+    args = parser.parse_args()
+
+    backends = args.backend or sorted(PARSERS)
+    pages = load_pages()
+    if not pages:
+        print(f"fixture가 없습니다: {DETAIL_DIR} (python bench/make_fixtures.py 먼저 실행)")
+        sys.exit(1)
+
+    mismatches = check_identical(pages + EDGE_PAGES, backends)
+    if mismatches:
+        for name, backend, expected, got in mismatches:
+            print(f"[불일치] {name} / {backend}\n  기준: {expected}\n  결과: {got}")
+        sys.exit(1)
+    print(f"결과 일치 확인: {len(pages)}개 페이지 + 특이 문서 {len(EDGE_PAGES)}개 x {len(backends)}개 백엔드")
+
+    rates = {backend: measure(pages, backend, args.rounds) for backend in backends}
+    baseline = rates.get(REFERENCE) or measure(pages, REFERENCE, args.rounds)
+    print(f"{'backend':<10} {'pages/sec':>10} {'vs ' + REFERENCE:>8}")
+    for backend in sorted(rates, key=rates.get, reverse=True):
+        print(f"{backend:<10} {rates[backend]:>10.1f} {rates[backend] / baseline:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
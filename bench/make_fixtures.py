@@ -0,0 +1,182 @@
+"""
+벤치마크용 S2B 상세 페이지 fixture 생성
+
+저장소에 커밋된 plan_goods_*.html 결과 리포트의 행(제목/카테고리/등록번호/이미지)을 읽어
+S2B 상세 페이지(rema100No.do) 구조를 흉내낸 EUC-KR 페이지를 bench/fixtures/detail/ 에 만든다.
+'(정보 없음)' 행은 존재하지 않는 번호의 빈 상세 페이지로 만든다.
+
+sell_goods 결과 엑셀(sell_goods/s2b_result_*.xlsx)의 계약 행은 bench/fixtures/list/contracts.json 으로 저장한다.
+(로컬 대체 서버 bench/stub_server.py가 계약현황 목록 페이지를 만들 때 사용)
+
+사용법: python bench/make_fixtures.py [리포트파일] [개수]
+"""
+import glob
+import html
+import json
+import os
+import re
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DETAIL_DIR = os.path.join(BENCH_DIR, "fixtures", "detail")
+LIST_DIR = os.path.join(BENCH_DIR, "fixtures", "list")
+CONTRACT_FIELDS = ['계약구분', '계약명', '금액', '계약대상자', '기관명']
+
+ROW_PATTERN = re.compile(
+    r'<tr>\s*<td>(?:<img src="(?P<img>[^"]*)"[^>]*>|<span class="no-data">[^<]*</span>)</td>\s*'
+    r'<td class="text-left">(?P<title>.*?)</td>\s*<td>(?P<navi>.*?)</td>\s*<td>\s*'
+    r'<a href="[^"]*f_re_estimate_code=(?P<code>\d+)"[^>]*>\s*(?P<reg>.*?)\s*</a>',
+    re.S)
+
+# 실제 페이지처럼 상단 메뉴/좌측 메뉴/스크립트가 본문 앞뒤로 붙는다.
+MENU_ITEMS = ["물품", "용역", "공사", "학교장터 안내", "계약현황", "견적요청", "고객센터", "공지사항", "자료실", "FAQ"]
+
+PAGE_HEAD = """<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">
+<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<title>학교장터(S2B) - 물품 상세정보</title>
+<link rel="stylesheet" type="text/css" href="/S2BNCustomer/S2B/scrweb/css/common.css">
+<script type="text/javascript" src="/S2BNCustomer/S2B/scrweb/js/common.js"></script>
+<script type="text/javascript">
+<!--
+function fnGoDetail(code) {{ document.frm.f_re_estimate_code.value = code; document.frm.submit(); }}
+function fnPopup(url, w, h) {{ window.open(url, 'pop', 'width=' + w + ',height=' + h + ',scrollbars=yes'); }}
+{script_filler}
+//-->
+</script>
+</head>
+<body leftmargin="0" topmargin="0">
+<form name="frm" method="post" action="/S2BNCustomer/rema100No.do">
+<input type="hidden" name="forwardName" value="detail">
+<input type="hidden" name="f_re_estimate_code" value="{code}">
+</form>
+<table width="100%" border="0" cellspacing="0" cellpadding="0">
+<tr><td class="top_menu">{top_menu}</td></tr>
+<tr><td>
+<table width="1000" border="0" cellspacing="0" cellpadding="0" align="center">
+<tr>
+<td width="180" valign="top" class="left_menu">
+<table width="100%" border="0" cellspacing="0" cellpadding="0">
+{left_menu}
+</table>
+</td>
+<td valign="top">
+"""
+
+PAGE_DETAIL = """<table width="100%" border="0" cellspacing="0" cellpadding="0">
+<tr>
+<td height="30" class="navi"><img src="/S2BNCustomer/S2B/scrweb/images/remu/icon_navi_view.gif" width="9" height="9" align="absmiddle"> {navi}</td>
+</tr>
+</table>
+<table width="100%" border="0" cellspacing="0" cellpadding="0">
+<tr>
+<td class="detail_img" width="276" height="276" align="center"><img src="{img}" width="270" height="270" border="0" onerror="this.src='/S2BNCustomer/S2B/scrweb/images/common/noimg.gif'"></td>
+<td valign="top" style="padding-left:20px">
+<table width="100%" border="0" cellspacing="0" cellpadding="3">
+<tr><td class="f12_gray" width="90">물품명</td><td><font class="f12_b_black">{title}</font></td></tr>
+<tr><td class="f12_gray">물품등록번호</td><td><font class="f12_b_black">{reg}</font></td></tr>
+<tr><td class="f12_gray">제조사</td><td>{maker}</td></tr>
+<tr><td class="f12_gray">원산지</td><td>국산 &amp; 수입</td></tr>
+<tr><td class="f12_gray">납품가능기간</td><td>계약일로부터 7일</td></tr>
+<tr><td class="f12_gray">배송비</td><td>무료배송</td></tr>
+</table>
+</td>
+</tr>
+</table>
+"""
+
+PAGE_EMPTY = """<table width="100%" border="0" cellspacing="0" cellpadding="0">
+<tr><td height="200" align="center" class="f12_gray">조회된 물품 정보가 없습니다.</td></tr>
+</table>
+"""
+
+PAGE_TAIL = """<table width="100%" border="0" cellspacing="0" cellpadding="5" class="detail_desc">
+{desc_rows}
+</table>
+</td>
+</tr>
+</table>
+</td></tr>
+<tr><td class="footer">Copyright(c) 학교장터(S2B). All Rights Reserved. 고객센터 1588-7877</td></tr>
+</table>
+</body>
+</html>
+"""
+
+
+def read_report_rows(report_path):
+    with open(report_path, encoding="utf-8") as f:
+        content = f.read()
+    rows = []
+    for m in ROW_PATTERN.finditer(content):
+        empty = "정보 없음" in m.group("title")
+        rows.append({
+            'code': m.group("code"),
+            'img': m.group("img") or "",
+            'title': "" if empty else html.unescape(m.group("title")),
+            'navi': html.unescape(m.group("navi")),
+            'reg': html.unescape(m.group("reg")),
+            'empty': empty,
+        })
+    return rows
+
+
+def render_page(row, seq):
+    top_menu = " | ".join(f'<a href="/S2BNCustomer/menu{i}.do">{name}</a>' for i, name in enumerate(MENU_ITEMS))
+    left_menu = "\n".join(
+        f'<tr><td class="left_item"><a href="/S2BNCustomer/cate.do?c={i:04d}">{MENU_ITEMS[i % len(MENU_ITEMS)]} 분류 {i}</a></td></tr>'
+        for i in range(120))
+    script_filler = "\n".join(f"var menuData{i} = ['{MENU_ITEMS[i % len(MENU_ITEMS)]}', {i}, 'item_{i:04d}'];" for i in range(150))
+    desc_rows = "\n".join(
+        f'<tr><td class="f12_gray" width="120">상세설명 {i}</td><td>본 물품은 학교장터 등록 물품으로 규격 {i}호 기준을 따릅니다. 문의는 공급사로 연락 바랍니다.</td></tr>'
+        for i in range(60 + seq % 40))
+
+    parts = [PAGE_HEAD.format(code=row['code'], top_menu=top_menu, left_menu=left_menu, script_filler=script_filler)]
+    if row['empty']:
+        parts.append(PAGE_EMPTY)
+    else:
+        parts.append(PAGE_DETAIL.format(navi=html.escape(row['navi'], quote=False), img=row['img'],
+                                        title=html.escape(row['title'], quote=False),
+                                        reg=row['reg'], maker=f"제조사{seq % 7}"))
+    parts.append(PAGE_TAIL.format(desc_rows=desc_rows))
+    return "".join(parts)
+
+
+def write_contract_pool(limit=300):
+    """sell_goods 결과 엑셀의 계약 행(번호/날짜 제외)을 목록 페이지 재료로 저장"""
+    import pandas as pd
+
+    rows = []
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "sell_goods", "s2b_result_*.xlsx"))):
+        df = pd.read_excel(path, dtype=str).fillna("")
+        rows += df[CONTRACT_FIELDS].to_dict('records')
+        if len(rows) >= limit:
+            break
+    os.makedirs(LIST_DIR, exist_ok=True)
+    with open(os.path.join(LIST_DIR, "contracts.json"), "w", encoding="utf-8") as f:
+        json.dump(rows[:limit], f, ensure_ascii=False, indent=0)
+    print(f"{len(rows[:limit])}개 계약 행 저장: {LIST_DIR}")
+
+
+def main():
+    reports = sorted(glob.glob(os.path.join(REPO_DIR, "plan_goods_*_500.html")))
+    report_path = sys.argv[1] if len(sys.argv) >= 2 else reports[-1]
+    limit = int(sys.argv[2]) if len(sys.argv) >= 3 else 24
+
+    # 존재하지 않는 번호(빈 페이지)도 일정 비율 섞는다.
+    all_rows = read_report_rows(report_path)
+    rows = [r for r in all_rows if not r['empty']][:limit]
+    rows += [r for r in all_rows if r['empty']][:max(1, limit // 6)]
+    os.makedirs(DETAIL_DIR, exist_ok=True)
+    for seq, row in enumerate(rows):
+        page = render_page(row, seq)
+        with open(os.path.join(DETAIL_DIR, f"{row['code']}.html"), "wb") as f:
+            f.write(page.encode("euc-kr", errors="xmlcharrefreplace"))
+    print(f"{len(rows)}개 fixture 생성: {DETAIL_DIR} (원본: {os.path.basename(report_path)})")
+    write_contract_pool()
+
+
+if __name__ == "__main__":
+    main()
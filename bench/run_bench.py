@@ -0,0 +1,173 @@
+"""
+plan_goods / sell_goods 종단간(end-to-end) 처리량 벤치마크
+
+로컬 대체 서버(bench/stub_server.py)를 띄우고 각 시나리오를 별도 프로세스로 실행해
+초당 처리 건수, CPU 시간, 최대 메모리(RSS)를 측정한다. 결과는 JSON 파일로 저장하며
+--compare로 이전 결과와 비교하면 버전 간 성능 저하를 바로 확인할 수 있다.
+
+    python bench/run_bench.py [--quick] [--only 이름 ...] [--out 결과.json] [--compare 이전결과.json]
+
+측정값
+- items_per_sec : 처리 건수 / 실행 시간 (plan_goods: 조회한 번호, sell_goods: 수집한 계약 행)
+- cpu_sec       : 자식 프로세스 user + sys CPU 시간
+- peak_rss_mb   : 자식 프로세스 최대 RSS
+- requests / failures : 실행 지표 이력(*_metrics_history.jsonl)의 요청 수 / 오류 종류별 실패
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from stub_server import StubConfig, start_server
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+PLAN_GOODS = os.path.join(REPO_DIR, "plan_goods", "plan_goods.py")
+SELL_GOODS = os.path.join(REPO_DIR, "sell_goods", "sell_goods.py")
+
+PLAN_START = "202602066861120"
+
+
+def plan_goods_cmd(count, *extra):
+    return ([sys.executable, PLAN_GOODS, PLAN_START, str(count), "--rps", "0", "--db", "results.db"] + list(extra),
+            "plan_goods_metrics_history.jsonl")
+
+
+def sell_goods_cmd(start_date, end_date, *extra):
+    return ([sys.executable, SELL_GOODS, "--backfill", start_date, end_date, "--out-dir", ".", "--rps", "0",
+             "--min-delay", "0", "--start-delay", "0"] + list(extra),
+            "sell_goods_metrics_history.jsonl")
+
+
+def scenarios(quick):
+    """(이름, 서버 설정, (명령, 지표 이력 파일))"""
+    n = 300 if quick else 2000
+    days = ("20260101", "20260103") if quick else ("20260101", "20260110")
+    return [
+        ("plan_goods_linear", StubConfig(latency_ms=20, jitter_ms=10),
+         plan_goods_cmd(n, "--workers", "4")),
+        ("plan_goods_linear_w16", StubConfig(latency_ms=20, jitter_ms=10),
+         plan_goods_cmd(n, "--workers", "16")),
+        ("plan_goods_probe_gaps", StubConfig(latency_ms=20, jitter_ms=10, gap_every=200, gap_len=120,
+                                             frontier=str(int(PLAN_START) + n)),
+         plan_goods_cmd(n, "--workers", "8", "--probe")),
+        ("plan_goods_faults", StubConfig(latency_ms=20, jitter_ms=10, error_rate=0.01, reset_rate=0.01,
+                                         truncate_rate=0.01),
+         plan_goods_cmd(n // 2, "--workers", "8")),
+        ("sell_goods_backfill", StubConfig(latency_ms=20, jitter_ms=10),
+         sell_goods_cmd(*days, "--date-workers", "3")),
+        ("sell_goods_bulk", StubConfig(latency_ms=20, jitter_ms=10),
+         sell_goods_cmd(*days, "--date-workers", "3", "--bulk")),
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(name, config, cmd, history_name, verbose=False):
+    server, base_url = start_server(config)
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as work_dir:
+            env = dict(os.environ, S2B_BASE_URL=base_url, PYTHONIOENCODING="utf-8")
+            output = None if verbose else subprocess.DEVNULL
+            started = time.perf_counter()
+            proc = subprocess.Popen(cmd, cwd=work_dir, env=env, stdout=output, stderr=output)
+            # wait4는 이 자식 프로세스만의 CPU 시간 / 최대 RSS를 돌려준다.
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status
+            wall = time.perf_counter() - started
+
+            summary = {}
+            history = os.path.join(work_dir, history_name)
+            if os.path.exists(history):
+                with open(history, encoding="utf-8") as f:
+                    summary = json.loads(f.read().splitlines()[-1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # ru_maxrss 단위: Linux는 KB, macOS는 byte
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    items = summary.get('items', 0)
+    return {
+        'exit_code': proc.returncode,
+        'wall_sec': round(wall, 3),
+        'cpu_sec': round(usage.ru_utime + usage.ru_stime, 3),
+        'peak_rss_mb': round(rss_mb, 1),
+        'items': items,
+        'items_per_sec': round(items / wall, 2) if wall > 0 else None,
+        'cpu_ms_per_item': round((usage.ru_utime + usage.ru_stime) * 1000 / items, 2) if items else None,
+        'requests': summary.get('requests'),
+        'failures': summary.get('failures'),
+        'latency_p50_ms': summary.get('latency_p50_ms'),
+        'latency_p95_ms': summary.get('latency_p95_ms'),
+        'server_requests': server.state.requests,
+        'server_injected': dict(server.state.injected),
+    }
+
+
+def compare(previous, current):
+    print(f"\n{'시나리오':<26}{'이전 건/초':>12}{'현재 건/초':>12}{'변화':>9}{'이전 CPU ms/건':>16}{'현재':>9}")
+    for name, now in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            print(f"{name:<26}{'-':>12}{now['items_per_sec']:>12}")
+            continue
+        ratio = (now['items_per_sec'] / before['items_per_sec'] - 1) * 100 if before.get('items_per_sec') else 0
+        print(f"{name:<26}{before['items_per_sec']:>12}{now['items_per_sec']:>12}{ratio:>+8.1f}%"
+              f"{before.get('cpu_ms_per_item')!s:>16}{now.get('cpu_ms_per_item')!s:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="plan_goods / sell_goods 종단간 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="작은 규모로 빠르게 실행")
+    parser.add_argument("--only", nargs="+", help="실행할 시나리오 이름")
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/bench_<커밋>_<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--verbose", action="store_true", help="크롤러 출력 표시")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    result = {
+        'revision': revision,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'scenarios': {},
+    }
+    for name, config, (cmd, history_name) in scenarios(args.quick):
+        if args.only and name not in args.only:
+            continue
+        print(f"[{name}] 실행 중...", flush=True)
+        stats = run_scenario(name, config, cmd, history_name, args.verbose)
+        result['scenarios'][name] = stats
+        print(f"   {stats['items']}건 / {stats['wall_sec']}초 = 초당 {stats['items_per_sec']}건, "
+              f"CPU {stats['cpu_sec']}초 ({stats['cpu_ms_per_item']}ms/건), 최대 RSS {stats['peak_rss_mb']}MB"
+              + (f", 종료 코드 {stats['exit_code']}" if stats['exit_code'] else ""))
+
+    out_path = args.out or os.path.join(
+        RESULTS_DIR, f"bench_{revision or 'local'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    print(f"\n결과 저장: {out_path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+S2B 로컬 대체 서버 (벤치마크 / 재현 가능한 테스트용)
+
+- GET  /S2BNCustomer/rema100No.do?f_re_estimate_code=번호 : bench/fixtures/detail/ 의 상세 페이지
+    · 번호 = 등록일자(8자리) + 일련번호. 일련번호 % gap_every < gap_len 이면 빈 페이지(빈 구간)
+    · frontier 보다 큰 번호, 오늘 이후 날짜는 빈 페이지(아직 등록되지 않은 번호)
+- POST /S2BNCustomer/tcmo001.do (tender_date_start, pageNo) : 계약현황 목록 페이지
+    · 날짜마다 rows_per_date(+날짜별 0~10)건, 한 페이지 page_size건을 계약번호 내림차순으로 보여준다.
+    · rows_param(기본 pageSize) 폼 값이 있으면 max_page_size까지 한 페이지 행 수를 늘린다.
+    · 표 아래에 "총 N건"(그 날짜의 계약 수)과 페이지 링크(goPage(n), 10개씩 + 마지막 페이지)를 보여준다.
+    · 그 날짜의 행이 끝나면 이전 날짜의 행이 이어서 나온다. (크롤러의 날짜 경계 판단 확인용)
+    · excelSection=Y 이면 tender_date_start ~ tender_date_end 전체를 엑셀 파일 1개로 응답한다. (sell_goods --bulk)
+      export 설정: xlsx(기본) / html(<table>로 된 "엑셀") / none(내보내기 미지원: 일반 목록 페이지로 응답)
+- 응답 지연(latency_ms ± jitter_ms)과 오류 주입(5xx / 연결 재설정 / 본문 잘림)을 비율로 설정할 수 있다.
+
+    python bench/stub_server.py --port 8765 --latency-ms 50 --error-rate 0.02
+    S2B_BASE_URL=http://127.0.0.1:8765 python ./plan_goods/plan_goods.py 202602066861120 100
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DETAIL_DIR = os.path.join(BENCH_DIR, "fixtures", "detail")
+CONTRACTS_FILE = os.path.join(BENCH_DIR, "fixtures", "list", "contracts.json")
+EMPTY_MARK = "조회된 물품 정보가 없습니다".encode("euc-kr")
+
+LIST_HEAD = """<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">
+<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=euc-kr">
+<title>학교장터(S2B) - 계약현황</title>
+</head>
+<body>
+<form name="frm" method="post" action="/S2BNCustomer/tcmo001.do">
+<input type="hidden" name="forwardName" value="list03">
+<input type="hidden" name="pageNo" value="{page}">
+<input type="hidden" name="tender_date_start" value="{date}">
+<input type="hidden" name="tender_date_end" value="{date}">
+</form>
+<table width="100%" border="0" cellspacing="0" cellpadding="0"><tr><td class="navi">계약현황 &gt; 계약목록</td></tr></table>
+<table width="100%" border="0" cellspacing="1" cellpadding="3" class="list">
+<tr><td class="th">No</td><td class="th">계약구분</td><td class="th">계약번호</td><td class="th">계약명</td><td class="th">금액</td><td class="th">계약대상자</td></tr>
+<tr><td class="th"></td><td class="th">기관명</td><td class="th"></td><td class="th">계약일</td><td class="th"></td><td class="th"></td></tr>
+"""
+
+LIST_ROW = """<tr><td>{no}</td><td>{kind}</td><td><a href="javascript:fnDetail('{contract}')">{contract}</a></td><td class="left">{name}</td><td class="right">{amount}</td><td>{vendor}</td></tr>
+<tr><td></td><td>{org}</td><td></td><td>{day}</td><td></td><td></td></tr>
+"""
+
+LIST_TAIL = """</table>
+<div class="paging">총 <b>{total:,}</b>건 {links}</div>
+</body>
+</html>
+"""
+
+PAGE_LINK = '<a href="javascript:goPage({page})">{label}</a>'
+
+
+class StubConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, reset_rate=0.0, truncate_rate=0.0,
+                 gap_every=0, gap_len=0, frontier=None, rows_per_date=95, page_size=10, today=None, seed=1,
+                 export='xlsx', rows_param='pageSize', max_page_size=100):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.truncate_rate = truncate_rate
+        self.gap_every = gap_every
+        self.gap_len = gap_len
+        self.frontier = frontier
+        self.rows_per_date = rows_per_date
+        self.page_size = page_size
+        self.today = today or datetime.now().strftime("%Y%m%d")
+        self.seed = seed
+        self.export = export
+        self.rows_param = rows_param
+        self.max_page_size = max_page_size
+
+
+class StubData:
+    """fixture를 한 번만 읽어 둔다."""
+    def __init__(self):
+        self.live = []
+        self.empty = []
+        for path in sorted(glob.glob(os.path.join(DETAIL_DIR, "*.html"))):
+            with open(path, "rb") as f:
+                body = f.read()
+            (self.empty if EMPTY_MARK in body else self.live).append(body)
+        if not self.live or not self.empty:
+            raise RuntimeError(f"상세 페이지 fixture가 없습니다. 먼저 python bench/make_fixtures.py 를 실행하세요. ({DETAIL_DIR})")
+        with open(CONTRACTS_FILE, encoding="utf-8") as f:
+            self.contracts = json.load(f)
+
+
+def _prev_date(date_str):
+    return (datetime.strptime(date_str, "%Y%m%d") - timedelta(days=1)).strftime("%Y%m%d")
+
+
+class StubState:
+    def __init__(self, config, data=None):
+        self.config = config
+        self.data = data or StubData()
+        self.random = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.injected = {'error': 0, 'reset': 0, 'truncate': 0}
+
+    def draw_fault(self):
+        """이번 요청에 주입할 오류 (없으면 None)"""
+        c = self.config
+        with self.lock:
+            self.requests += 1
+            r = self.random.random()
+        for name, rate in (('error', c.error_rate), ('reset', c.reset_rate), ('truncate', c.truncate_rate)):
+            if r < rate:
+                with self.lock:
+                    self.injected[name] += 1
+                return name
+            r -= rate
+        return None
+
+    def delay(self):
+        c = self.config
+        if c.latency_ms or c.jitter_ms:
+            with self.lock:
+                jitter = self.random.uniform(-c.jitter_ms, c.jitter_ms)
+            time.sleep(max(0.0, c.latency_ms + jitter) / 1000)
+
+    def detail_page(self, code):
+        c = self.config
+        if not code.isdigit() or len(code) <= 8:
+            return self.data.empty[0]
+        date_str, seq = code[:8], int(code[8:])
+        if date_str > c.today or (c.frontier and int(code) > int(c.frontier)):
+            return self.data.empty[seq % len(self.data.empty)]
+        if c.gap_every and seq % c.gap_every < c.gap_len:
+            return self.data.empty[seq % len(self.data.empty)]
+        return self.data.live[seq % len(self.data.live)]
+
+    def rows_for_date(self, date_str):
+        return self.config.rows_per_date + int(date_str) % 11
+
+    def contract_data(self, date_str, index):
+        """date_str의 index번째(최신순) 계약 (목록 행 형식 dict, No 제외)"""
+        pool = self.data.contracts
+        base = pool[(int(date_str) * 7 + index) % len(pool)]
+        seq = 900000 + self.rows_for_date(date_str) - index
+        item = {'계약구분': base['계약구분'], '계약번호': f"{date_str}{seq:07d}", '계약명': base['계약명'],
+                '금액': base['금액'], '계약대상자': base['계약대상자'], '기관명': base['기관명'],
+                '계약일': f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"}
+        return item
+
+    def contract_row(self, date_str, index, no):
+        item = self.contract_data(date_str, index)
+        return LIST_ROW.format(no=no, kind=escape(item['계약구분']), contract=item['계약번호'],
+                               name=escape(item['계약명']), amount=escape(item['금액']),
+                               vendor=escape(item['계약대상자']), org=escape(item['기관명']), day=item['계약일'])
+
+    def export_rows(self, start_date, end_date):
+        """내보내기 행: end_date부터 start_date까지 날짜 내림차순, 날짜 안에서는 최신순"""
+        current = end_date
+        while current >= start_date:
+            for index in range(self.rows_for_date(current)):
+                yield self.contract_data(current, index)
+            current = _prev_date(current)
+
+    def export_file(self, start_date, end_date):
+        """(본문 bytes, Content-Type) - 금액은 숫자, 계약일은 날짜 셀 (실제 엑셀처럼)"""
+        header = ['No', '계약구분', '계약번호', '계약명', '금액', '계약대상자', '기관명', '계약일']
+        rows = []
+        for no, item in enumerate(self.export_rows(start_date, end_date), 1):
+            rows.append([no, item['계약구분'], item['계약번호'], item['계약명'], int(item['금액'].replace(",", "")),
+                         item['계약대상자'], item['기관명'], datetime.strptime(item['계약일'], "%Y-%m-%d")])
+        if self.config.export == 'html':
+            parts = ['<html><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"></head><body>',
+                     '<table border="1"><tr>' + "".join(f"<th>{h}</th>" for h in header) + '</tr>']
+            for row in rows:
+                row[4] = f"{row[4]:,}"
+                row[7] = row[7].strftime("%Y-%m-%d")
+                parts.append('<tr>' + "".join(f"<td>{escape(str(v))}</td>" for v in row) + '</tr>')
+            parts.append('</table></body></html>')
+            return "".join(parts).encode("euc-kr", errors="xmlcharrefreplace"), "application/vnd.ms-excel"
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("계약현황")
+        sheet.append(["계약현황 목록"])
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+        out = io.BytesIO()
+        workbook.save(out)
+        return out.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def page_links(self, page_no, last_page):
+        first = (page_no - 1) // 10 * 10 + 1
+        links = [PAGE_LINK.format(page=p, label=p) for p in range(first, min(first + 10, last_page + 1))]
+        if last_page >= first + 10:
+            links.append(PAGE_LINK.format(page=last_page, label="끝"))
+        return " ".join(links)
+
+    def list_page(self, date_str, page_no, page_size=None):
+        c = self.config
+        size = min(page_size or c.page_size, c.max_page_size)
+        total = self.rows_for_date(date_str)
+        parts = [LIST_HEAD.format(page=page_no, date=date_str)]
+        start = (page_no - 1) * size
+        current, offset = date_str, 0
+        for i in range(start, start + size):
+            # 그 날짜의 행이 끝나면 이전 날짜의 행을 이어서 보여준다.
+            index = i - offset
+            while index >= self.rows_for_date(current):
+                offset += self.rows_for_date(current)
+                current = _prev_date(current)
+                index = i - offset
+            parts.append(self.contract_row(current, index, i + 1))
+        parts.append(LIST_TAIL.format(total=total, links=self.page_links(page_no, max(1, -(-total // size)))))
+        return "".join(parts).encode("euc-kr", errors="xmlcharrefreplace")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200, content_type="text/html"):
+        fault = self.state.draw_fault()
+        self.state.delay()
+        if fault == 'reset':
+            # 응답 없이 RST로 연결을 끊는다. (RemoteDisconnected / ConnectionResetError)
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+            self.close_connection = True
+            self.connection.close()
+            return
+        if fault == 'error':
+            status, body, content_type = 503, b"<html><body>Service Unavailable</body></html>", "text/html"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if fault == 'truncate':
+            # 본문 절반만 보내고 끊는다. (IncompleteRead)
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/S2BNCustomer/rema100No.do":
+            return self._send(b"not found", 404)
+        code = parse_qs(url.query).get('f_re_estimate_code', [""])[0]
+        self._send(self.state.detail_page(code))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("ascii", errors="replace"))
+        if url.path != "/S2BNCustomer/tcmo001.do":
+            return self._send(b"not found", 404)
+        date_str = form.get('tender_date_start', [""])[0]
+        page_no = int(form.get('pageNo', ["1"])[0] or 1)
+        if not (date_str.isdigit() and len(date_str) == 8):
+            return self._send(b"bad request", 400)
+        if form.get('excelSection', ["N"])[0] == 'Y' and self.state.config.export != 'none':
+            end_date = form.get('tender_date_end', [date_str])[0]
+            body, content_type = self.state.export_file(date_str, end_date)
+            return self._send(body, content_type=content_type)
+        page_size = form.get(self.state.config.rows_param, [""])[0]
+        self._send(self.state.list_page(date_str, max(1, page_no), int(page_size) if page_size.isdigit() else None))
+
+    def finish(self):
+        try:
+            super().finish()
+        except OSError:
+            pass  # 오류 주입으로 이미 끊은 연결
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """백그라운드 스레드로 서버를 띄우고 (server, base_url)을 반환. server.shutdown()으로 종료"""
+    state = StubState(config)
+    handler = type("BoundStubHandler", (StubHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_config_args(parser):
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답 지연(ms)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="응답 지연 흔들림(±ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="연결 재설정 비율")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="본문 잘림 비율")
+    parser.add_argument("--gap-every", type=int, default=0, help="일련번호 gap_every개마다")
+    parser.add_argument("--gap-len", type=int, default=0, help="gap_len개의 빈 번호")
+    parser.add_argument("--frontier", help="이 번호보다 큰 번호는 빈 페이지")
+    parser.add_argument("--rows-per-date", type=int, default=95, help="날짜별 계약 수(+0~10)")
+    parser.add_argument("--export", choices=["xlsx", "html", "none"], default="xlsx",
+                        help="excelSection=Y 응답 형식 (none: 내보내기 미지원)")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def config_from_args(args):
+    return StubConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                      reset_rate=args.reset_rate, truncate_rate=args.truncate_rate, gap_every=args.gap_every,
+                      gap_len=args.gap_len, frontier=args.frontier, rows_per_date=args.rows_per_date, seed=args.seed,
+                      export=args.export)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="S2B 로컬 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_args(parser)
+    args = parser.parse_args()
+    server, base_url = start_server(config_from_args(args), args.host, args.port)
+    print(f"S2B 대체 서버 실행 중: {base_url}  (S2B_BASE_URL={base_url}, Ctrl+C로 종료)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
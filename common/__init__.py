@@ -0,0 +1 @@
+"""plan_goods / sell_goods 크롤러 공용 모듈"""
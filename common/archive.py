@@ -0,0 +1,465 @@
+"""
+수집 결과 압축 아카이브 (Parquet + zstd, 날짜별 파티션)
+
+배치마다 커밋되는 리포트(html) / 로그 / 페이지별 엑셀 대신 결과를 열 단위 압축 파일로 모아 둔다.
+같은 열의 값이 모여 있으므로 크기가 원본의 일부이고, 필요한 날짜와 열만 읽으므로 불러오기도 빠르다.
+
+- 위치: archive/<종류>/<파티션>/*.parquet
+  - 종류: goods (plan_goods 물품, 등록일자 기준) / contracts (sell_goods 계약, 계약번호 앞 8자리 기준)
+  - 파티션: day=YYYYMMDD (하루), month=YYYYMM (compact --monthly로 지난 달을 한 파일로 합친 것)
+- ingest : 결과 저장소 / plan_goods_*.html 리포트 / sell_goods 결과(xlsx, 체크포인트 jsonl)에서 행을 읽어
+           날짜별 작은 조각(part-*.parquet)으로 추가한다.
+           읽은 파일은 수정 시각/크기/해시를 _sources.json에 기록해 두고 새로 생기거나 바뀐 파일만 다시 읽는다.
+           (체크아웃으로 수정 시각만 바뀐 파일은 해시가 같으면 건너뜀)
+           --remove-sources를 주면 아카이브에 넣은 리포트와 로그(plan_goods_*_log.txt),
+           페이지별 엑셀(s2b_result_<날짜>_<페이지>.xlsx)과 로그를 지운다.
+- compact: 조각이 여러 개인 날짜를 data.parquet 하나로 합친다. 같은 번호는 한 행만 남긴다.
+           (물품은 성공한 행, 그중 나중에 수집한 행 / 계약은 나중에 들어온 행)
+           --finished-only를 주면 오늘 날짜 파티션은 합치지 않는다. (자주 실행하며 커밋할 때
+           아직 조각이 늘어나는 날의 파일을 매번 새로 쓰지 않도록)
+- read() : 기간에 걸치는 파티션만 열고 요청한 열만 읽는다. (아직 합치지 않은 조각의 중복도 제거)
+
+모든 열은 원문 문자열 그대로 저장한다. (물품 success만 정수)
+pyarrow가 필요하다. (pip install pyarrow)
+
+    python -m common.archive ingest [--remove-sources]
+    python -m common.archive compact [--monthly] [--finished-only]
+    python -m common.archive read contracts --since 20260101 --until 20260131 --columns 계약번호,금액
+    python -m common.archive status
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+from common.search_index import report_rows
+
+DEFAULT_ARCHIVE_DIR = os.path.join(REPO_DIR, "archive")
+DEFAULT_GOODS_DB = os.path.join(REPO_DIR, "plan_goods_results.db")
+DEFAULT_REPORTS_DIR = REPO_DIR
+DEFAULT_CONTRACTS_DIR = os.path.join(REPO_DIR, "sell_goods")
+SOURCES_FILE = "_sources.json"
+COMPACT_NAME = "data.parquet"
+ZSTD_LEVEL = 9
+# 파일 하나 안의 행 그룹 크기 (read()의 기간 조건은 행 그룹 통계로 건너뛴다)
+ROW_GROUP_SIZE = 64 * 1024
+
+GOODS_COLUMNS = ('code', 'reg_date', 'success', 'navi_text', 'font_content_1', 'font_content_2', 'image_url',
+                 'detail_link', 'error_msg', 'fetched_at')
+CONTRACT_COLUMNS = ('계약일자', 'No', '계약구분', '계약번호', '계약명', '금액', '계약대상자', '기관명', '계약일')
+
+# 종류별 번호 열 / 날짜 열(파티션 기준) / 열 목록
+DATASETS = {
+    'goods': {'key': 'code', 'date': 'reg_date', 'columns': GOODS_COLUMNS},
+    'contracts': {'key': '계약번호', 'date': '계약일자', 'columns': CONTRACT_COLUMNS},
+}
+
+PARTITION = re.compile(r'^(day|month)=(\d{6,8})$')
+PAGE_XLSX = re.compile(r'^s2b_result_\d{8}_\d+\.xlsx$')
+
+
+def require_pyarrow():
+    if not HAS_PYARROW:
+        raise RuntimeError("아카이브에는 pyarrow가 필요합니다. (pip install pyarrow)")
+
+
+def _schema(dataset):
+    return pa.schema([(c, pa.int8() if c == 'success' else pa.string()) for c in DATASETS[dataset]['columns']])
+
+
+def _clean(value):
+    if value is None:
+        return ""
+    value = str(value)
+    return "" if value == "nan" else value.strip()
+
+
+def _frame(dataset, rows):
+    """dict 목록 -> 아카이브 열 순서의 DataFrame (없는 열은 빈 문자열)"""
+    columns = DATASETS[dataset]['columns']
+    df = pd.DataFrame(rows, columns=columns)
+    for column in columns:
+        if column == 'success':
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype('int8')
+        else:
+            df[column] = df[column].map(_clean)
+    return df
+
+
+def _dedup(dataset, df):
+    """같은 번호는 한 행만 (물품: 성공 > 나중 수집, 계약: 나중에 들어온 행)"""
+    key = DATASETS[dataset]['key']
+    if key not in df.columns:
+        return df
+    if dataset == 'goods' and 'success' in df.columns and 'fetched_at' in df.columns:
+        df = df.sort_values(['success', 'fetched_at'], kind='stable')
+    return df.drop_duplicates(subset=key, keep='last').sort_values(key, kind='stable').reset_index(drop=True)
+
+
+def _write(dataset, df, path):
+    """DataFrame을 zstd 압축 parquet로 저장 (임시 파일에 쓴 뒤 교체)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, schema=_schema(dataset), preserve_index=False)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression='zstd', compression_level=ZSTD_LEVEL, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _in_range(kind, value, since, until):
+    """파티션(day=YYYYMMDD / month=YYYYMM)이 기간 [since, until]에 걸치는지"""
+    if kind == 'day':
+        first = last = value
+    else:
+        first, last = value + "01", value + "31"
+    return (not since or last >= since) and (not until or first <= until)
+
+
+class Archive:
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        require_pyarrow()
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.sources_path = os.path.join(root, SOURCES_FILE)
+        # files: 경로 -> {mtime, size, rows}, goods_db: 저장소 경로 -> 마지막으로 읽은 fetched_at
+        self.sources = {'files': {}, 'goods_db': {}}
+        if os.path.exists(self.sources_path):
+            with open(self.sources_path, encoding="utf-8") as f:
+                self.sources = json.load(f)
+        self._seq = 0
+
+    def _save_sources(self):
+        tmp_path = self.sources_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.sources, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.sources_path)
+
+    def partitions(self, dataset):
+        """[(종류 day/month, 날짜 문자열, 폴더 경로)] 날짜순"""
+        base = os.path.join(self.root, dataset)
+        if not os.path.isdir(base):
+            return []
+        found = []
+        for name in sorted(os.listdir(base)):
+            match = PARTITION.match(name)
+            if match:
+                found.append((match.group(1), match.group(2), os.path.join(base, name)))
+        return found
+
+    @staticmethod
+    def _files(path):
+        return sorted(glob.glob(os.path.join(path, "*.parquet")))
+
+    # --- 쓰기 ---
+
+    def append(self, dataset, rows):
+        """행(dict 목록)을 날짜별 조각 파일로 추가하고 추가한 행 수를 반환"""
+        df = _frame(dataset, rows)
+        date_column = DATASETS[dataset]['date']
+        df = df[df[date_column].str.len() == 8]
+        if df.empty:
+            return 0
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        for day, group in df.groupby(date_column, sort=True):
+            self._seq += 1
+            path = os.path.join(self.root, dataset, f"day={day}", f"part-{stamp}-{os.getpid()}-{self._seq:05d}.parquet")
+            _write(dataset, _dedup(dataset, group), path)
+        return len(df)
+
+    def _changed(self, path):
+        stat = os.stat(path)
+        previous = self.sources['files'].get(os.path.relpath(path, REPO_DIR))
+        if previous is None or previous['size'] != stat.st_size:
+            return True
+        if previous['mtime'] == stat.st_mtime:
+            return False
+        if previous.get('hash') != file_hash(path):
+            return True
+        previous['mtime'] = stat.st_mtime
+        return False
+
+    def _mark(self, path, rows):
+        stat = os.stat(path)
+        self.sources['files'][os.path.relpath(path, REPO_DIR)] = {'mtime': stat.st_mtime, 'size': stat.st_size,
+                                                                  'hash': file_hash(path), 'rows': rows}
+
+    def ingest_goods_db(self, db_path=DEFAULT_GOODS_DB):
+        """plan_goods 결과 저장소에서 지난번 이후 저장된(fetched_at) 행만 추가"""
+        if not os.path.exists(db_path):
+            return 0
+        name = os.path.relpath(os.path.abspath(db_path), REPO_DIR)
+        since = self.sources['goods_db'].get(name, "")
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            cursor = source.execute(f"SELECT {', '.join(GOODS_COLUMNS)} FROM goods WHERE fetched_at > ? "
+                                    f"ORDER BY fetched_at", (since,))
+            rows = [dict(zip(GOODS_COLUMNS, row)) for row in cursor]
+        finally:
+            source.close()
+        if rows:
+            count = self.append('goods', rows)
+            self.sources['goods_db'][name] = rows[-1]['fetched_at']
+            self._save_sources()
+            return count
+        return 0
+
+    def ingest_report(self, path):
+        """plan_goods_*.html 리포트 1개 (수집 시각은 파일 수정 시각으로 대신함)"""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        fetched_at = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds')
+        rows = []
+        for row in report_rows(text):
+            row['reg_date'] = row['code'][:8]
+            row['fetched_at'] = fetched_at
+            rows.append(row)
+        return self.append('goods', rows)
+
+    def ingest_contract_file(self, path):
+        """sell_goods 결과 xlsx / 체크포인트 jsonl 1개 (읽기는 xls_sum.read_input 재사용)"""
+        sys.path.insert(0, os.path.join(REPO_DIR, "sell_goods"))
+        from xls_sum import read_input
+
+        df = read_input(path)
+        if df.empty or '계약번호' not in df.columns:
+            return 0
+        rows = df.to_dict('records')
+        for row in rows:
+            row['계약일자'] = re.sub(r'[^0-9]', '', _clean(row.get('계약번호')))[:8]
+        return self.append('contracts', rows)
+
+    def ingest(self, goods_db=DEFAULT_GOODS_DB, reports_dir=DEFAULT_REPORTS_DIR, contracts_dir=DEFAULT_CONTRACTS_DIR,
+               remove_sources=False, log=print):
+        """모든 입력에서 새 행을 추가하고 {입력 종류: 행 수}를 반환"""
+        counts = {'goods_db': 0, 'reports': 0, 'contracts': 0, 'files': 0, 'removed': 0}
+        files = []
+        if reports_dir:
+            files += [('reports', p) for p in sorted(glob.glob(os.path.join(reports_dir, "plan_goods_*.html")))]
+        if contracts_dir:
+            for pattern in ("s2b_result_*.xlsx", "s2b_result_*.jsonl"):
+                files += [('contracts', p) for p in sorted(glob.glob(os.path.join(contracts_dir, pattern)))
+                          if not os.path.basename(p).startswith("~$")]
+        # 저장소는 리포트보다 나중에 넣는다. (같은 번호는 수집 시각이 늦은 행이 남는다)
+        for kind, path in files:
+            if self._changed(path):
+                try:
+                    rows = self.ingest_report(path) if kind == 'reports' else self.ingest_contract_file(path)
+                except Exception as e:
+                    log(f"   [건너뜀] {os.path.basename(path)}: {e}")
+                    continue
+                self._mark(path, rows)
+                self._save_sources()
+                counts[kind] += rows
+                counts['files'] += 1
+            if remove_sources:
+                counts['removed'] += self._remove_source(kind, path)
+        counts['goods_db'] = self.ingest_goods_db(goods_db)
+        self._save_sources()
+        return counts
+
+    def _remove_source(self, kind, path):
+        """아카이브에 들어간 리포트/페이지별 엑셀과 같은 이름의 로그를 지운다. (체크포인트와 날짜별 엑셀은 남김)"""
+        name = os.path.basename(path)
+        if kind == 'reports':
+            targets = [path, path[:-len(".html")] + "_log.txt"]
+        elif PAGE_XLSX.match(name):
+            targets = [path, path[:-len(".xlsx")] + ".log"]
+        else:
+            return 0
+        removed = 0
+        for target in targets:
+            if os.path.exists(target):
+                os.remove(target)
+                removed += 1
+        self.sources['files'].pop(os.path.relpath(path, REPO_DIR), None)
+        return removed
+
+    # --- 합치기 ---
+
+    def compact(self, dataset, monthly=False, today=None, finished_only=False):
+        """
+        조각이 여러 개인 날짜를 한 파일로 합친다. {'days': 합친 날짜 수, 'months': 합친 달 수}
+        monthly: 이번 달 이전의 날짜 파티션을 month=YYYYMM 파티션 하나로 합친다.
+        finished_only: 오늘(today) 이후 날짜 파티션은 조각으로 둔다.
+        """
+        today = today or datetime.now().strftime("%Y%m%d")
+        this_month = today[:6]
+        counts = {'days': 0, 'months': 0}
+        by_month = {}
+        for kind, value, path in self.partitions(dataset):
+            if kind == 'day' and finished_only and value >= today:
+                continue
+            if kind == 'day' and monthly and value[:6] < this_month:
+                by_month.setdefault(value[:6], []).append(path)
+                continue
+            files = self._files(path)
+            if kind == 'month' and monthly:
+                by_month.setdefault(value, []).append(path)
+            elif len(files) > 1 or (files and os.path.basename(files[0]) != COMPACT_NAME):
+                self._merge(dataset, [path], path)
+                counts['days' if kind == 'day' else 'months'] += 1
+        for month, paths in sorted(by_month.items()):
+            target = os.path.join(self.root, dataset, f"month={month}")
+            if paths == [target] and [os.path.basename(f) for f in self._files(target)] == [COMPACT_NAME]:
+                continue  # 이미 한 파일로 합쳐진 달
+            self._merge(dataset, paths, target)
+            counts['months'] += 1
+        return counts
+
+    def _merge(self, dataset, paths, target):
+        files = [f for path in paths for f in self._files(path)]
+        # 월 파티션(이미 합친 행)을 먼저, 날짜 조각은 만든 순서대로 읽어 나중 행이 남게 한다.
+        files.sort(key=lambda f: ("month=" not in f, os.path.basename(f)))
+        df = pd.concat([pq.read_table(f).to_pandas() for f in files], ignore_index=True)
+        merged_path = os.path.join(target, COMPACT_NAME + ".new")
+        final_path = os.path.join(target, COMPACT_NAME)
+        os.makedirs(target, exist_ok=True)
+        _write(dataset, _dedup(dataset, df), merged_path)
+        # [수정됨] 합친 파일을 먼저 제자리에 두고 나서 원래 조각을 지운다.
+        # (중간에 멈추면 조각이 남아 중복될 뿐 행을 잃지 않는다. 중복은 read()와 다음 compact가 정리)
+        os.replace(merged_path, final_path)
+        for f in files:
+            if f != final_path:
+                os.remove(f)
+        for path in paths:
+            if path != target and not os.listdir(path):
+                shutil.rmtree(path)
+
+    # --- 읽기 ---
+
+    def read(self, dataset, since=None, until=None, columns=None):
+        """
+        기간 [since, until] (YYYYMMDD, 양끝 포함)의 행을 DataFrame으로 반환
+        기간에 걸치는 파티션 파일만 열고 columns(없으면 전체)만 읽는다.
+        """
+        info = DATASETS[dataset]
+        wanted = list(columns) if columns else list(info['columns'])
+        filters = []
+        if since:
+            filters.append((info['date'], '>=', since))
+        if until:
+            filters.append((info['date'], '<=', until))
+        # 월 파티션이 있는 달은 그 뒤에 들어온 날짜 조각과 함께 읽는다. (같은 번호가 양쪽에 있을 수 있음)
+        partitions = self.partitions(dataset)
+        months = {value for kind, value, _ in partitions if kind == 'month'}
+        groups = {}
+        for kind, value, path in partitions:
+            if _in_range(kind, value, since, until):
+                groups.setdefault(value[:6] if value[:6] in months else value, []).extend(self._files(path))
+        frames = []
+        for group, files in sorted(groups.items()):
+            # 합친 파일을 먼저, 조각은 만든 순서대로 (나중 행이 남는다)
+            files.sort(key=lambda f: ("month=" not in f, os.path.basename(f)))
+            # 합치지 않은 조각끼리는 중복이 있을 수 있어 번호(와 우선순위) 열을 함께 읽는다.
+            extra = []
+            if len(files) > 1:
+                extra = [info['key']] + (['success', 'fetched_at'] if dataset == 'goods' else [])
+            read_columns = wanted + [c for c in extra if c not in wanted]
+            # 월 단위 파일은 행 그룹 통계로 기간 밖의 행을 건너뛴다.
+            tables = [pq.read_table(f, columns=read_columns, filters=filters if len(group) == 6 and filters else None)
+                      for f in files]
+            df = pa.concat_tables(tables).to_pandas()
+            if len(files) > 1:
+                df = _dedup(dataset, df)[wanted]
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=wanted)
+        return pd.concat(frames, ignore_index=True)
+
+    def status(self, dataset):
+        """{'partitions', 'files', 'rows', 'bytes'}"""
+        counts = {'partitions': 0, 'files': 0, 'rows': 0, 'bytes': 0}
+        for _, _, path in self.partitions(dataset):
+            counts['partitions'] += 1
+            for f in self._files(path):
+                counts['files'] += 1
+                counts['rows'] += pq.ParquetFile(f).metadata.num_rows
+                counts['bytes'] += os.path.getsize(f)
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 결과 압축 아카이브 (Parquet + zstd)")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="아카이브 폴더")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="새로 생긴/바뀐 결과를 날짜별 조각으로 추가")
+    ingest.add_argument("--goods-db", default=DEFAULT_GOODS_DB, help="plan_goods 결과 저장소")
+    ingest.add_argument("--reports-dir", default=DEFAULT_REPORTS_DIR, help="plan_goods_*.html 리포트 폴더")
+    ingest.add_argument("--contracts-dir", default=DEFAULT_CONTRACTS_DIR, help="sell_goods 결과 폴더")
+    ingest.add_argument("--remove-sources", action="store_true",
+                        help="아카이브에 넣은 리포트/페이지별 엑셀과 로그 파일 삭제")
+
+    compact = sub.add_parser("compact", help="날짜별 조각을 한 파일로 합치기")
+    compact.add_argument("--dataset", choices=tuple(DATASETS), help="한 종류만 (기본: 모두)")
+    compact.add_argument("--monthly", action="store_true", help="이번 달 이전 날짜는 달 단위 파일 하나로 합치기")
+    compact.add_argument("--finished-only", action="store_true", help="오늘 날짜 파티션은 합치지 않기 (자주 실행할 때)")
+
+    read = sub.add_parser("read", help="기간/열을 골라 읽기")
+    read.add_argument("dataset", choices=tuple(DATASETS))
+    read.add_argument("--since", metavar="YYYYMMDD", help="이 날짜부터")
+    read.add_argument("--until", metavar="YYYYMMDD", help="이 날짜까지")
+    read.add_argument("--columns", help="읽을 열 (쉼표로 구분, 기본: 전체)")
+    read.add_argument("--out", help="결과 저장 파일 (.xlsx / .csv, 기본: 앞부분만 화면 출력)")
+
+    sub.add_parser("status", help="종류별 파티션/파일/행 수와 크기")
+    args = parser.parse_args()
+
+    if not HAS_PYARROW:
+        print(" [아카이브] pyarrow가 설치되어 있지 않습니다. (pip install pyarrow)")
+        sys.exit(1)
+    archive = Archive(args.archive_dir)
+    started = time.perf_counter()
+    if args.command == "ingest":
+        counts = archive.ingest(args.goods_db, args.reports_dir, args.contracts_dir, remove_sources=args.remove_sources)
+        print(f" [아카이브] 저장소 {counts['goods_db']}건 / 리포트 {counts['reports']}건 / 계약 {counts['contracts']}건 "
+              f"(파일 {counts['files']}개, 삭제 {counts['removed']}개, {time.perf_counter() - started:.1f}초)")
+    elif args.command == "compact":
+        for dataset in [args.dataset] if args.dataset else DATASETS:
+            counts = archive.compact(dataset, monthly=args.monthly, finished_only=args.finished_only)
+            print(f" [합치기] {dataset}: 날짜 {counts['days']}개 / 달 {counts['months']}개")
+    elif args.command == "read":
+        columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+        df = archive.read(args.dataset, args.since, args.until, columns)
+        if args.out:
+            if args.out.endswith(".csv"):
+                df.to_csv(args.out, index=False, encoding="utf-8-sig")
+            else:
+                df.to_excel(args.out, index=False)
+        else:
+            print(df.head(20).to_string())
+        print(f" [읽기] {len(df)}행 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    else:
+        for dataset in DATASETS:
+            counts = archive.status(dataset)
+            print(f" [{dataset}] 파티션 {counts['partitions']}개 / 파일 {counts['files']}개 / "
+                  f"{counts['rows']}행 / {counts['bytes'] / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
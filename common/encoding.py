@@ -0,0 +1,114 @@
+"""
+응답 본문 문자셋 판별 / 디코딩 (plan_goods / sell_goods 공용)
+
+response.apparent_encoding은 매 응답마다 본문 전체를 순수 파이썬 문자셋 탐지기로 훑는다.
+EncodingResolver는 싼 방법부터 차례로 쓰고, 실제로 디코딩해 보고 실패할 때만 다음 방법으로 넘어간다.
+
+  1. Content-Type 헤더의 charset
+  2. 같은 엔드포인트(key)에서 지난번에 맞았던 문자셋
+  3. 본문 앞부분(sniff_bytes)의 <meta charset> / <meta http-equiv="Content-Type">
+  4. 문자셋 탐지 (charset_normalizer / chardet, apparent_encoding과 같은 방법)
+
+euc-kr은 상위 집합인 cp949로 디코딩한다. (브라우저와 같은 처리, 확장 한글 깨짐 방지)
+"""
+import codecs
+import re
+import threading
+from collections import Counter
+
+from requests.compat import chardet
+
+DEFAULT_SNIFF_BYTES = 2048
+FALLBACK_ENCODING = 'utf-8'
+
+# 브라우저(WHATWG)처럼 상위 집합 코덱으로 바꿔 읽는 문자셋
+SUPERSETS = {
+    'euc_kr': 'cp949',
+    'ks_c_5601_1987': 'cp949',
+}
+
+# 어떤 바이트열도 오류 없이 읽혀서 맞는지 확인할 수 없는 문자셋 (헤더에 있어도 믿지 않는다)
+UNVERIFIABLE = frozenset(['iso8859_1', 'cp1252'])
+
+_HEADER_CHARSET = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?([\w.:-]+)', re.I)
+
+
+def normalize_encoding(name):
+    """코덱 이름 정규화 (모르는 이름이면 None)"""
+    if not name:
+        return None
+    try:
+        codec = codecs.lookup(name.strip()).name.replace('-', '_')
+    except LookupError:
+        return None
+    return SUPERSETS.get(codec, codec)
+
+
+def header_charset(content_type):
+    match = _HEADER_CHARSET.search(content_type or "")
+    encoding = normalize_encoding(match.group(1)) if match else None
+    return None if encoding in UNVERIFIABLE else encoding
+
+
+def sniff_meta_charset(content, sniff_bytes=DEFAULT_SNIFF_BYTES):
+    match = _META_CHARSET.search(content[:sniff_bytes])
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+
+
+def detect_charset(content):
+    return normalize_encoding(chardet.detect(content)['encoding'])
+
+
+class EncodingResolver:
+    """
+    여러 스레드가 공유한다. key(예: 엔드포인트 경로)별로 맞았던 문자셋을 기억한다.
+    stats에는 어떤 방법으로 판별했는지(header/cached/meta/detect/replace) 횟수가 남는다.
+    """
+    def __init__(self, sniff_bytes=DEFAULT_SNIFF_BYTES):
+        self.sniff_bytes = sniff_bytes
+        self.known = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def _try(self, content, encoding):
+        try:
+            return content.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            return None
+
+    def decode(self, content, key=None, content_type=None):
+        """본문(bytes)을 문자열로 디코딩해 (문자열, 문자셋)을 반환"""
+        tried = []
+        candidates = (
+            ('header', lambda: header_charset(content_type)),
+            ('cached', lambda: self.known.get(key)),
+            ('meta', lambda: sniff_meta_charset(content, self.sniff_bytes)),
+            ('detect', lambda: detect_charset(content)),
+        )
+        for method, find in candidates:
+            encoding = find()
+            if not encoding or encoding in tried:
+                continue
+            tried.append(encoding)
+            text = self._try(content, encoding)
+            if text is not None:
+                with self.lock:
+                    self.stats[method] += 1
+                    if key is not None:
+                        self.known[key] = encoding
+                return text, encoding
+
+        # 어느 문자셋으로도 깨끗하게 읽히지 않으면 마지막으로 맞았던(또는 기본) 문자셋으로 깨진 글자만 바꿔서 읽는다.
+        encoding = self.known.get(key) or (tried[0] if tried else FALLBACK_ENCODING)
+        with self.lock:
+            self.stats['replace'] += 1
+        return content.decode(encoding, errors='replace'), encoding
+
+
+# 프로세스 전체 공용 (파싱 프로세스에서는 프로세스마다 따로 기억한다)
+RESOLVER = EncodingResolver()
+
+
+def decode_body(content, key=None, content_type=None):
+    return RESOLVER.decode(content, key, content_type)[0]
@@ -0,0 +1,178 @@
+"""
+원본 HTTP 응답 디스크 캐시
+
+- 요청(메서드 + URL + 쿼리/폼 데이터)을 해시한 키로 응답을 찾는다.
+- 응답 본문은 내용 해시(sha256) 이름의 gzip 파일로 저장되어 같은 본문은 한 번만 저장된다.
+- 오래된 항목(max_age_days)과 용량 초과분(max_bytes, 오래된 순)을 evict()로 정리한다.
+- offline=True(재생 모드)이면 네트워크를 쓰지 않고 캐시에 없는 요청은 CacheMiss로 실패한다.
+- cacheable(response)를 넘기면 그 결과가 참인 200 응답만 저장한다. (예: 아직 물품이 없는 상세 페이지는 저장하지 않아
+  나중에 등록되면 다시 조회된다)
+"""
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(REPO_DIR, "http_cache")
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+class CacheMiss(Exception):
+    """재생 모드에서 캐시에 없는 요청"""
+
+
+def make_key(method, url, params=None, data=None):
+    """요청을 정규화해 캐시 키(sha256)를 만든다. 파라미터 순서는 무시한다."""
+    canonical = json.dumps({
+        'method': method.upper(),
+        'url': url,
+        'params': sorted((str(k), str(v)) for k, v in (params or {}).items()),
+        'data': sorted((str(k), str(v)) for k, v in (data or {}).items()),
+    }, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age_days=DEFAULT_MAX_AGE_DAYS, offline=False):
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.offline = offline
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body_sha TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(created_at)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_body ON entries(body_sha)")
+        self.db.commit()
+
+    def _blob_path(self, sha):
+        return os.path.join(self.blob_dir, sha[:2], sha + ".gz")
+
+    def get(self, key):
+        """캐시된 응답을 requests.Response로 반환 (없거나 만료되면 None)"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status, headers, body_sha, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body_sha, created_at = row
+        if self.max_age and not self.offline and time.time() - created_at > self.max_age:
+            return None
+        try:
+            with gzip.open(self._blob_path(body_sha), "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response._content = content
+        response.reason = "OK (cache)"
+        return response
+
+    def put(self, key, response):
+        """응답 본문을 내용 해시로 저장하고 요청 키를 연결한다."""
+        content = response.content
+        body_sha = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(body_sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        headers = json.dumps({k: v for k, v in response.headers.items()
+                              if k.lower() in ('content-type', 'content-encoding', 'retry-after')})
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (key, url, status, headers, body_sha, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, headers, body_sha, os.path.getsize(path), time.time()))
+            self.db.commit()
+
+    def evict(self):
+        """만료 항목과 용량 초과분(오래된 순)을 지우고, 참조가 없는 본문 파일을 삭제한다."""
+        with self.lock:
+            if self.max_age:
+                self.db.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.max_age,))
+            if self.max_bytes:
+                total = 0
+                cutoff = None
+                # 같은 본문은 한 번만 센다 (최신 순으로 누적)
+                rows = self.db.execute(
+                    "SELECT body_sha, MAX(created_at) AS latest, MAX(size) FROM entries "
+                    "GROUP BY body_sha ORDER BY latest DESC").fetchall()
+                for body_sha, latest, size in rows:
+                    total += size
+                    if total > self.max_bytes:
+                        cutoff = latest
+                        break
+                if cutoff is not None:
+                    self.db.execute("DELETE FROM entries WHERE created_at <= ?", (cutoff,))
+            self.db.commit()
+            live = set(sha for (sha,) in self.db.execute("SELECT DISTINCT body_sha FROM entries"))
+
+        removed = 0
+        for sub in os.listdir(self.blob_dir):
+            sub_dir = os.path.join(self.blob_dir, sub)
+            for name in os.listdir(sub_dir):
+                if name.endswith(".gz") and name[:-3] not in live:
+                    os.remove(os.path.join(sub_dir, name))
+                    removed += 1
+        return removed
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def cache_lookup(cache, method, url, params=None, data=None):
+    """캐시된 응답 (없으면 None, 재생 모드에서 없으면 CacheMiss)"""
+    response = cache.get(make_key(method, url, params, data))
+    if response is None and cache.offline:
+        raise CacheMiss(f"캐시에 없는 요청: {method} {url} {params or data}")
+    return response
+
+
+def cache_store(cache, method, url, response, params=None, data=None, cacheable=None):
+    """200 응답(cacheable이 있으면 그 결과가 참인 것만)을 캐시에 저장"""
+    if response.status_code == 200 and (cacheable is None or cacheable(response)):
+        cache.put(make_key(method, url, params, data), response)
+
+
+def cached_request(http, method, url, cache=None, params=None, data=None, cacheable=None, **kwargs):
+    """
+    캐시를 먼저 확인하고, 없으면 http(Session 또는 requests 모듈)로 요청한다.
+    200 응답만 캐시에 저장한다. 재생 모드에서 캐시에 없으면 CacheMiss.
+    """
+    if cache is None:
+        return http.request(method, url, params=params, data=data, **kwargs)
+
+    response = cache_lookup(cache, method, url, params, data)
+    if response is not None:
+        return response
+    response = http.request(method, url, params=params, data=data, **kwargs)
+    cache_store(cache, method, url, response, params, data, cacheable)
+    return response
@@ -0,0 +1,182 @@
+"""
+조회(fetch) -> 파싱(parse) -> 기록(sink) 파이프라인 (plan_goods / sell_goods 공용)
+
+- 단계 사이를 크기가 정해진 큐로 잇고, 동시에 처리 중인 항목 수를 max_inflight개로 제한한다.
+  (기록이 밀리면 조회도 멈추므로 입력 개수와 관계없이 메모리는 일정하다.)
+- 조회는 fetch_workers개 스레드, 파싱은 parse_workers개 스레드에서 실행된다.
+  parse_pool(create_parse_pool())을 넘기면 파싱 스레드가 프로세스 풀에 일을 넘긴다. (GIL 회피)
+  파싱과 기록이 다음 요청의 네트워크 대기와 겹쳐서 진행된다.
+- 기록(sink)은 run()을 호출한 스레드 하나에서만 실행되므로 sink 안에서는 잠금이 필요 없다.
+- ordered=True면 입력 순서대로 sink에 넘긴다. (sell_goods 페이지 순서 유지용)
+- stop()을 부르면 새 항목을 더 넣지 않고, 아직 처리 중인 항목은 sink에 넘기지 않고 버린다.
+  (예: sell_goods에서 날짜 경계를 만났을 때 미리 받아 둔 다음 페이지)
+
+    pipeline = Pipeline(fetch, parse, sink, fetch_workers=4)
+    pipeline.run(items)  # items는 제너레이터도 가능 (필요한 만큼만 꺼낸다)
+
+fetch(item) -> 원본, parse(원본) -> 결과, sink(item, 결과) 형태로 호출된다.
+parse_pool을 쓰면 parse 함수와 원본/결과는 pickle 가능해야 한다. (모듈 최상위 함수 또는 functools.partial)
+"""
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_FETCH_WORKERS = 4
+DEFAULT_PARSE_WORKERS = 1
+
+# 단계 끝 표시 / 버려진 항목 표시
+_END = object()
+_DROPPED = object()
+
+
+def create_parse_pool(processes):
+    """
+    파싱용 프로세스 풀 (processes가 0이면 None)
+    스레드가 이미 돌고 있을 때 fork하지 않도록 spawn으로 만든다. 실행 전체에서 하나를 만들어 재사용한다.
+    """
+    if not processes or processes <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+class Pipeline:
+    def __init__(self, fetch, parse, sink, fetch_workers=DEFAULT_FETCH_WORKERS, parse_workers=DEFAULT_PARSE_WORKERS,
+                 parse_pool=None, max_inflight=None, ordered=False):
+        """max_inflight 기본값: 조회 스레드 수 x 2 + 파싱 작업자 수"""
+        self.fetch = fetch
+        self.parse = parse
+        self.sink = sink
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.parse_pool = parse_pool
+        self.max_inflight = max(1, max_inflight or self.fetch_workers * 2 + self.parse_workers)
+        self.ordered = ordered
+        self.stop_event = threading.Event()
+        self.error = None
+        self.lock = threading.Lock()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _fail(self, exc):
+        """첫 번째 예외만 남기고 파이프라인을 멈춘다. (run()이 끝날 때 다시 던진다)"""
+        with self.lock:
+            if self.error is None:
+                self.error = exc
+        self.stop()
+
+    def run(self, items):
+        """items를 모두 처리(또는 stop())할 때까지 기다리고 sink에 넘긴 항목 수를 반환"""
+        slots = threading.Semaphore(self.max_inflight)
+        fetch_q = queue.Queue(self.max_inflight)
+        parse_q = queue.Queue(self.max_inflight)
+        sink_q = queue.Queue(self.max_inflight)
+        remaining = {'fetch': self.fetch_workers, 'parse': self.parse_workers}
+        pool = self.parse_pool
+
+        def stage_done(name, next_q, count):
+            # 마지막으로 끝난 작업자가 다음 단계에 끝 표시를 보낸다.
+            with self.lock:
+                remaining[name] -= 1
+                last = remaining[name] == 0
+            if last:
+                for _ in range(count):
+                    next_q.put(_END)
+
+        def feed():
+            try:
+                for seq, item in enumerate(items):
+                    slots.acquire()
+                    if self.stopped:
+                        slots.release()
+                        break
+                    fetch_q.put((seq, item))
+            except Exception as e:
+                self._fail(e)
+            finally:
+                for _ in range(self.fetch_workers):
+                    fetch_q.put(_END)
+
+        def fetch_worker():
+            while True:
+                task = fetch_q.get()
+                if task is _END:
+                    break
+                seq, item = task
+                raw = _DROPPED
+                if not self.stopped:
+                    try:
+                        raw = self.fetch(item)
+                    except Exception as e:
+                        self._fail(e)
+                parse_q.put((seq, item, raw))
+            stage_done('fetch', parse_q, self.parse_workers)
+
+        def parse_worker():
+            while True:
+                task = parse_q.get()
+                if task is _END:
+                    break
+                seq, item, raw = task
+                result = _DROPPED
+                if raw is not _DROPPED and not self.stopped:
+                    try:
+                        result = pool.submit(self.parse, raw).result() if pool else self.parse(raw)
+                    except Exception as e:
+                        self._fail(e)
+                sink_q.put((seq, item, result))
+            stage_done('parse', sink_q, 1)
+
+        threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+        threads += [threading.Thread(target=fetch_worker, name=f"pipeline-fetch-{i}", daemon=True)
+                    for i in range(self.fetch_workers)]
+        threads += [threading.Thread(target=parse_worker, name=f"pipeline-parse-{i}", daemon=True)
+                    for i in range(self.parse_workers)]
+        for t in threads:
+            t.start()
+
+        delivered = 0
+        waiting = {}
+        next_seq = 0
+        task = None
+        try:
+            while True:
+                task = sink_q.get()
+                if task is _END:
+                    break
+                if not self.ordered:
+                    ready = [task]
+                else:
+                    # 순서 유지: 앞 번호가 도착할 때까지 max_inflight개 이내에서 기다린다.
+                    waiting[task[0]] = task
+                    ready = []
+                    while next_seq in waiting:
+                        ready.append(waiting.pop(next_seq))
+                        next_seq += 1
+                for seq, item, result in ready:
+                    if result is not _DROPPED and not self.stopped:
+                        try:
+                            self.sink(item, result)
+                            delivered += 1
+                        except Exception as e:
+                            self._fail(e)
+                    slots.release()
+        finally:
+            # 중간에 빠져나가도(Ctrl+C 등) 남은 항목을 흘려보내야 앞 단계가 끝난다.
+            if task is not _END:
+                self.stop()
+                while task is not _END:
+                    task = sink_q.get()
+                    if task is not _END:
+                        slots.release()
+            for t in threads:
+                t.join()
+
+        if self.error is not None:
+            raise self.error
+        return delivered
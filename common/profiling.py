@@ -0,0 +1,194 @@
+"""
+단계별 프로파일링 (plan_goods / sell_goods 공용)
+
+- --profile : 요청마다 단계별 구간(span)을 기록해 Chrome trace JSON으로 저장한다.
+  chrome://tracing 또는 https://ui.perfetto.dev 에서 파일을 열면 스레드별 타임라인으로 볼 수 있다.
+  단계: connect(새 TCP/TLS 연결), http(요청 전체) > ttfb(첫 바이트까지) / download(본문 수신),
+        encoding(문자셋 판별), parse(HTML 파싱), report / checkpoint / store(결과 기록) 등
+- --cprofile : 실행 전체를 cProfile로 측정한다. 작업 스레드도 wrap()으로 감싸면 함께 합산된다.
+  (Python 3.12부터는 프로파일러를 하나만 켤 수 있어 작업 스레드별 측정은 하지 않고 메인 스레드 측정만 남긴다.)
+  .prof(pstats 원본)와 누적 시간 상위 함수 목록(.txt)을 저장한다.
+
+기록하지 않을 때는 span()이 아무 일도 하지 않으므로 평소 실행에는 영향이 없다.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TOP_FUNCTIONS = 40
+# Python 3.12+는 cProfile이 sys.monitoring을 써서 메인 측정 중에 다른 Profile을 켜면
+# "Another profiling tool is already active" 오류가 난다.
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.threads = {}
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def _now_us(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def add(self, name, start_us, dur_us, cat="crawl", **args):
+        """이미 측정한 구간을 추가 (start_us는 _now_us() 기준)"""
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'ts': round(start_us, 1), 'dur': round(dur_us, 1),
+                 'pid': os.getpid(), 'tid': thread.ident}
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+            self.threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def span(self, name, cat="crawl", **args):
+        if not self.enabled:
+            yield
+            return
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.add(name, start, self._now_us() - start, cat, **args)
+
+    def write(self, path):
+        """Chrome trace JSON(traceEvents) 형식으로 저장하고 구간 수를 반환"""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        meta = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                for tid, name in threads.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': meta + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return len(events)
+
+    def stage_totals(self):
+        """단계 이름별 (횟수, 합계 ms) - 콘솔 요약용"""
+        totals = {}
+        with self.lock:
+            for event in self.events:
+                count, total = totals.get(event['name'], (0, 0.0))
+                totals[event['name']] = (count + 1, total + event['dur'] / 1000)
+        return totals
+
+
+# 프로세스 전체에서 하나만 쓴다. (enable_tracing() 전에는 기록하지 않음)
+TRACER = Tracer()
+_connect_patched = False
+
+
+def span(name, **args):
+    return TRACER.span(name, **args)
+
+
+def trace_response(response, started_us, attempt=1):
+    """
+    요청 한 번을 http 구간과 ttfb/download 하위 구간으로 기록
+    requests의 response.elapsed는 요청 전송부터 응답 헤더 수신까지의 시간이다.
+    """
+    if not TRACER.enabled:
+        return
+    total = TRACER._now_us() - started_us
+    TRACER.add('http', started_us, total, attempt=attempt,
+               status=getattr(response, 'status_code', None), bytes=len(response.content) if response is not None else 0)
+    if response is not None and response.elapsed:
+        ttfb = min(total, response.elapsed.total_seconds() * 1e6)
+        TRACER.add('ttfb', started_us, ttfb)
+        TRACER.add('download', started_us + ttfb, total - ttfb)
+
+
+def _instrument_connect():
+    """새 TCP/TLS 연결을 맺을 때마다 connect 구간을 기록 (urllib3 연결 객체 감싸기)"""
+    global _connect_patched
+    if _connect_patched:
+        return
+    try:
+        from urllib3.connection import HTTPConnection
+    except ImportError:
+        return
+    original = HTTPConnection.connect
+
+    def connect(self):
+        with TRACER.span('connect', host=getattr(self, 'host', None)):
+            return original(self)
+
+    HTTPConnection.connect = connect
+    _connect_patched = True
+
+
+def enable_tracing():
+    TRACER.enabled = True
+    _instrument_connect()
+
+
+def now_us():
+    return TRACER._now_us()
+
+
+def format_stage_totals():
+    totals = TRACER.stage_totals()
+    return ", ".join(f"{name} {count}회 {total:.0f}ms"
+                     for name, (count, total) in sorted(totals.items(), key=lambda kv: -kv[1][1]))
+
+
+class CProfileCollector:
+    """
+    메인 스레드와 wrap()으로 감싼 작업 스레드들을 각각 cProfile로 측정해 마지막에 합친다.
+    (cProfile은 스레드마다 따로 켜야 한다.)
+    [수정됨] Python 3.12+에서는 wrap()이 함수를 그대로 돌려주고 메인 스레드만 측정한다. (PER_THREAD_PROFILES)
+    """
+    def __init__(self):
+        self.main = cProfile.Profile()
+        self.profiles = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.main.enable()
+
+    def _thread_profile(self):
+        profile = getattr(self.local, 'profile', None)
+        if profile is None:
+            profile = self.local.profile = cProfile.Profile()
+            with self.lock:
+                self.profiles.append(profile)
+        return profile
+
+    def wrap(self, func):
+        if not PER_THREAD_PROFILES:
+            return func
+        def run(*args, **kwargs):
+            if threading.current_thread() is threading.main_thread():
+                return func(*args, **kwargs)
+            profile = self._thread_profile()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+        return run
+
+    def dump(self, base_path, top=TOP_FUNCTIONS):
+        """base_path.prof / base_path.txt(누적 시간 상위 함수) 저장"""
+        self.main.disable()
+        stats = pstats.Stats(self.main)
+        with self.lock:
+            for profile in self.profiles:
+                stats.add(profile)
+        stats.dump_stats(base_path + ".prof")
+        out = io.StringIO()
+        pstats.Stats(base_path + ".prof", stream=out).sort_stats("cumulative").print_stats(top)
+        with open(base_path + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        return base_path + ".prof", base_path + ".txt"
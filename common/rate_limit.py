@@ -0,0 +1,32 @@
+"""
+요청 속도 제한 (plan_goods / sell_goods 공용)
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    초당 요청 수(rps)를 제한하는 토큰 버킷
+    여러 스레드가 공유해도 전체 요청 속도가 rps를 넘지 않는다.
+    """
+    def __init__(self, rps, burst=1):
+        self.rps = float(rps) if rps else 0.0
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rps <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rps)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rps
+            time.sleep(wait)
@@ -0,0 +1,219 @@
+"""
+S2B 요청 재시도 / 지수 백오프 / 서킷 브레이커 (plan_goods / sell_goods 공용)
+
+- 오류 종류(시간 초과, 연결 끊김, 5xx, 429)별로 재시도 횟수와 대기 시간을 따로 정한다.
+- 재시도 대기는 지수 백오프 + full jitter: uniform(0, min(상한, 기본 * 2^시도)).
+- 4xx 등 재시도해도 결과가 같은 오류는 바로 돌려준다.
+- 서킷 브레이커: 연속 실패가 threshold회를 넘으면 호스트가 내려간 것으로 보고 모든 요청을 잠시 멈춘다.
+  처음 열린 뒤 닫히지 못한 채 max_pause초(실제 경과 시간)가 지나면 CircuitOpenError로 이번 실행을 포기하게 한다.
+  (CircuitOpenError는 조회 실패 결과로 바꾸지 말고 호출한 쪽까지 올려 보내야 한다. 요청을 보내지 않은 번호이다)
+- FailedQueue: 재시도 후에도 실패한 항목을 모아 두었다가 배치 끝에서 다시 시도한다.
+"""
+import random
+import threading
+import time
+from collections import namedtuple
+
+import requests
+
+from common.http_cache import cache_lookup, cache_store
+from common.profiling import now_us, trace_response
+from common.throttle import parse_retry_after
+
+# 재시도 정책: 최대 시도 횟수(첫 요청 포함) / 기본 대기(초) / 대기 상한(초)
+RetryPolicy = namedtuple("RetryPolicy", ["max_attempts", "base_delay", "max_delay"])
+
+DEFAULT_POLICIES = {
+    'timeout': RetryPolicy(3, 2.0, 30.0),
+    'connection': RetryPolicy(4, 2.0, 60.0),   # RemoteDisconnected, 연결 재설정 등
+    'server': RetryPolicy(3, 5.0, 60.0),       # 5xx
+    'throttled': RetryPolicy(4, 10.0, 120.0),  # 429
+}
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+DEFAULT_MAX_PAUSE = 300.0
+
+
+class CircuitOpenError(Exception):
+    """호스트 장애가 계속되어 더 이상 요청하지 않음"""
+
+
+def classify_error(exc=None, status=None):
+    """오류 종류 이름을 반환. 재시도할 필요가 없는 오류(4xx, 파싱 오류 등)나 정상 응답이면 None"""
+    if exc is not None:
+        if isinstance(exc, requests.exceptions.Timeout):
+            return 'timeout'
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                            ConnectionError)):
+            return 'connection'  # 연결 끊김/재설정, 본문 수신 중 끊김(IncompleteRead)
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            return classify_error(status=exc.response.status_code)
+        return None
+    if status == 429:
+        return 'throttled'
+    if status is not None and status >= 500:
+        return 'server'
+    return None
+
+
+def backoff_delay(attempt, policy):
+    """attempt번째(0부터) 재시도 전 대기 시간 (지수 백오프 + full jitter)"""
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    여러 스레드가 공유한다.
+    closed(정상) -> 연속 실패 threshold회 -> open(reset_timeout초 동안 요청 중지) -> half-open(시험 요청)
+    시험 요청이 성공하면 closed, 실패하면 대기 시간을 2배로 늘려 다시 open.
+    """
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT,
+                 max_pause=DEFAULT_MAX_PAUSE, on_open=None):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.max_pause = max_pause
+        self.on_open = on_open
+        self.failures = 0
+        self.open_until = 0.0
+        self.timeout = reset_timeout
+        # 이번 장애에서 처음 열린 시각 (성공하면 None). 기다리는 스레드 수와 관계없이 실제 경과 시간으로 판단한다.
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def before_request(self):
+        """열려 있으면 닫힐 때까지 기다린다. 처음 열린 뒤 max_pause초가 지났으면 CircuitOpenError"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if (self.max_pause is not None and self.opened_at is not None
+                        and now - self.opened_at >= self.max_pause):
+                    raise CircuitOpenError(f"호스트 장애로 {now - self.opened_at:.0f}초 동안 요청을 멈췄습니다.")
+                wait = self.open_until - now
+                if wait <= 0:
+                    return
+                wait = min(wait, 1.0)
+            time.sleep(wait)
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.timeout = self.reset_timeout
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures < self.failure_threshold or self.open_until > time.monotonic():
+                return
+            self.open_until = time.monotonic() + self.timeout
+            if self.opened_at is None:
+                self.opened_at = time.monotonic()
+            timeout = self.timeout
+            self.timeout = min(self.timeout * 2, self.max_pause or self.timeout * 2)
+        if self.on_open:
+            self.on_open(timeout)
+
+
+def request_with_retry(http, method, url, cache=None, policies=None, breaker=None, throttle=None,
+                       on_retry=None, metrics=None, limiter=None, cacheable=None, **kwargs):
+    """
+    cached_request에 재시도/백오프/서킷 브레이커를 더한 요청
+    - [수정됨] 캐시를 먼저 확인한다. 캐시에 있으면 브레이커/간격/예산을 거치지 않고 바로 돌려준다.
+      (네트워크로 보낸 요청만 속도 제한에 포함, cacheable은 http_cache.cache_store 참고)
+    - throttle(AdaptiveThrottle)이 있으면 시도마다 간격을 지키고 결과를 알려준다.
+    - limiter(rate_limit.RateLimiter)가 있으면 시도마다 예산을 1건씩 쓴다. (재시도도 초당 요청 수에 포함)
+    - on_retry(시도 횟수, 오류 종류, 대기 초)는 재시도 직전에 호출된다. (로그용)
+    - metrics(runlog.RunMetrics)가 있으면 시도마다 지연/바이트/오류 종류를 기록한다.
+    - 재시도가 모두 실패하면 마지막 예외를 다시 던지거나 마지막 응답(5xx/429)을 그대로 돌려준다.
+    """
+    policies = policies or DEFAULT_POLICIES
+    params, data = kwargs.get('params'), kwargs.get('data')
+    if cache is not None:
+        started = time.monotonic()
+        response = cache_lookup(cache, method, url, params, data)
+        if response is not None:
+            if metrics is not None:
+                metrics.record_request(time.monotonic() - started, None, len(response.content))
+            return response
+
+    attempt = 0
+    while True:
+        if breaker is not None:
+            breaker.before_request()
+        if throttle is not None:
+            throttle.acquire()
+        if limiter is not None:
+            limiter.acquire()
+
+        started = time.monotonic()
+        started_us = now_us()
+        response, error = None, None
+        try:
+            response = http.request(method, url, **kwargs)
+        except Exception as e:
+            error = e
+        latency = time.monotonic() - started
+        trace_response(response, started_us, attempt + 1)
+
+        error_class = classify_error(error) if error is not None else classify_error(status=response.status_code)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if metrics is not None:
+            if error is not None:
+                failure = error_class or type(error).__name__
+            elif response.status_code >= 400:
+                failure = error_class or f"http_{response.status_code}"
+            else:
+                failure = None
+            metrics.record_request(latency, failure, len(response.content) if response is not None else 0)
+        if throttle is not None:
+            throttle.record(latency, None if response is None else response.status_code,
+                            error=error is not None, retry_after=retry_after)
+
+        if error_class is None:
+            # 정상 응답이거나 재시도해도 소용없는 오류
+            if breaker is not None and error is None:
+                breaker.record_success()
+            if error is not None:
+                raise error
+            if cache is not None:
+                cache_store(cache, method, url, response, params, data, cacheable)
+            return response
+
+        if breaker is not None:
+            breaker.record_failure()
+        policy = policies.get(error_class)
+        attempt += 1
+        if policy is None or attempt >= policy.max_attempts:
+            if error is not None:
+                raise error
+            return response
+
+        delay = backoff_delay(attempt - 1, policy)
+        pause = parse_retry_after(retry_after)
+        if pause:
+            delay = max(delay, min(pause, policy.max_delay))
+        if on_retry:
+            on_retry(attempt, error_class, delay)
+        time.sleep(delay)
+
+
+class FailedQueue:
+    """재시도 후에도 실패한 항목(번호, 날짜 등)을 모아 두는 큐 (여러 스레드에서 add 가능)"""
+    def __init__(self):
+        self.items = []
+        self.lock = threading.Lock()
+
+    def add(self, item, error_class=None):
+        with self.lock:
+            self.items.append((item, error_class))
+
+    def drain(self):
+        """모아 둔 항목을 꺼내고 비운다. [(항목, 오류 종류), ...]"""
+        with self.lock:
+            items, self.items = self.items, []
+        return items
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
@@ -0,0 +1,176 @@
+"""
+실행 로그 / 진행 표시 / 실행 지표 (plan_goods / sell_goods 공용)
+
+- RunLogger: 이벤트를 JSON 한 줄씩 모아 두었다가 buffer_size개 또는 flush_interval초마다 한 번에 기록한다.
+- ProgressRenderer: 콘솔 진행 표시 전용 (로그 파일에는 남기지 않음). interval초에 한 번만 다시 그린다.
+- RunMetrics: 요청 수 / 성공 / 오류 종류별 실패 / 받은 바이트 / 지연 p50·p95·p99 / 초당 처리 건수
+  실행이 끝나면 summary()를 로그 마지막 이벤트로 남기고 append_history()로 실행 이력 파일에 한 줄 추가한다.
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+DEFAULT_BUFFER_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 5.0
+
+
+def _now():
+    return datetime.now().isoformat(timespec='milliseconds')
+
+
+class RunLogger:
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, **context):
+        """context(예: run='plan_goods', start=...)는 run_start 이벤트에 한 번 기록된다."""
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+        self.event('run_start', **context)
+
+    def event(self, event, **fields):
+        record = {'ts': _now(), 'event': event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= self.buffer_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def info(self, msg, **fields):
+        """콘솔에 출력하고 message 이벤트로 기록 (여러 스레드의 출력이 한 줄 안에서 섞이지 않게 한 번에 쓴다)"""
+        with self.lock:
+            sys.stdout.write(f"{msg}\n")
+            sys.stdout.flush()
+        self.event('message', msg=msg.strip(), **fields)
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.buffer and not self.file.closed:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.file.flush()
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self._flush_locked()
+            self.file.close()
+
+
+class ProgressRenderer:
+    """
+    [done/total] 진행 표시. 터미널이면 같은 줄을 interval초마다 다시 쓰고,
+    터미널이 아니면(CI 로그 등) 더 긴 간격으로 한 줄씩 쓴다.
+    """
+    def __init__(self, total, label="조회중", interval=None, stream=None):
+        self.total = total
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.interval = interval if interval is not None else (0.5 if self.tty else 10.0)
+        self.last = 0.0
+        self.shown = False
+        self.lock = threading.Lock()
+
+    def update(self, done, detail="", force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last < self.interval:
+                return
+            self.last = now
+            total = f"/{self.total}" if self.total else ""
+            line = f"[{done}{total}] {self.label}... {detail}"
+            self.stream.write(("\r" + line) if self.tty else (line + "\n"))
+            self.stream.flush()
+            self.shown = True
+
+    def finish(self, done=None, detail=""):
+        """done을 주면 마지막 상태를 한 번 더 그린 뒤 진행 표시를 끝낸다."""
+        if done is not None:
+            self.update(done, detail, force=True)
+        with self.lock:
+            if self.shown and self.tty:
+                self.stream.write("\n")
+                self.stream.flush()
+            self.shown = False
+
+
+def percentile(sorted_values, p):
+    """정렬된 값에서 p(0~100) 백분위수 (nearest-rank)"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class RunMetrics:
+    """여러 스레드에서 기록 가능"""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.successes = 0
+        self.failures = Counter()
+        self.bytes = 0
+        self.items = 0
+        self.latencies = []
+        self.lock = threading.Lock()
+
+    def record_request(self, latency, error_class=None, nbytes=0):
+        """요청 1회(재시도 포함 각 시도) 기록. error_class가 None이면 성공"""
+        with self.lock:
+            self.requests += 1
+            self.bytes += nbytes
+            self.latencies.append(latency)
+            if error_class is None:
+                self.successes += 1
+            else:
+                self.failures[error_class] += 1
+
+    def record_items(self, count=1):
+        with self.lock:
+            self.items += count
+
+    def summary(self, **extra):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            latencies = sorted(self.latencies)
+            result = {
+                'ts': _now(),
+                'elapsed_sec': round(elapsed, 3),
+                'requests': self.requests,
+                'successes': self.successes,
+                'failures': dict(self.failures),
+                'bytes': self.bytes,
+                'items': self.items,
+                'items_per_sec': round(self.items / elapsed, 3) if elapsed > 0 else None,
+            }
+            for p in (50, 95, 99):
+                value = percentile(latencies, p)
+                result[f'latency_p{p}_ms'] = round(value * 1000, 1) if value is not None else None
+        result.update(extra)
+        return result
+
+
+def format_summary(summary):
+    """콘솔용 한 줄 요약"""
+    failures = ", ".join(f"{k} {v}" for k, v in sorted(summary['failures'].items())) or "없음"
+    latency = ", ".join(f"p{p} {summary[f'latency_p{p}_ms']}ms" for p in (50, 95, 99)
+                        if summary[f'latency_p{p}_ms'] is not None) or "-"
+    return (f"요청 {summary['requests']}건 (성공 {summary['successes']}, 실패: {failures}) / "
+            f"{summary['bytes'] / 1024:.0f}KB / 지연 {latency} / "
+            f"{summary['items']}건, 초당 {summary['items_per_sec']}건")
+
+
+def append_history(path, summary):
+    """실행 이력 파일(JSONL)에 요약 한 줄 추가 - 실행별 처리량 추이 확인용"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
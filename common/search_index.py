@@ -0,0 +1,356 @@
+"""
+수집 결과 통합 검색 색인 (SQLite FTS5)
+
+plan_goods 물품(제목 / 카테고리 / 등록번호)과 sell_goods 계약(계약명 / 기관명 / 계약대상자)을
+하나의 색인에 모아 여러 실행에 걸친 결과를 바로 찾는다.
+
+- 입력
+  - plan_goods 결과 저장소(plan_goods_results.db): 마지막으로 색인한 fetched_at 이후 행만 읽는다.
+  - plan_goods_*.html 리포트 (이전 표 형식 / 현재 DATA 배열 형식 모두)
+  - sell_goods 결과 (s2b_result_*.xlsx, 체크포인트 s2b_result_*.jsonl, combined/)
+  - 파일은 수정 시각/크기를 기록해 두고 바뀐 파일만 다시 읽는다. 같은 번호는 덮어쓴다(upsert).
+- 한글은 띄어쓰기와 관계없이 부분 문자열로 찾는 경우가 많으므로 단어를 2글자 단위(bigram)로 나눠 색인한다.
+  예) "사무용의자" -> "사무 무용 용의 의자 자"
+  검색어도 같은 방식으로 나눠 연속된 구(phrase)로 찾으므로 2글자 이상이면 부분 문자열 검색, 1글자면 접두 검색이 된다.
+  숫자만 6자리 이상이면 물품번호/계약번호 앞자리로 찾는다.
+
+    python -m common.search_index build [--full]
+    python -m common.search_index query 의자 [--kind goods|contract] [--field title] [--since 20260101] [--limit 20]
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_PATH = os.path.join(REPO_DIR, "search_index.db")
+DEFAULT_GOODS_DB = os.path.join(REPO_DIR, "plan_goods_results.db")
+DEFAULT_REPORTS_DIR = REPO_DIR
+DEFAULT_CONTRACTS_DIR = os.path.join(REPO_DIR, "sell_goods")
+DEFAULT_LIMIT = 20
+BATCH_SIZE = 1000
+
+# 색인하는 본문 칸 (검색어 --field로 한 칸만 찾을 수 있다)
+FIELDS = ('title', 'category', 'org', 'vendor')
+DOC_COLUMNS = ('kind', 'key', 'date', 'title', 'category', 'org', 'vendor', 'ref', 'amount', 'link', 'source')
+
+KEY_QUERY = re.compile(r'^\d{6,}$')
+WORD = re.compile(r'\w+')
+
+# 이전(표 형식) plan_goods 리포트의 한 행
+LEGACY_ROW = re.compile(
+    r'<tr>\s*<td>(?:<img[^>]*>|<span class="no-data">[^<]*</span>)</td>\s*'
+    r'<td class="text-left">(?P<title>.*?)</td>\s*<td>(?P<navi>.*?)</td>\s*<td>\s*'
+    r'<a href="(?P<link>[^"]*f_re_estimate_code=(?P<code>\d+))"[^>]*>\s*(?P<reg>.*?)\s*</a>',
+    re.S)
+# 현재 리포트의 DATA 배열 한 줄 (report_writer._row_json)
+DATA_ROW = re.compile(r'^\[".*\]$')
+TAG = re.compile(r'<[^>]+>')
+
+
+def ngrams(text):
+    """색인/검색용 bigram 문자열 (단어마다 2글자씩 겹쳐 나누고 마지막 글자를 덧붙인다)"""
+    tokens = []
+    for word in WORD.findall((text or "").lower()):
+        if len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        tokens.append(word[-1])
+    return " ".join(tokens)
+
+
+def match_expression(query, field=None):
+    """검색어 -> FTS5 MATCH 식 (단어마다 bigram 구, 단어끼리는 AND)"""
+    parts = []
+    for word in WORD.findall(query.lower()):
+        if len(word) == 1:
+            parts.append(f'"{word}"*')
+        else:
+            parts.append('"' + " ".join(word[i:i + 2] for i in range(len(word) - 1)) + '"')
+    if not parts:
+        return None
+    expression = " AND ".join(parts)
+    return f"{field} : ({expression})" if field else expression
+
+
+def report_rows(text):
+    """
+    plan_goods_*.html 리포트 본문에서 결과 행을 하나씩 반환 (이전 표 형식 / 현재 DATA 배열 형식 모두)
+    결과 저장소 goods 표와 같은 키: code, success, image_url, font_content_1, navi_text, font_content_2,
+    detail_link, error_msg (이전 표 형식에는 이미지 주소가 없다)
+    """
+    if "var DATA = [" in text:
+        for line in text.split("var DATA = [", 1)[1].split("\n"):
+            line = line.strip().rstrip(",")
+            if not DATA_ROW.match(line):
+                continue
+            row = json.loads(line.replace("<\\/", "</"))
+            yield {'code': row[0], 'success': row[1], 'image_url': row[2], 'font_content_1': row[3],
+                   'navi_text': row[4], 'font_content_2': row[5], 'detail_link': row[6], 'error_msg': row[7]}
+    else:
+        for m in LEGACY_ROW.finditer(text):
+            title = html.unescape(TAG.sub("", m.group('title'))).strip()
+            success = title != "(정보 없음)"
+            yield {'code': m.group('code'), 'success': 1 if success else 0, 'image_url': "",
+                   'font_content_1': title if success else "", 'navi_text': html.unescape(m.group('navi')).strip(),
+                   'font_content_2': html.unescape(m.group('reg')).strip(),
+                   'detail_link': html.unescape(m.group('link')), 'error_msg': "" if success else title}
+
+
+def _clean(value):
+    if value is None:
+        return ""
+    value = str(value)
+    return "" if value == "nan" else value.strip()
+
+
+class SearchIndex:
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                date TEXT,
+                title TEXT, category TEXT, org TEXT, vendor TEXT,
+                ref TEXT, amount TEXT, link TEXT, source TEXT,
+                UNIQUE(kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_docs_key ON docs(key);
+            CREATE INDEX IF NOT EXISTS idx_docs_date ON docs(date);
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5({', '.join(FIELDS)}, tokenize='unicode61');
+            CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, rows INTEGER);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def clear(self):
+        with self.db:
+            self.db.execute("DELETE FROM docs")
+            self.db.execute("DELETE FROM docs_fts")
+            self.db.execute("DELETE FROM sources")
+            self.db.execute("DELETE FROM meta")
+
+    def upsert(self, docs):
+        """docs: DOC_COLUMNS 키를 가진 dict 목록. 같은 (kind, key)는 새 값으로 덮어쓴다. 기록한 수를 반환"""
+        count = 0
+        with self.db:
+            for doc in docs:
+                values = [_clean(doc.get(c)) for c in DOC_COLUMNS]
+                row = self.db.execute("SELECT id FROM docs WHERE kind = ? AND key = ?", values[:2]).fetchone()
+                if row:
+                    doc_id = row[0]
+                    self.db.execute(f"UPDATE docs SET {', '.join(f'{c} = ?' for c in DOC_COLUMNS[2:])} WHERE id = ?",
+                                    values[2:] + [doc_id])
+                    self.db.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+                else:
+                    doc_id = self.db.execute(
+                        f"INSERT INTO docs ({', '.join(DOC_COLUMNS)}) VALUES ({', '.join('?' for _ in DOC_COLUMNS)})",
+                        values).lastrowid
+                self.db.execute(f"INSERT INTO docs_fts (rowid, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                                [doc_id] + [ngrams(doc.get(f)) for f in FIELDS])
+                count += 1
+        return count
+
+    def _upsert_batches(self, docs):
+        total, batch = 0, []
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) >= BATCH_SIZE:
+                total += self.upsert(batch)
+                batch = []
+        return total + self.upsert(batch)
+
+    # --- 입력 ---
+
+    def _changed(self, path):
+        stat = os.stat(path)
+        row = self.db.execute("SELECT mtime, size FROM sources WHERE path = ?", (path,)).fetchone()
+        return row is None or row[0] != stat.st_mtime or row[1] != stat.st_size
+
+    def _mark(self, path, rows):
+        stat = os.stat(path)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sources (path, mtime, size, rows) VALUES (?, ?, ?, ?)",
+                            (path, stat.st_mtime, stat.st_size, rows))
+
+    def index_goods_db(self, db_path=DEFAULT_GOODS_DB):
+        """plan_goods 결과 저장소에서 지난번 이후 저장된(fetched_at) 성공 행만 색인"""
+        if not os.path.exists(db_path):
+            return 0
+        name = f"goods_db:{os.path.abspath(db_path)}"
+        row = self.db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        since = row[0] if row else ""
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        latest = since
+        try:
+            cursor = source.execute(
+                "SELECT code, font_content_1, navi_text, font_content_2, detail_link, fetched_at FROM goods "
+                "WHERE success = 1 AND fetched_at >= ? ORDER BY fetched_at", (since,))
+
+            def docs():
+                nonlocal latest
+                for code, title, navi, reg, link, fetched_at in cursor:
+                    latest = max(latest, fetched_at)
+                    if title or navi or reg:
+                        yield {'kind': 'goods', 'key': code, 'date': code[:8], 'title': title, 'category': navi,
+                               'ref': reg, 'link': link, 'source': os.path.basename(db_path)}
+
+            count = self._upsert_batches(docs())
+        finally:
+            source.close()
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, latest))
+        return count
+
+    def index_report(self, path):
+        """plan_goods_*.html 리포트 1개 색인"""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        source = os.path.basename(path)
+        docs = [{'kind': 'goods', 'key': row['code'], 'date': row['code'][:8], 'title': row['font_content_1'],
+                 'category': row['navi_text'], 'ref': row['font_content_2'], 'link': row['detail_link'],
+                 'source': source}
+                for row in report_rows(text)
+                if row['success'] and (row['font_content_1'] or row['navi_text'] or row['font_content_2'])]
+        return self._upsert_batches(docs)
+
+    def index_contract_file(self, path):
+        """sell_goods 결과 xlsx / 체크포인트 jsonl 1개 색인 (읽기는 xls_sum.read_input 재사용)"""
+        sys.path.insert(0, os.path.join(REPO_DIR, "sell_goods"))
+        from xls_sum import read_input
+
+        df = read_input(path)
+        if df.empty or '계약번호' not in df.columns:
+            return 0
+        source = os.path.basename(path)
+
+        def docs():
+            for row in df.to_dict('records'):
+                key = _clean(row.get('계약번호'))
+                if not key:
+                    continue
+                digits = re.sub(r'[^0-9]', '', key)
+                yield {'kind': 'contract', 'key': key, 'date': digits[:8], 'title': row.get('계약명'),
+                       'category': row.get('계약구분'), 'org': row.get('기관명'), 'vendor': row.get('계약대상자'),
+                       'amount': row.get('금액'), 'ref': row.get('계약일'), 'source': source}
+
+        return self._upsert_batches(docs())
+
+    def build(self, goods_db=DEFAULT_GOODS_DB, reports_dir=DEFAULT_REPORTS_DIR, contracts_dir=DEFAULT_CONTRACTS_DIR,
+              full=False, log=print):
+        """모든 입력을 증분 색인하고 {입력 종류: 색인한 행 수}를 반환"""
+        if full:
+            self.clear()
+        counts = {'goods_db': self.index_goods_db(goods_db), 'reports': 0, 'contracts': 0, 'files': 0}
+        files = []
+        if reports_dir:
+            files += [('reports', p) for p in sorted(glob.glob(os.path.join(reports_dir, "plan_goods_*.html")))]
+        if contracts_dir:
+            for pattern in ("s2b_result_*.xlsx", "s2b_result_*.jsonl", os.path.join("combined", "s2b_result_*.xlsx")):
+                files += [('contracts', p) for p in sorted(glob.glob(os.path.join(contracts_dir, pattern)))
+                          if not os.path.basename(p).startswith("~$")]
+        for kind, path in files:
+            if not self._changed(path):
+                continue
+            try:
+                rows = self.index_report(path) if kind == 'reports' else self.index_contract_file(path)
+            except Exception as e:
+                log(f"   [건너뜀] {os.path.basename(path)}: {e}")
+                continue
+            self._mark(path, rows)
+            counts[kind] += rows
+            counts['files'] += 1
+        return counts
+
+    # --- 검색 ---
+
+    def search(self, query, kind=None, field=None, since=None, until=None, limit=DEFAULT_LIMIT):
+        """dict 목록 반환 (관련도순, 같으면 최신 날짜 먼저)"""
+        conditions, params = [], []
+        if KEY_QUERY.match(query.strip()):
+            # 번호 앞자리 검색 (색인 대신 key 인덱스 사용)
+            sql = f"SELECT {', '.join(DOC_COLUMNS)} FROM docs d WHERE key >= ? AND key < ?"
+            params = [query.strip(), query.strip() + "\uffff"]
+            order = "ORDER BY key"
+        else:
+            expression = match_expression(query, field)
+            if expression is None:
+                return []
+            sql = (f"SELECT {', '.join('d.' + c for c in DOC_COLUMNS)} FROM docs_fts f JOIN docs d ON d.id = f.rowid "
+                   f"WHERE docs_fts MATCH ?")
+            params = [expression]
+            order = "ORDER BY bm25(docs_fts), d.date DESC"
+        if kind:
+            conditions.append("d.kind = ?")
+            params.append(kind)
+        if since:
+            conditions.append("d.date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("d.date <= ?")
+            params.append(until)
+        for condition in conditions:
+            sql += f" AND {condition}"
+        rows = self.db.execute(f"{sql} {order} LIMIT ?", params + [limit]).fetchall()
+        return [dict(zip(DOC_COLUMNS, row)) for row in rows]
+
+    def count(self):
+        return dict(self.db.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind").fetchall())
+
+    def close(self):
+        self.db.close()
+
+
+def format_hit(doc):
+    if doc['kind'] == 'goods':
+        return f"[물품] {doc['key']}  {doc['title']}  | {doc['category']}  | 등록번호 {doc['ref']}\n        {doc['link']}"
+    return (f"[계약] {doc['key']}  {doc['title']}  | {doc['org']}  | {doc['vendor']}  | {doc['amount']}원"
+            f"  | {doc['ref'] or doc['date']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집 결과 통합 검색 색인")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="색인 파일 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="새로 생긴/바뀐 결과만 색인에 추가")
+    build.add_argument("--goods-db", default=DEFAULT_GOODS_DB, help="plan_goods 결과 저장소")
+    build.add_argument("--reports-dir", default=DEFAULT_REPORTS_DIR, help="plan_goods_*.html 리포트 폴더")
+    build.add_argument("--contracts-dir", default=DEFAULT_CONTRACTS_DIR, help="sell_goods 결과 폴더")
+    build.add_argument("--full", action="store_true", help="색인을 비우고 처음부터 다시 만들기")
+
+    query = sub.add_parser("query", help="검색")
+    query.add_argument("text", help="검색어 (여러 단어는 모두 포함, 숫자 6자리 이상은 번호 앞자리)")
+    query.add_argument("--kind", choices=("goods", "contract"), help="물품 / 계약만")
+    query.add_argument("--field", choices=FIELDS, help="한 칸에서만 찾기 (title, category, org, vendor)")
+    query.add_argument("--since", metavar="YYYYMMDD", help="이 날짜 이후")
+    query.add_argument("--until", metavar="YYYYMMDD", help="이 날짜 이전")
+    query.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="최대 결과 수")
+    args = parser.parse_args()
+
+    index = SearchIndex(args.index)
+    try:
+        started = time.perf_counter()
+        if args.command == "build":
+            counts = index.build(args.goods_db, args.reports_dir, args.contracts_dir, full=args.full)
+            print(f" [색인] 저장소 {counts['goods_db']}건 / 리포트 {counts['reports']}건 / 계약 {counts['contracts']}건 "
+                  f"(파일 {counts['files']}개, {time.perf_counter() - started:.1f}초) → 전체 {index.count()}")
+        else:
+            hits = index.search(args.text, kind=args.kind, field=args.field, since=args.since, until=args.until,
+                                limit=args.limit)
+            for doc in hits:
+                print(format_hit(doc))
+            print(f" [검색] {len(hits)}건 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+서버 상태에 맞춰 요청 간격을 조절하는 적응형 속도 제어 (AIMD)
+
+- 응답이 빠르고 정상이면 간격을 step초씩 줄인다. (가산 증가: 속도를 조금씩 올림)
+- 응답이 느리면(slow_latency 초과) 간격을 조금 늘린다.
+- 오류(예외, 5xx, 429)면 간격을 backoff배로 늘린다. (승산 감소: 속도를 크게 낮춤)
+- Retry-After 헤더가 있으면 그 시간 동안은 요청하지 않는다.
+- 간격은 항상 floor ~ ceiling 초 사이이며, 일정한 주기로 보이지 않도록 jitter를 섞는다. (jitter를 섞어도 floor 아래로는 줄지 않음)
+- 기본값은 예전 고정 대기(10~20초)와 같은 속도다. 더 빠르게 하려면 floor를 명시적으로 낮춘다. (sell_goods --min-delay)
+- 여러 스레드가 하나를 공유하면 전체 요청 간격이 지켜진다.
+"""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# [수정됨] 기본 하한은 예전 고정 대기의 최솟값(10초), 시작은 평균(15초)이다. (서버가 빨라도 예전보다 자주 요청하지 않음)
+DEFAULT_FLOOR = 10.0
+DEFAULT_CEILING = 120.0
+DEFAULT_START = 15.0
+DEFAULT_STEP = 0.5
+DEFAULT_BACKOFF = 2.0
+DEFAULT_SLOW_LATENCY = 5.0
+DEFAULT_JITTER = 0.2
+
+THROTTLE_STATUS = (429, 503)
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 변환, 해석할 수 없으면 None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveThrottle:
+    def __init__(self, floor=DEFAULT_FLOOR, ceiling=DEFAULT_CEILING, start=DEFAULT_START, step=DEFAULT_STEP,
+                 backoff=DEFAULT_BACKOFF, slow_latency=DEFAULT_SLOW_LATENCY, jitter=DEFAULT_JITTER):
+        self.floor = max(0.0, float(floor))
+        self.ceiling = max(self.floor, float(ceiling))
+        self.delay = min(self.ceiling, max(self.floor, float(start)))
+        self.step = step
+        self.backoff = backoff
+        self.slow_latency = slow_latency
+        self.jitter = jitter
+        self.last_at = None
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """직전 요청으로부터 현재 간격만큼 지날 때까지 대기 (호출 순서대로 시각을 배정받는다)"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.blocked_until)
+            if self.last_at is not None:
+                gap = max(self.floor, self.delay * random.uniform(1 - self.jitter, 1 + self.jitter))
+                start = max(start, self.last_at + gap)
+            self.last_at = start
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, latency=None, status=None, error=False, retry_after=None):
+        """
+        요청 결과를 반영해 간격을 조절하고 새 간격(초)을 반환
+        status: HTTP 상태 코드, error: 예외(연결 끊김/시간 초과 등) 여부, retry_after: Retry-After 헤더 값
+        """
+        with self.lock:
+            failed = error or (status is not None and (status >= 500 or status in THROTTLE_STATUS))
+            if failed:
+                self.delay = min(self.ceiling, max(self.delay, self.floor or 1.0) * self.backoff)
+            elif latency is not None and latency > self.slow_latency:
+                self.delay = min(self.ceiling, self.delay * 1.25)
+            else:
+                self.delay = max(self.floor, self.delay - self.step)
+
+            pause = parse_retry_after(retry_after)
+            if pause:
+                pause = min(pause, self.ceiling)
+                self.delay = min(self.ceiling, max(self.delay, pause))
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            return self.delay
@@ -0,0 +1,215 @@
+"""
+견적(물품) 번호 공간 탐색 스케줄러
+
+번호는 '등록일자(YYYYMMDD) + 일련번호' 구조이다. (예: 20260206 6861620)
+- 창(window) 단위로 동시에 조회하며 앞으로 진행한다.
+- 연속으로 빈 번호(정보 없음)가 dead_run개 이상 나오면 2, 4, 8... 간격으로 건너뛰며(갤럽) 살아있는 번호를 찾고,
+  찾으면 마지막 빈 번호와의 사이를 이분 탐색해 첫 번째 살아있는 번호부터 다시 순차 조회한다.
+- 마지막 살아있는 번호에서 max_gap 이상 떨어질 때까지 아무것도 없으면 최신 등록 번호(프런티어)에 도달한 것으로 본다.
+  이때 등록일자가 오늘보다 이전이면 다음 날짜 접두어로 같은 일련번호 구간을 확인한다.
+- 조회 실패(재시도할 수 있는 일시 오류)는 빈 번호로 취급하지 않는다. 순차 조회 / 갤럽 / 이분 탐색 어디서든 확인하지 못한
+  번호가 나오면 거기서 멈추고 그 번호를 다음 시작 번호로 돌려준다. (실패한 번호를 건너뛰지 않는다)
+- 다시 조회해도 소용없는 실패(4xx, 파싱 오류 등 error_class가 없는 결과)는 확인이 끝난 번호로 보고 빈 번호처럼 지나간다.
+  (결과는 저장소에 실패로 남는다)
+- 같은 번호에서 max_attempts번의 실행이 연달아 멈추면(attempts로 이전 횟수를 넘겨받음) 그 번호는 포기하고 빈 번호처럼 지나간다.
+  (계속 5xx를 돌려주는 번호 하나 때문에 매 실행이 같은 자리에서 멈추지 않도록)
+- 이미 조회한 번호는 결과 전체가 아니라 상태(live/dead/failed)만 기억한다. (결과는 fetch_batch 쪽에서 바로 저장)
+"""
+from datetime import datetime, timedelta
+
+DATE_LEN = 8
+DEFAULT_WINDOW = 20
+DEFAULT_DEAD_RUN = 12
+DEFAULT_MAX_GAP = 2000
+# 같은 번호에서 멈춘 실행이 이 횟수가 되면 그 번호를 건너뛴다.
+DEFAULT_MAX_ATTEMPTS = 5
+
+# 번호 상태
+LIVE = 'live'
+DEAD = 'dead'
+FAILED = 'failed'
+
+
+def split_code(code):
+    """번호를 (등록일자, 일련번호, 일련번호 자릿수)로 나눈다."""
+    code = str(code)
+    return code[:DATE_LEN], int(code[DATE_LEN:]), len(code) - DATE_LEN
+
+
+def join_code(date_str, seq, width):
+    return f"{date_str}{seq:0{width}d}"
+
+
+def next_date(date_str):
+    return (datetime.strptime(date_str, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+
+def is_live(result):
+    """실제 물품 정보가 있는 번호인지"""
+    return bool(result.get('success')) and any(
+        result.get(k) for k in ('font_content_1', 'navi_text', 'font_content_2'))
+
+
+def is_dead(result):
+    """정상 응답이지만 물품 정보가 없는 번호인지 (조회 실패는 제외)"""
+    return bool(result.get('success')) and not is_live(result)
+
+
+def code_state(result):
+    if is_live(result):
+        return LIVE
+    if is_dead(result):
+        return DEAD
+    # [수정됨] 다시 조회해도 소용없는 실패는 확인이 끝난 번호로 본다. (일시 오류만 FAILED)
+    return FAILED if result.get('error_class') else DEAD
+
+
+class CodeProber:
+    """
+    fetch_batch(codes) -> 입력 순서대로의 결과 리스트
+    한 번의 run()에서 budget건 이하로만 요청한다.
+    fetch_batch가 예외(호스트 장애 CircuitOpenError 등)로 중단되면 resume_code부터 다시 조회하면 된다.
+    attempts는 {번호: 그 번호 실패로 멈춘 이전 실행 수}, 실패로 멈추면 실패한 번호가 stalled_code에 남는다.
+    """
+    def __init__(self, fetch_batch, window=DEFAULT_WINDOW, dead_run=DEFAULT_DEAD_RUN,
+                 max_gap=DEFAULT_MAX_GAP, today=None, attempts=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.fetch_batch = fetch_batch
+        self.window = max(1, window)
+        self.dead_run = max(1, dead_run)
+        self.max_gap = max_gap
+        self.today = today or datetime.now().strftime("%Y%m%d")
+        self.states = {}
+        self.used = 0
+        self.live = 0
+        # 여기 앞까지는 확인이 끝났거나 의도적으로 건너뛴 번호 (조회 직전에 갱신)
+        self.resume_code = None
+        self.attempts = attempts or {}
+        self.max_attempts = max(1, max_attempts)
+        self.stalled_code = None
+        self.skipped = []
+
+    def _fetch(self, date_str, seqs, width):
+        """번호별 상태 목록. 이미 조회한 번호(갤럽/이분 탐색 중 확인)는 다시 요청하지 않는다."""
+        codes = [join_code(date_str, seq, width) for seq in seqs]
+        missing = [code for code in codes if code not in self.states]
+        if missing:
+            self.used += len(missing)
+            for code, result in zip(missing, self.fetch_batch(missing)):
+                state = code_state(result)
+                if state == FAILED and self.attempts.get(code, 0) + 1 >= self.max_attempts:
+                    # 여러 실행째 같은 번호에서 멈춤: 포기하고 지나간다.
+                    state = DEAD
+                    self.skipped.append(code)
+                self.states[code] = state
+                if state == LIVE:
+                    self.live += 1
+        return [self.states[code] for code in codes]
+
+    def _probe(self, date_str, seq, width):
+        return self._fetch(date_str, [seq], width)[0]
+
+    def run(self, start_code, budget):
+        """
+        start_code부터 budget건 이내로 탐색
+        반환: (다음 실행 시작 번호, 프런티어 도달 여부) - 살아있는 번호 수는 self.live
+        """
+        date_str, pos, width = split_code(start_code)
+        last_live = pos - 1
+        dead_streak = 0
+        frontier = False
+
+        while self.used < budget:
+            # 1. 순차 조회 (창 단위 동시 조회)
+            size = min(self.window, budget - self.used)
+            seqs = list(range(pos, pos + size))
+            self.resume_code = join_code(date_str, pos, width)
+            for seq, state in zip(seqs, self._fetch(date_str, seqs, width)):
+                if state == LIVE:
+                    last_live = seq
+                    dead_streak = 0
+                elif state == DEAD:
+                    dead_streak += 1
+                else:
+                    # 네트워크 오류: 다음 실행이 이 번호부터 다시 조회한다.
+                    return self._stall(join_code(date_str, seq, width), join_code(date_str, seq, width))
+            pos += size
+
+            if dead_streak < self.dead_run:
+                continue
+
+            # 2. 빈 구간 갤럽 탐색
+            lo = pos - 1
+            step = 2
+            hi = None
+            while self.used < budget:
+                probe = lo + step
+                if probe - last_live > self.max_gap:
+                    break
+                self.resume_code = join_code(date_str, lo + 1, width)
+                state = self._probe(date_str, probe, width)
+                if state == LIVE:
+                    hi = probe
+                    break
+                if state != DEAD:
+                    # 네트워크 오류: 확인하지 못한 구간은 건너뛰지 않는다.
+                    return self._stall(join_code(date_str, probe, width), join_code(date_str, lo + 1, width))
+                lo = probe
+                step *= 2
+
+            if hi is None:
+                if self.used >= budget:
+                    pos = lo + 1
+                    break
+                # 3. 프런티어 도달: 이전 날짜면 다음 날짜 접두어 확인
+                rolled = self._try_next_date(date_str, last_live + 1, width, budget)
+                if rolled is None:
+                    frontier = True
+                    pos = last_live + 1
+                    break
+                date_str, pos, last_live = rolled
+                dead_streak = 0
+                continue
+
+            # 4. 이분 탐색으로 빈 구간 끝(첫 번째 살아있는 번호) 찾기
+            while hi - lo > 1 and self.used < budget:
+                mid = (lo + hi) // 2
+                self.resume_code = join_code(date_str, lo + 1, width)
+                state = self._probe(date_str, mid, width)
+                if state == LIVE:
+                    hi = mid
+                elif state == DEAD:
+                    lo = mid
+                else:
+                    return self._stall(join_code(date_str, mid, width), join_code(date_str, lo + 1, width))
+            if hi - lo > 1:
+                # 예산 소진으로 이분 탐색 미완료: 확인된 곳까지만 진행
+                pos = lo + 1
+                break
+            last_live = hi
+            dead_streak = 0
+            pos = hi + 1
+
+        return self._finish(join_code(date_str, pos, width), frontier)
+
+    def _try_next_date(self, date_str, seq, width, budget):
+        """오늘 이전 날짜의 끝이면 다음 날짜 접두어로 같은 일련번호 구간을 확인"""
+        candidate = next_date(date_str)
+        if candidate > self.today:
+            return None
+        size = min(self.dead_run, budget - self.used)
+        if size <= 0:
+            return None
+        seqs = list(range(seq, seq + size))
+        self.resume_code = join_code(date_str, seq, width)
+        live = [s for s, state in zip(seqs, self._fetch(candidate, seqs, width)) if state == LIVE]
+        if not live:
+            return None
+        return candidate, seqs[-1] + 1, live[-1]
+
+    def _stall(self, failed_code, next_code):
+        """failed_code 조회 실패로 멈춤: next_code부터 다시 조회하게 한다."""
+        self.stalled_code = failed_code
+        return self._finish(next_code, False)
+
+    def _finish(self, next_code, frontier):
+        return next_code, frontier
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.pipeline import Pipeline
+from common.rate_limit import RateLimiter
+
+# 기본 동시 요청 수 / 초당 요청 수(호스트 기준)
+DEFAULT_WORKERS = 4
+DEFAULT_RPS = 4.0
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """
+    keep-alive 연결을 재사용하는 공용 Session 생성
+    동시 요청 수만큼 커넥션 풀을 잡아 매 요청마다 TCP/TLS 연결을 새로 맺지 않도록 한다.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def stream_all(codes, fetch_func, parse_func=None, on_result=None, workers=DEFAULT_WORKERS, rps=DEFAULT_RPS,
+               session=None, limiter=None, parse_pool=None, parse_workers=1, max_inflight=None):
+    """
+    [추가됨] codes를 조회 -> 파싱 -> on_result 파이프라인(common/pipeline.py)으로 처리하고 처리 건수를 반환
+    결과를 모아 두지 않으므로 codes가 제너레이터면 건수와 관계없이 메모리는 일정하다.
+
+    - fetch_func(code, session, limiter) -> 원본, parse_func(원본) -> 결과 (parse_func가 None이면 원본이 결과)
+      fetch_func는 요청을 보낼 때마다(재시도 포함) limiter.acquire()를 부른다. (request_with_retry(limiter=...))
+    - parse_pool(pipeline.create_parse_pool())을 넘기면 파싱을 parse_workers개 프로세스에서 실행한다.
+      (parse_func는 pickle 가능해야 함)
+    - on_result(index, result)는 완료되는 순서대로 한 스레드에서만 호출된다.
+    - rps 예산은 모든 스레드가 공유한다. 여러 번 호출하며 예산을 이어가려면 limiter를 넘긴다.
+    """
+    own_session = session is None
+    if own_session:
+        session = create_session(workers)
+    if limiter is None:
+        limiter = RateLimiter(rps, burst=workers)
+
+    def fetch(task):
+        return fetch_func(task[1], session, limiter)
+
+    def sink(task, result):
+        if on_result:
+            on_result(task[0], result)
+
+    pipeline = Pipeline(fetch, parse_func or _identity, sink, fetch_workers=workers,
+                        parse_workers=parse_workers, parse_pool=parse_pool, max_inflight=max_inflight)
+    try:
+        return pipeline.run(enumerate(codes))
+    finally:
+        if own_session:
+            session.close()
+
+
+def _identity(raw):
+    return raw
+
+
+def fetch_all(codes, fetch_func, workers=DEFAULT_WORKERS, rps=DEFAULT_RPS, session=None, on_result=None, limiter=None,
+              parse_func=None, parse_pool=None, parse_workers=1):
+    """
+    codes를 workers개 동시 요청으로 조회하고 입력 순서대로 결과 리스트를 반환 (stream_all 참고)
+    결과를 모두 모으므로 작은 묶음(probe 창 등)에만 쓴다.
+    """
+    codes = list(codes)
+    results = [None] * len(codes)
+
+    def collect(index, result):
+        results[index] = result
+        if on_result:
+            on_result(index, result)
+
+    stream_all(codes, fetch_func, parse_func, collect, workers=workers, rps=rps, session=session, limiter=limiter,
+               parse_pool=parse_pool, parse_workers=parse_workers)
+    return results
@@ -0,0 +1,148 @@
+"""
+plan_goods 리포트용 로컬 이미지 캐시 (--thumbs)
+
+- 리포트에 들어갈 이미지 URL을 동시에(workers개) 내려받고, 내용 해시(sha256)로 중복을 없앤다.
+  같은 이미지를 쓰는 물품이 많아도 파일은 하나만 저장된다.
+- Pillow가 있으면 작은 썸네일(JPEG)로 줄여 저장하고, 없으면 원본을 그대로 저장한다.
+- index.json에 URL -> 파일 이름을 기록하므로 이미 받은 URL은 다시 요청하지 않는다.
+- 리포트는 원격 URL 대신 로컬 파일을 참조하므로 오프라인에서도 바로 열린다.
+  (받지 못한 이미지는 원격 URL을 그대로 쓴다.)
+
+    cache = ImageCache("plan_goods_images")
+    cache.fetch_missing(urls, session)
+    cache.local_path(url, 리포트 폴더)  # 리포트 기준 상대 경로 또는 None
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.pipeline import Pipeline
+from common.retry import request_with_retry
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+DEFAULT_IMAGE_DIR = "plan_goods_images"
+DEFAULT_IMAGE_WORKERS = 8
+# 리포트 이미지 칸(127px)의 2배 (고해상도 화면용)
+THUMB_SIZE = 254
+THUMB_QUALITY = 80
+INDEX_FILE = "index.json"
+
+# 파일 앞부분 -> 확장자 (Pillow 없이 원본을 저장할 때)
+MAGIC_EXTENSIONS = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"RIFF", ".webp"),
+    (b"BM", ".bmp"),
+)
+
+
+def guess_extension(content):
+    for magic, ext in MAGIC_EXTENSIONS:
+        if content.startswith(magic):
+            return ext
+    return ".img"
+
+
+def make_thumbnail(content):
+    """
+    (sha256, 저장할 bytes, 확장자) - 파이프라인 파싱 단계
+    해시는 원본 기준이므로 같은 이미지는 썸네일 여부와 관계없이 한 파일이 된다.
+    """
+    sha = hashlib.sha256(content).hexdigest()
+    if HAS_PIL:
+        try:
+            with Image.open(io.BytesIO(content)) as img:
+                img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+                out = io.BytesIO()
+                img.convert("RGB").save(out, "JPEG", quality=THUMB_QUALITY, optimize=True)
+                return sha, out.getvalue(), ".jpg"
+        except Exception:
+            pass  # 읽을 수 없는 형식이면 원본 저장
+    return sha, content, guess_extension(content)
+
+
+class ImageCache:
+    def __init__(self, image_dir=DEFAULT_IMAGE_DIR, workers=DEFAULT_IMAGE_WORKERS):
+        self.image_dir = image_dir
+        self.workers = max(1, workers)
+        os.makedirs(image_dir, exist_ok=True)
+        self.index_path = os.path.join(image_dir, INDEX_FILE)
+        # urls: URL -> 파일 이름, files: sha256 -> 파일 이름
+        self.index = {'urls': {}, 'files': {}}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        self.stats = {'downloaded': 0, 'duplicate': 0, 'failed': 0}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def fetch_missing(self, urls, session, limiter=None, breaker=None):
+        """
+        아직 받지 않은 URL만 내려받아 저장하고 새로 저장한 파일 수를 반환
+        내려받기(스레드) -> 해시/썸네일 -> 저장 파이프라인이며 동시에 처리 중인 이미지 수는 제한된다.
+        """
+        todo = []
+        seen = set()
+        for url in urls:
+            if url and url not in self.index['urls'] and url not in seen:
+                seen.add(url)
+                todo.append(url)
+        if not todo:
+            return 0
+
+        def download(url):
+            try:
+                response = request_with_retry(session, 'GET', url, breaker=breaker, limiter=limiter, timeout=30)
+                response.raise_for_status()
+                return response.content
+            except Exception:
+                return None
+
+        def thumbnail(content):
+            return None if not content else make_thumbnail(content)
+
+        saved = [0]
+
+        def store(url, made):
+            if made is None:
+                self.stats['failed'] += 1
+                return
+            sha, data, ext = made
+            name = self.index['files'].get(sha)
+            if name is None:
+                name = sha[:32] + ext
+                with open(os.path.join(self.image_dir, name), "wb") as f:
+                    f.write(data)
+                self.index['files'][sha] = name
+                self.stats['downloaded'] += 1
+                saved[0] += 1
+            else:
+                self.stats['duplicate'] += 1
+            self.index['urls'][url] = name
+
+        try:
+            Pipeline(download, thumbnail, store, fetch_workers=self.workers).run(todo)
+        finally:
+            self._save_index()
+        return saved[0]
+
+    def local_path(self, url, report_dir="."):
+        """리포트 파일 폴더 기준 상대 경로 (받은 적 없는 URL이면 None)"""
+        name = self.index['urls'].get(url) if url else None
+        if name is None:
+            return None
+        return os.path.relpath(os.path.join(self.image_dir, name), report_dir).replace(os.sep, "/")
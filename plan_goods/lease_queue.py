@@ -0,0 +1,259 @@
+"""
+plan_goods 연속 조회(--worker)용 번호 구간 임대 큐 (SQLite)
+
+- 번호 공간을 shard_size개씩 구간(shard)으로 잘라 작업자(프로세스)에게 임대(lease)한다.
+  다음에 잘라 줄 번호(프런티어)는 큐 파일에 남으므로 다시 시작해도 이어서 진행한다.
+- 구간 할당/갱신은 BEGIN IMMEDIATE 트랜잭션 안에서 하므로 여러 프로세스가 같은 파일을 써도 구간이 겹치지 않는다.
+- 작업자는 처리한 위치(position)를 주기적으로 기록(checkpoint)하며 임대 기한을 연장한다.
+  작업자가 죽어 기한(ttl)이 지난 구간은 다른 작업자가 넘겨받아 기록된 위치부터 이어서 조회한다.
+  (빠지는 번호 없음 / 이미 처리한 앞부분은 다시 조회하지 않음)
+- 기한이 지나 다른 작업자에게 넘어갔거나 프런티어 대기로 지워진 구간의 기록/완료는 거부된다. (LeaseLost)
+- 마지막 물품 이후 max_gap개 번호가 모두 빈 완료 구간이면 최신 등록 번호(프런티어)에 도달한 것으로 본다. (code_probe.py와 같은 기준)
+  등록일자가 오늘 이전이면 다음 날짜 접두어의 같은 일련번호로 넘어가고,
+  오늘이면 마지막 물품 뒤의 구간을 지우고 idle_wait초 뒤에 그 자리부터 다시 조회한다.
+
+    queue = LeaseQueue("plan_goods_queue.db")
+    queue.seed("202602066861620")
+    lease = queue.acquire("worker-1")   # 할당할 구간이 없으면(대기 중) None
+    queue.checkpoint(lease, position, live)
+    queue.complete(lease, live, failed)
+"""
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+
+from code_probe import DEFAULT_MAX_GAP, join_code, next_date, split_code
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_QUEUE_PATH = os.path.join(REPO_DIR, "plan_goods_queue.db")
+DEFAULT_SHARD_SIZE = 500
+DEFAULT_LEASE_TTL = 300
+DEFAULT_IDLE_WAIT = 600
+
+# 구간 상태
+LEASED = 'leased'
+DONE = 'done'
+
+
+class LeaseLost(Exception):
+    """구간이 다른 작업자에게 넘어갔거나(임대 기한 초과) 프런티어 대기로 지워졌다."""
+
+
+class Lease:
+    def __init__(self, start_code, end_code, position, token, worker, attempts, live=0, failed=0):
+        self.start_code = start_code
+        self.end_code = end_code  # 미포함
+        self.position = position  # 이 번호부터 조회 (앞부분은 이전 작업자가 처리)
+        self.token = token
+        self.worker = worker
+        self.attempts = attempts
+        # 이전 작업자가 기록한 물품 / 실패 수 (이어서 센다)
+        self.live = live
+        self.failed = failed
+
+    def codes(self):
+        return (str(code) for code in range(int(self.position), int(self.end_code)))
+
+    def __repr__(self):
+        return f"Lease({self.start_code}~{self.end_code}, position={self.position}, attempts={self.attempts})"
+
+
+class LeaseQueue:
+    def __init__(self, path=DEFAULT_QUEUE_PATH, shard_size=DEFAULT_SHARD_SIZE, ttl=DEFAULT_LEASE_TTL,
+                 max_gap=DEFAULT_MAX_GAP, idle_wait=DEFAULT_IDLE_WAIT, today=None):
+        self.path = path
+        self.shard_size = max(1, shard_size)
+        self.ttl = ttl
+        self.max_gap = max_gap
+        self.idle_wait = idle_wait
+        self.today = today
+        # 트랜잭션을 직접 관리한다. (BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡는다)
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS shards (
+                start_code TEXT PRIMARY KEY,
+                end_code TEXT NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                token TEXT,
+                expires_at REAL,
+                position TEXT NOT NULL,
+                live INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_shards_state ON shards(state, expires_at)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS queue_meta (name TEXT PRIMARY KEY, value TEXT)")
+
+    def _today(self):
+        return self.today or datetime.now().strftime("%Y%m%d")
+
+    def _transaction(self):
+        return _Immediate(self.db)
+
+    def _get(self, name):
+        row = self.db.execute("SELECT value FROM queue_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO queue_meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    @property
+    def frontier(self):
+        return self._get('frontier')
+
+    def seed(self, start_code):
+        """프런티어가 없을 때만 시작 번호를 기록하고 현재 프런티어를 반환 (이미 있으면 이어서 진행)"""
+        with self._transaction():
+            if self._get('frontier') is None and start_code:
+                self._set('frontier', start_code)
+            return self._get('frontier')
+
+    def resume_at(self):
+        """프런티어 대기가 끝나는 시각 (time.time() 기준, 대기 중이 아니면 0)"""
+        return float(self._get('resume_at') or 0)
+
+    def acquire(self, worker):
+        """기한이 지난 구간을 먼저 넘겨받고, 없으면 프런티어에서 새 구간을 잘라 준다. (대기 중이면 None)"""
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._transaction():
+            row = self.db.execute("""
+                SELECT start_code, end_code, position, attempts, live, failed FROM shards
+                WHERE state = ? AND expires_at < ? ORDER BY start_code LIMIT 1""", (LEASED, now)).fetchone()
+            if row is not None:
+                start_code, end_code, position, attempts, live, failed = row
+                attempts += 1
+                self.db.execute("""
+                    UPDATE shards SET worker = ?, token = ?, expires_at = ?, attempts = ?, updated_at = ?
+                    WHERE start_code = ?""", (worker, token, now + self.ttl, attempts, _stamp(), start_code))
+                return Lease(start_code, end_code, position, token, worker, attempts, live, failed)
+
+            frontier = self._get('frontier')
+            if frontier is None or now < float(self._get('resume_at') or 0):
+                return None
+            date_str, seq, width = split_code(frontier)
+            end_code = join_code(date_str, seq + self.shard_size, width)
+            if len(end_code) != len(frontier):
+                raise ValueError(f"일련번호 자릿수를 넘었습니다: {frontier} + {self.shard_size}")
+            self.db.execute("""
+                INSERT INTO shards (start_code, end_code, state, worker, token, expires_at, position, attempts, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)""",
+                            (frontier, end_code, LEASED, worker, token, now + self.ttl, frontier, _stamp()))
+            self._set('frontier', end_code)
+            return Lease(frontier, end_code, frontier, token, worker, 1)
+
+    def checkpoint(self, lease, position, live=0, failed=0):
+        """position 앞까지 처리 완료로 기록하고 기한을 연장 (구간을 잃었으면 LeaseLost)"""
+        with self._transaction():
+            cursor = self.db.execute("""
+                UPDATE shards SET position = ?, live = ?, failed = ?, expires_at = ?, updated_at = ?
+                WHERE start_code = ? AND token = ? AND state = ?""",
+                                     (str(position), live, failed, time.time() + self.ttl, _stamp(),
+                                      lease.start_code, lease.token, LEASED))
+            if cursor.rowcount == 0:
+                raise LeaseLost(f"{lease.start_code}~{lease.end_code}")
+        lease.position = str(position)
+
+    def release(self, lease):
+        """중단할 때 기한을 바로 끝내 다른 작업자가 기다리지 않고 이어받게 한다."""
+        with self._transaction():
+            self.db.execute("UPDATE shards SET expires_at = 0 WHERE start_code = ? AND token = ? AND state = ?",
+                            (lease.start_code, lease.token, LEASED))
+
+    def complete(self, lease, live, failed=0):
+        """
+        구간 완료 기록 (구간을 잃었으면 LeaseLost)
+        반환: 프런티어 처리 결과 None / ('rolled', 새 프런티어) / ('idle', 다시 조회할 번호, 대기 끝 시각)
+        """
+        with self._transaction():
+            cursor = self.db.execute("""
+                UPDATE shards SET state = ?, position = end_code, live = ?, failed = ?, expires_at = NULL,
+                    updated_at = ? WHERE start_code = ? AND token = ? AND state = ?""",
+                                     (DONE, live, failed, _stamp(), lease.start_code, lease.token, LEASED))
+            if cursor.rowcount == 0:
+                raise LeaseLost(f"{lease.start_code}~{lease.end_code}")
+            return self._settle_frontier()
+
+    def _settle_frontier(self):
+        """
+        마지막 물품 이후 max_gap개가 모두 빈 완료 구간이면 다음 날짜로 넘어가거나 대기한다. (트랜잭션 안에서 호출)
+        여러 작업자가 앞서 나가 맨 끝 구간은 대개 조회 중이므로, 맨 끝이 아니라 마지막 물품(또는 실패)이 있던 구간부터 센다.
+        """
+        frontier = self._get('frontier')
+        date_str, _, width = split_code(frontier)
+        date_from = join_code(date_str, 0, width)
+        # 조회 실패가 남은 구간은 빈 구간으로 보지 않는다. (code_probe.py와 같음)
+        row = self.db.execute("""
+            SELECT end_code FROM shards WHERE start_code >= ? AND start_code < ? AND (live > 0 OR failed > 0)
+            ORDER BY start_code DESC LIMIT 1""", (date_from, frontier)).fetchone()
+        if row is None:
+            # 이 날짜에서 아직 아무것도 찾지 못함: 이 날짜의 첫 구간부터 센다.
+            row = self.db.execute("SELECT MIN(start_code) FROM shards WHERE start_code >= ? AND start_code < ?",
+                                  (date_from, frontier)).fetchone()
+        empty_from = row[0] if row else None
+        if empty_from is None or int(frontier) - int(empty_from) < self.max_gap:
+            return None
+
+        covered = int(empty_from)
+        for start_code, end_code, state in self.db.execute("""
+                SELECT start_code, end_code, state FROM shards WHERE start_code >= ? AND start_code < ?
+                ORDER BY start_code LIMIT ?""", (empty_from, frontier, self.max_gap // self.shard_size + 2)):
+            if state != DONE or int(start_code) != covered:
+                break
+            covered = int(end_code)
+        if covered - int(empty_from) < self.max_gap:
+            return None
+
+        seq = split_code(empty_from)[1]
+        candidate = next_date(date_str)
+        if candidate <= self._today():
+            # 이전 날짜의 끝: 다음 날짜 접두어의 같은 일련번호부터 (빈 구간은 완료로 남긴다)
+            rolled = join_code(candidate, seq, width)
+            self._set('frontier', rolled)
+            return ('rolled', rolled)
+        # 오늘 등록분의 끝: 마지막 물품 뒤의 구간은 나중에 다시 조회하도록 지우고 잠시 쉰다.
+        # (그 뒤를 조회 중인 작업자는 완료 기록 시 LeaseLost를 받고 다음 구간으로 넘어간다)
+        resume_at = time.time() + self.idle_wait
+        self.db.execute("DELETE FROM shards WHERE start_code >= ? AND start_code < ?", (empty_from, frontier))
+        self._set('frontier', empty_from)
+        self._set('resume_at', resume_at)
+        return ('idle', empty_from, resume_at)
+
+    def status(self):
+        """{'frontier', 'resume_at', 'done', 'leased', 'expired', 'live', 'failed'}"""
+        now = time.time()
+        with self._transaction():
+            done, live, failed = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(live), 0), COALESCE(SUM(failed), 0) FROM shards WHERE state = ?",
+                (DONE,)).fetchone()
+            leased, expired = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(expires_at < ?), 0) FROM shards WHERE state = ?",
+                (now, LEASED)).fetchone()
+            return {'frontier': self._get('frontier'), 'resume_at': float(self._get('resume_at') or 0),
+                    'done': done, 'leased': leased, 'expired': expired, 'live': live, 'failed': failed}
+
+    def close(self):
+        self.db.close()
+
+
+class _Immediate:
+    """BEGIN IMMEDIATE ... COMMIT (예외면 ROLLBACK)"""
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _stamp():
+    return datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,241 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# 상세 페이지에서 찾는 대상
+NAVI_ICON_SRC = "/S2BNCustomer/S2B/scrweb/images/remu/icon_navi_view.gif"
+FONT_CLASS = "f12_b_black"
+DETAIL_IMG_CLASS = "detail_img"
+DETAIL_IMG_HEIGHT = "276"
+IMAGE_BASE_URL = "https://www.s2b.kr"
+
+# 문서 맨 앞 XML 선언 (lxml은 encoding이 들어 있는 str 입력을 거부한다)
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+# 스트리밍 파서가 한 번에 넣는 글자 수
+STREAM_CHUNK_SIZE = 8192
+
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+])
+
+
+def has_detail_marker(content):
+    """
+    원본(bytes)에 물품 정보 표시(네비 아이콘 / 제목 font)가 있는지 (파싱 없이 확인)
+    응답 캐시는 이 값이 참인 페이지만 저장한다. (정보 없음 페이지는 나중에 물품이 등록될 수 있음)
+    """
+    return NAVI_ICON_SRC.encode("ascii") in content or FONT_CLASS.encode("ascii") in content
+
+
+def _empty_fields():
+    return {'navi_text': "", 'font_content_1': "", 'font_content_2': "", 'image_url': ""}
+
+
+def _join_stripped(strings):
+    """bs4 get_text(strip=True)와 같은 규칙으로 문자열을 합친다."""
+    return "".join(s.strip() for s in strings if s.strip())
+
+
+def parse_detail_bs4(html, builder='html.parser'):
+    """
+    [기준 구현] 전체 BeautifulSoup 트리를 만들어 추출
+    다른 백엔드는 이 결과와 동일해야 한다.
+    """
+    soup = BeautifulSoup(html, builder)
+    fields = _empty_fields()
+
+    # 1. 네비게이션 텍스트 (카테고리)
+    icon_img = soup.find('img', attrs={'src': NAVI_ICON_SRC})
+    fields['navi_text'] = icon_img.parent.get_text(strip=True) if icon_img else ""
+
+    # 2. 폰트 내용 추출 (1번째: 제목, 2번째: 등록번호)
+    font_tags = soup.find_all('font', class_=FONT_CLASS)
+    fields['font_content_1'] = font_tags[0].get_text(strip=True) if len(font_tags) >= 1 else ""
+    fields['font_content_2'] = font_tags[1].get_text(strip=True) if len(font_tags) >= 2 else ""
+
+    # 3. 이미지 URL 추출
+    td_img_container = soup.find('td', class_=DETAIL_IMG_CLASS, height=DETAIL_IMG_HEIGHT)
+    if td_img_container:
+        detail_img = td_img_container.find('img')
+        if detail_img and 'src' in detail_img.attrs:
+            fields['image_url'] = urljoin(IMAGE_BASE_URL, detail_img['src'])
+
+    return fields
+
+
+def parse_detail_bs4_lxml(html):
+    """BeautifulSoup + lxml 트리 빌더 (추출 로직은 기준 구현과 동일)"""
+    return parse_detail_bs4(html, builder='lxml')
+
+
+def _lxml_text(el):
+    return _join_stripped(el.itertext())
+
+
+def parse_detail_lxml(html):
+    """
+    lxml 트리 + XPath로 필요한 노드만 조회
+    [수정됨] 빈 문서 / XML 선언이 있는 문서도 기준 구현처럼 빈 항목을 돌려준다. (오류로 끝내지 않음)
+    """
+    fields = _empty_fields()
+    html = XML_DECLARATION.sub("", html, count=1)
+    if not html.strip():
+        return fields
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except lxml.etree.ParserError:
+        # 태그 없이 주석/공백뿐인 문서 ("Document is empty")
+        return fields
+
+    icon_parent = doc.xpath('(//img[@src=$src])[1]/..', src=NAVI_ICON_SRC)
+    if icon_parent:
+        fields['navi_text'] = _lxml_text(icon_parent[0])
+
+    class_test = 'contains(concat(" ", normalize-space(@class), " "), $cls)'
+    font_tags = doc.xpath('//font[%s]' % class_test, cls=" %s " % FONT_CLASS)[:2]
+    if len(font_tags) >= 1:
+        fields['font_content_1'] = _lxml_text(font_tags[0])
+    if len(font_tags) >= 2:
+        fields['font_content_2'] = _lxml_text(font_tags[1])
+
+    td_img_container = doc.xpath('(//td[%s][@height=$height])[1]' % class_test,
+                                 cls=" %s " % DETAIL_IMG_CLASS, height=DETAIL_IMG_HEIGHT)
+    if td_img_container:
+        detail_img = td_img_container[0].xpath('(.//img)[1]')
+        if detail_img and detail_img[0].get('src') is not None:
+            fields['image_url'] = urljoin(IMAGE_BASE_URL, detail_img[0].get('src'))
+
+    return fields
+
+
+class _DetailTokenizer(HTMLParser):
+    """
+    필요한 4개 항목만 추적하는 스트리밍 토크나이저
+    모든 항목을 찾으면 done이 True가 되어 나머지 문서는 읽지 않는다.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields = _empty_fields()
+        self.stack = []          # 열린 태그 [(tag, 텍스트 시작 위치)]
+        self.texts = []          # 네비 부모를 찾기 전까지의 텍스트 조각
+        self.navi_state = 0      # 0: 찾는 중, 1: 부모 텍스트 수집 중, 2: 완료
+        self.navi_depth = 0
+        self.navi_start = 0
+        self.fonts = []          # 수집 완료된 font 텍스트
+        self.font_depth = None   # 수집 중인 font의 스택 깊이
+        self.font_texts = []
+        self.img_state = 0       # 0: 찾는 중, 1: td 안, 2: 완료
+        self.img_depth = 0
+        self.done = False
+
+    def _has_class(self, attrs, name):
+        return name in (attrs.get('class') or "").split()
+
+    def _check_done(self):
+        self.done = self.navi_state == 2 and len(self.fonts) >= 2 and self.img_state == 2
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'img':
+            if self.navi_state == 0 and attrs.get('src') == NAVI_ICON_SRC and self.stack:
+                self.navi_state = 1
+                self.navi_depth = len(self.stack)
+                self.navi_start = self.stack[-1][1]
+            if self.img_state == 1:
+                src = attrs.get('src')
+                self.fields['image_url'] = urljoin(IMAGE_BASE_URL, src) if src is not None else ""
+                self.img_state = 2
+                self._check_done()
+            return
+        if tag in VOID_TAGS:
+            return
+
+        self.stack.append((tag, len(self.texts)))
+        if tag == 'font' and self.font_depth is None and len(self.fonts) < 2 and self._has_class(attrs, FONT_CLASS):
+            self.font_depth = len(self.stack)
+            self.font_texts = []
+        elif (tag == 'td' and self.img_state == 0 and attrs.get('height') == DETAIL_IMG_HEIGHT
+              and self._has_class(attrs, DETAIL_IMG_CLASS)):
+            self.img_state = 1
+            self.img_depth = len(self.stack)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # 짝이 맞는 태그까지 닫는다. 짝이 없으면 무시 (bs4 html.parser와 동일)
+        for pos in range(len(self.stack) - 1, -1, -1):
+            if self.stack[pos][0] == tag:
+                break
+        else:
+            return
+        while len(self.stack) > pos:
+            self._close_top()
+        self._check_done()
+
+    def _close_top(self):
+        depth = len(self.stack)
+        if self.navi_state == 1 and depth == self.navi_depth:
+            self.fields['navi_text'] = _join_stripped(self.texts[self.navi_start:])
+            self.navi_state = 2
+            self.texts = []
+        if self.font_depth == depth:
+            self.fonts.append(_join_stripped(self.font_texts))
+            key = 'font_content_1' if len(self.fonts) == 1 else 'font_content_2'
+            self.fields[key] = self.fonts[-1]
+            self.font_depth = None
+        if self.img_state == 1 and depth == self.img_depth:
+            self.img_state = 2
+        self.stack.pop()
+
+    def handle_data(self, data):
+        if self.navi_state < 2:
+            self.texts.append(data)
+        if self.font_depth is not None:
+            self.font_texts.append(data)
+
+    def finish(self):
+        self.close()
+        while self.stack:
+            self._close_top()
+        return self.fields
+
+
+def parse_detail_stream(html):
+    """필요한 항목을 모두 찾으면 즉시 멈추는 스트리밍 파서"""
+    tokenizer = _DetailTokenizer()
+    for pos in range(0, len(html), STREAM_CHUNK_SIZE):
+        tokenizer.feed(html[pos:pos + STREAM_CHUNK_SIZE])
+        if tokenizer.done:
+            return tokenizer.fields
+    return tokenizer.finish()
+
+
+# 백엔드 이름 -> 파싱 함수
+PARSERS = {
+    'bs4': parse_detail_bs4,
+    'stream': parse_detail_stream,
+}
+if HAS_LXML:
+    PARSERS['bs4-lxml'] = parse_detail_bs4_lxml
+    PARSERS['lxml'] = parse_detail_lxml
+
+DEFAULT_PARSER = 'lxml' if HAS_LXML else 'bs4'
+
+
+def parse_detail(html, backend=DEFAULT_PARSER):
+    """선택한 백엔드로 상세 페이지를 파싱해 4개 항목 dict를 반환"""
+    return PARSERS[backend](html)
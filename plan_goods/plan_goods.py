@@ -1,268 +1,463 @@
+import argparse
 import requests
+import socket
+import subprocess
 import sys
+import time
 import webbrowser
 import os
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from functools import partial
+
+# 저장소 루트의 공용 모듈(common/) 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.encoding import decode_body
+from common.http_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_AGE_DAYS, CacheMiss, ResponseCache
+from common.pipeline import create_parse_pool
+from common.retry import CircuitBreaker, CircuitOpenError, FailedQueue, classify_error, request_with_retry
+from common.profiling import TRACER, CProfileCollector, enable_tracing, format_stage_totals, span
+from common.runlog import ProgressRenderer, RunLogger, RunMetrics, append_history, format_summary
+from code_probe import DEFAULT_DEAD_RUN, DEFAULT_MAX_ATTEMPTS, DEFAULT_MAX_GAP, DEFAULT_WINDOW, CodeProber, is_live
+from fetch_engine import DEFAULT_RPS, DEFAULT_WORKERS, RateLimiter, create_session, fetch_all, stream_all
+from lease_queue import (DEFAULT_IDLE_WAIT, DEFAULT_LEASE_TTL, DEFAULT_QUEUE_PATH, DEFAULT_SHARD_SIZE, LeaseLost,
+                         LeaseQueue)
+from image_cache import DEFAULT_IMAGE_DIR, DEFAULT_IMAGE_WORKERS, HAS_PIL, ImageCache
+from parsers import DEFAULT_PARSER, PARSERS, has_detail_marker, parse_detail
+from report_writer import create_html_report
+from result_store import DEFAULT_DB_PATH, ResultStore
+
+# S2B_BASE_URL 환경변수로 접속 주소를 바꿀 수 있다. (예: 벤치마크용 로컬 서버 bench/stub_server.py)
+S2B_HOST = os.environ.get("S2B_BASE_URL", "https://www.s2b.kr").rstrip("/")
+DETAIL_PATH = "/S2BNCustomer/rema100No.do"
 
 # 기본 조회 횟수
 DEFAULT_COUNT = 10 
+# 배치 끝에서 실패 번호를 다시 조회하는 횟수
+DEFAULT_RETRY_ROUNDS = 1
 
-# [추가됨] 화면 출력과 파일 저장을 동시에 수행하는 클래스
-class DualLogger:
-    def __init__(self, filename):
-        self.terminal = sys.stdout
-        self.log = open(filename, "w", encoding='utf-8')
-    
-    def write(self, message):
-        self.terminal.write(message) # 화면에 출력
-        self.log.write(message)      # 파일에 기록
-    
-    def flush(self):
-        self.terminal.flush()
-        self.log.flush()
+# 실행 지표 이력 (실행마다 요약 한 줄 추가)
+METRICS_HISTORY_FILE = "plan_goods_metrics_history.jsonl"
+# [worker] 이 건수마다 (또는 임대 기한의 1/4이 지나면) 처리 위치를 큐에 기록
+CHECKPOINT_EVERY = 50
 
-def extract_s2b_info(estimate_code):
+# [수정됨] DualLogger(모든 print를 파일로 복사) 대신 구조화 로그(common/runlog.py)를 사용한다.
+# 진행 표시 줄은 콘솔에만 출력하고 로그 파일에는 이벤트만 남긴다.
+run_logger = None
+
+def log(msg, **fields):
+    """콘솔 출력 + 실행 로그(JSONL) 기록 (로그 파일을 열기 전에는 콘솔에만 출력)"""
+    if run_logger is not None:
+        run_logger.info(msg, **fields)
+    else:
+        print(msg)
+
+def fetch_s2b_detail(estimate_code, session=None, limiter=None, cache=None, breaker=None, metrics=None):
     """
-    S2B 물품 상세 페이지에서 정보를 추출하는 함수
+    [추가됨] S2B 물품 상세 페이지 원본을 받아오는 함수 (파이프라인 조회 단계)
+    session을 넘기면 keep-alive 연결을 재사용한다.
+    limiter(RateLimiter)를 넘기면 재시도를 포함해 요청마다 초당 요청 수 예산을 쓴다.
+    cache(ResponseCache)를 넘기면 원본 응답을 캐시에 저장/재사용한다. (물품 정보가 없는 페이지는 저장하지 않음)
+    일시적인 오류(시간 초과/연결 끊김/5xx/429)는 재시도하며, breaker(CircuitBreaker)는 모든 스레드가 공유한다.
+    metrics(RunMetrics)를 넘기면 요청별 지연/바이트/오류 종류를 기록한다.
+    반환: {'code', 'content'(bytes), 'content_type', 'success': True} 또는 실패 결과 dict
+    호스트 장애로 브레이커가 포기하면(CircuitOpenError) 실패 결과 대신 예외를 그대로 올려 배치를 멈춘다.
     """
-    base_url = "https://www.s2b.kr/S2BNCustomer/rema100No.do"
+    base_url = f"{S2B_HOST}{DETAIL_PATH}"
     params = {
         'forwardName': 'detail',
         'f_re_estimate_code': estimate_code
     }
     
-    full_detail_url = f"{base_url}?forwardName=detail&f_re_estimate_code={estimate_code}"
-    
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     }
     
     try:
-        response = requests.get(base_url, params=params, headers=headers)
+        http = session if session is not None else requests
+        response = request_with_retry(http, 'GET', base_url, cache=cache, breaker=breaker, metrics=metrics,
+                                      limiter=limiter, cacheable=lambda r: has_detail_marker(r.content),
+                                      params=params, headers=headers, timeout=30)
         response.raise_for_status()
-        response.encoding = response.apparent_encoding 
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return {'code': estimate_code, 'content': response.content,
+                'content_type': response.headers.get('Content-Type'), 'success': True}
+
+    except CircuitOpenError:
+        raise  # 요청을 보내지 않은 번호: 실패로 기록하면 다음 실행이 건너뛴다.
+    except Exception as e:
+        return failed_result(estimate_code, e)
+
+def parse_s2b_detail(fetched, parser=DEFAULT_PARSER):
+    """
+    [추가됨] fetch_s2b_detail 결과를 리포트/저장소용 결과 dict로 변환 (파이프라인 파싱 단계)
+    parser는 parsers.PARSERS의 백엔드 이름. --parse-processes 사용 시 별도 프로세스에서 실행된다.
+    """
+    estimate_code = fetched['code']
+    if not fetched.get('success'):
+        return fetched
+    try:
+        with span('encoding', code=estimate_code):
+            # [수정됨] 매번 apparent_encoding(본문 전체 탐지) 대신 헤더 / 지난번 문자셋 / <meta> 순으로 판별 (common/encoding.py)
+            html = decode_body(fetched['content'], DETAIL_PATH, fetched.get('content_type'))
         
         result = {
             'code': estimate_code,
-            'detail_link': full_detail_url,
+            'detail_link': f"{S2B_HOST}{DETAIL_PATH}?forwardName=detail&f_re_estimate_code={estimate_code}",
             'success': True
         }
-
-        # 1. 네비게이션 텍스트 (카테고리)
-        icon_src = "/S2BNCustomer/S2B/scrweb/images/remu/icon_navi_view.gif"
-        icon_img = soup.find('img', attrs={'src': icon_src})
-        result['navi_text'] = icon_img.parent.get_text(strip=True) if icon_img else ""
-
-        # 2. 폰트 내용 추출 (1번째: 제목, 2번째: 등록번호)
-        font_tags = soup.find_all('font', class_='f12_b_black')
-        result['font_content_1'] = font_tags[0].get_text(strip=True) if len(font_tags) >= 1 else ""
-        result['font_content_2'] = font_tags[1].get_text(strip=True) if len(font_tags) >= 2 else ""
-
-        # 3. 이미지 URL 추출
-        td_img_container = soup.find('td', class_='detail_img', height='276')
-        if td_img_container:
-            detail_img = td_img_container.find('img')
-            if detail_img and 'src' in detail_img.attrs:
-                result['image_url'] = urljoin("https://www.s2b.kr", detail_img['src'])
-            else:
-                result['image_url'] = ""
-        else:
-            result['image_url'] = ""
+        # 카테고리 / 제목 / 등록번호 / 이미지 URL (parsers.py 참고)
+        with span('parse', code=estimate_code, parser=parser):
+            result.update(parse_detail(html, parser))
 
         return result
 
     except Exception as e:
-        return {
-            'code': estimate_code,
-            'success': False,
-            'error_msg': str(e)
-        }
+        return failed_result(estimate_code, e)
+
+def failed_result(estimate_code, e):
+    return {
+        'code': estimate_code,
+        'success': False,
+        'error_msg': str(e),
+        'error_class': classify_error(e),  # None이면 다시 조회해도 소용없는 오류
+        'cache_miss': isinstance(e, CacheMiss)  # 재생 모드에서 캐시에 없던 번호 (조회 결과가 아님)
+    }
 
-# [수정됨] 파일명을 외부에서 받도록 매개변수 추가 (file_name_to_save)
-def create_html_report(data_list, start_code, search_count, file_name_to_save):
+def update_param_file(param_file, next_code, search_count, stall=None):
     """
-    HTML 파일 생성 함수
+    다음 실행 시작 번호를 파라미터 파일에 기록 (plan_goods_run.sh가 읽는다)
+    [추가됨] stall=(번호, 횟수): 일시 오류로 그 번호에서 멈춘 연속 실행 수 (--probe가 max_attempts에서 건너뜀)
     """
-    
-    rows_html = ""
-    for data in data_list:
-        if data['success']:
-            img_html = f'<img src="{data["image_url"]}" class="product-img">' if data.get('image_url') else '<span class="no-data">이미지 없음</span>'
-            title = data.get('font_content_1', '-')
-            category = data.get('navi_text', '-')
-            reg_no = data.get('font_content_2', '-')
-            link = data.get('detail_link')
-            
-            if not title and not category and not reg_no:
-                 title = "<span style='color:#999'>(정보 없음)</span>"
-            
-            row = f"""
-            <tr>
-                <td>{img_html}</td>
-                <td class="text-left">{title}</td>
-                <td>{category}</td>
-                <td>
-                    <a href="{link}" target="_blank" title="상세보기">
-                        {reg_no}
-                    </a>
-                </td>
-            </tr>
-            """
+    with open(param_file, "w", encoding="utf-8") as f:
+        f.write(f"goods_num={next_code}\n")
+        f.write(f"count={search_count}\n")
+        if stall:
+            f.write(f"stall_code={stall[0]}\n")
+            f.write(f"stall_count={stall[1]}\n")
+    log(f"?? 파라미터 업데이트: goods_num={next_code} / count={search_count}"
+        + (f" / {stall[0]}에서 멈춘 실행 {stall[1]}회" if stall else ""))
+
+def prepare_images(args, rows, report_file):
+    """
+    [추가됨] --thumbs: 리포트에 들어갈 이미지를 로컬 캐시(image_cache.py)에 받아 두고
+    create_html_report에 넘길 이미지 경로 변환 함수를 반환 (재생 모드는 이미 받은 이미지만 사용)
+    """
+    if not HAS_PIL:
+        # [수정됨] 썸네일을 기대한 실행이 원본 크기 이미지를 쌓지 않도록 처음에 분명히 알린다.
+        log("?? 경고: Pillow가 설치되어 있지 않아 --thumbs가 썸네일 대신 원본 이미지를 저장합니다. "
+            "(pip install -r plan_goods/plan_goods_requirements.txt)")
+    report_dir = os.path.dirname(os.path.abspath(report_file))
+    image_cache = ImageCache(args.image_dir or os.path.join(report_dir, DEFAULT_IMAGE_DIR), workers=args.image_workers)
+    if not args.replay:
+        session = create_session(args.image_workers)
+        limiter = RateLimiter(args.rps, burst=args.image_workers)
+        try:
+            saved = image_cache.fetch_missing((row.get('image_url') for row in rows if row.get('success')),
+                                              session, limiter)
+        finally:
+            session.close()
+        stats = image_cache.stats
+        log(f"??? 이미지 캐시({image_cache.image_dir}): 새 파일 {saved}개 / 중복 {stats['duplicate']}개 / 실패 {stats['failed']}개"
+            + ("" if HAS_PIL else " (원본 저장)"))
+    return lambda url: image_cache.local_path(url, report_dir) or url
+
+def read_param_values(param_file):
+    """파라미터 파일의 이름=값 목록 (없으면 빈 dict)"""
+    values = {}
+    if not param_file or not os.path.exists(param_file):
+        return values
+    with open(param_file, encoding="utf-8") as f:
+        for line in f:
+            if "=" in line:
+                name, value = line.split("=", 1)
+                values[name.strip()] = value.strip()
+    return values
+
+def read_param_start(param_file):
+    """파라미터 파일의 goods_num (없으면 None)"""
+    return read_param_values(param_file).get("goods_num") or None
+
+def read_param_stall(param_file):
+    """파라미터 파일의 (stall_code, stall_count), 기록이 없으면 None"""
+    values = read_param_values(param_file)
+    if not values.get("stall_code"):
+        return None
+    try:
+        return values["stall_code"], int(values.get("stall_count") or 0)
+    except ValueError:
+        return None
+
+def crawl_lease(args, queue, lease, store, metrics, pipeline_options, fetch_func):
+    """
+    [추가됨] 임대받은 구간 1개를 조회해 저장소에 기록하고 (물품 수, 실패 수)를 반환
+    처리가 끝난 앞부분까지를 주기적으로 큐에 기록(checkpoint)하며 임대 기한을 연장한다.
+    기록 전에 저장소를 flush하므로 큐에 남은 위치 앞의 번호는 항상 저장소에 있다.
+    구간을 잃으면(기한 초과로 다른 작업자에게 넘어감 / 프런티어 대기로 지워짐) LeaseLost가 올라온다.
+    호스트 장애(CircuitOpenError)면 확인이 끝난 앞부분까지만 기록하고 예외를 올린다. (구간은 호출한 쪽이 반납)
+    """
+    base = int(lease.position)
+    finished = bytearray(int(lease.end_code) - base)
+    state = {'next': 0, 'live': lease.live, 'pending': 0, 'saved_at': time.monotonic()}
+    failed_codes = set()
+    # 일시 오류로 실패해 다시 조회를 기다리는 번호
+    retry_codes = set()
+    failed_queue = FailedQueue()
+
+    def record(data):
+        store.add(data)
+        if not data.get('success'):
+            failed_codes.add(data['code'])
+            run_logger.event('fetch_failed', code=data['code'], error_class=data.get('error_class'),
+                             error_msg=data.get('error_msg'))
+            if data.get('error_class'):
+                failed_queue.add(data['code'], data['error_class'])
+                retry_codes.add(data['code'])
         else:
-            row = f"""
-            <tr style="background-color: #fff0f0;">
-                <td colspan="4" style="color: red;">
-                    [{data['code']}] 조회 실패: {data['error_msg']}
-                </td>
-            </tr>
-            """
-        rows_html += row
-
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang="ko">
-    <head>
-        <meta charset="UTF-8">
-        <title>S2B 결과 ({start_code} 외 {search_count-1}건)</title>
-        <style>
-            body {{ font-family: 'Malgun Gothic', 'Dotum', sans-serif; padding: 20px; background-color: #f9f9f9; }}
-            h2 {{ color: #333; }}
-            .info-text {{ margin-bottom: 10px; color: #666; }}
-            table {{
-                width: 100%;
-                border-collapse: collapse;
-                background-color: #fff;
-                box-shadow: 0 0 10px rgba(0,0,0,0.1);
-            }}
-            th, td {{
-                border: 1px solid #ccc;
-                padding: 10px;
-                text-align: center;
-                vertical-align: middle;
-            }}
-            th {{
-                background-color: #4a90e2;
-                color: white;
-                font-weight: bold;
-                padding: 15px 10px;
-                cursor: pointer;
-                user-select: none;
-            }}
-            th:hover {{
-                background-color: #357abd;
-            }}
-            .product-img {{
-                width: 127px;
-                height: 127px;
-                object-fit: contain;
-                display: block;
-                margin: 0 auto;
-                border: 1px solid #eee;
-            }}
-            .text-left {{ text-align: left; padding-left: 20px; }}
-            .no-data {{ color: #ccc; font-size: 0.9em; }}
-            a {{ text-decoration: none; color: #1a0dab; font-weight: bold; }}
-            a:hover {{ text-decoration: underline; }}
-            tr:hover {{ background-color: #f1f1f1; }}
-        </style>
-    </head>
-    <body>
-        <h2>?? S2B 물품 연속 조회 결과</h2>
-        <div class="info-text">
-            - 시작번호: <b>{start_code}</b><br>
-            - 조회개수: <b>{search_count}개</b><br>
-            <span style="font-size:0.9em; color:#888;">※ 테이블 헤더를 클릭하면 정렬할 수 있습니다.</span>
-        </div>
-        <table id="resultTable">
-            <colgroup>
-                <col width="150px" />
-                <col width="*" />
-                <col width="20%" />
-                <col width="20%" />
-            </colgroup>
-            <thead>
-                <tr>
-                    <th onclick="sortTable(0)">이미지 ?</th>
-                    <th onclick="sortTable(1)">제목 ?</th>
-                    <th onclick="sortTable(2)">카테고리 ?</th>
-                    <th onclick="sortTable(3)">S2B등록번호 ?</th>
-                </tr>
-            </thead>
-            <tbody>
-                {rows_html}
-            </tbody>
-        </table>
-
-        <script>
-        function sortTable(n) {{
-            var table, rows, switching, i, x, y, shouldSwitch, dir, switchcount = 0;
-            table = document.getElementById("resultTable");
-            switching = true;
-            dir = "asc"; 
-
-            while (switching) {{
-                switching = false;
-                rows = table.rows;
-                for (i = 1; i < (rows.length - 1); i++) {{
-                    shouldSwitch = false;
-                    x = rows[i].getElementsByTagName("TD")[n];
-                    y = rows[i + 1].getElementsByTagName("TD")[n];
-
-                    var xContent = x.innerText.toLowerCase();
-                    var yContent = y.innerText.toLowerCase();
-
-                    if (dir == "asc") {{
-                        if (xContent > yContent) {{
-                            shouldSwitch = true;
-                            break;
-                        }}
-                    }} else if (dir == "desc") {{
-                        if (xContent < yContent) {{
-                            shouldSwitch = true;
-                            break;
-                        }}
-                    }}
-                }}
-                if (shouldSwitch) {{
-                    rows[i].parentNode.insertBefore(rows[i + 1], rows[i]);
-                    switching = true;
-                    switchcount++;
-                }} else {{
-                    if (switchcount == 0 && dir == "asc") {{
-                        dir = "desc";
-                        switching = true;
-                    }}
-                }}
-            }}
-        }}
-        </script>
-    </body>
-    </html>
+            failed_codes.discard(data['code'])
+            retry_codes.discard(data['code'])
+            if is_live(data):
+                state['live'] += 1
+
+    def on_result(index, data):
+        record(data)
+        metrics.record_items()
+        finished[index] = 1
+        while state['next'] < len(finished) and finished[state['next']]:
+            state['next'] += 1
+        state['pending'] += 1
+        if state['pending'] >= CHECKPOINT_EVERY or time.monotonic() - state['saved_at'] >= args.lease_ttl / 4:
+            store.flush()
+            queue.checkpoint(lease, base + state['next'], state['live'], lease.failed + len(failed_codes))
+            state['pending'] = 0
+            state['saved_at'] = time.monotonic()
+
+    try:
+        stream_all(lease.codes(), fetch_func, on_result=on_result, **pipeline_options)
+
+        for _ in range(args.retry_rounds):
+            failed = failed_queue.drain()
+            if not failed:
+                break
+            stream_all([code for code, _ in failed], fetch_func, on_result=lambda index, data: record(data),
+                       **pipeline_options)
+    except CircuitOpenError:
+        # 다시 조회를 기다리던 번호가 있으면 그 번호부터 이어받게 한다.
+        store.flush()
+        position = min([base + state['next']] + [int(code) for code in retry_codes])
+        queue.checkpoint(lease, position, state['live'], lease.failed + len(failed_codes - retry_codes))
+        raise
+    store.flush()
+    return state['live'], lease.failed + len(failed_codes)
+
+def run_worker(args, store):
     """
-    
-    # [수정됨] 외부에서 전달받은 file_name_to_save 사용
-    with open(file_name_to_save, "w", encoding="utf-8") as f:
-        f.write(html_content)
-        
-    full_path = "file://" + os.path.realpath(file_name_to_save)
-    # webbrowser.open(full_path)
-    print(f"\n? 결과 파일 생성 완료: {file_name_to_save}")
+    [추가됨] --worker: 큐(lease_queue.py)에서 번호 구간을 임대받아 멈추지 않고 계속 조회한다.
+    같은 큐 파일을 쓰는 작업자(--worker-procs 자식 프로세스, 다른 터미널)는 서로 다른 구간을 동시에 조회한다.
+    프런티어(최신 등록 번호)에 도달하면 --idle-wait초 동안 쉬고 다시 확인한다. (--exit-when-idle이면 종료)
+    """
+    global run_logger
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = LeaseQueue(args.queue_db, shard_size=args.shard_size, ttl=args.lease_ttl, max_gap=args.max_gap,
+                       idle_wait=args.idle_wait)
+    frontier = queue.seed(args.start_number or read_param_start(args.param_file))
+    if frontier is None:
+        print("[경고] 큐가 비어 있습니다. 시작 번호(또는 --param-file)를 입력하세요.")
+        sys.exit(1)
+
+    run_logger = RunLogger(f"plan_goods_worker_{worker_id}_log.jsonl", run="plan_goods_worker", worker=worker_id,
+                           queue=args.queue_db, frontier=frontier, shard_size=args.shard_size,
+                           workers=args.workers, rps=args.rps, parser=args.parser)
+    log(f"?? 작업자 {worker_id}: 큐({args.queue_db}) 프런티어 {frontier}부터 {args.shard_size}건씩 임대받아 조회합니다.")
+
+    breaker = CircuitBreaker(on_open=lambda t: log(f"?? 연속 오류로 {t:.0f}초 동안 요청을 멈춥니다."))
+    cache = None
+    if args.cache_dir:
+        cache = ResponseCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024,
+                              max_age_days=args.cache_max_days)
+    session = create_session(args.workers)
+    limiter = RateLimiter(args.rps, burst=args.workers)
+    parse_pool = create_parse_pool(args.parse_processes)
+    pipeline_options = dict(workers=args.workers, session=session, limiter=limiter,
+                            parse_func=partial(parse_s2b_detail, parser=args.parser),
+                            parse_pool=parse_pool, parse_workers=max(1, args.parse_processes))
+    totals = {'shards': 0, 'items': 0, 'live': 0}
+    lease = None
+    try:
+        while not args.max_shards or totals['shards'] < args.max_shards:
+            lease = queue.acquire(worker_id)
+            if lease is None:
+                wait = queue.resume_at() - time.time()
+                if args.exit_when_idle:
+                    log(f"?? 프런티어 도달: 다시 확인까지 {max(wait, 0):.0f}초 남아 종료합니다.")
+                    break
+                # 쉬는 동안에도 기한이 지난(죽은 작업자의) 구간은 넘겨받도록 짧게 나눠서 기다린다.
+                time.sleep(min(max(wait, 1), args.lease_ttl / 2))
+                continue
+
+            metrics = RunMetrics()
+            fetch_func = partial(fetch_s2b_detail, cache=cache, breaker=breaker, metrics=metrics)
+            run_logger.event('lease', start=lease.start_code, end=lease.end_code, position=lease.position,
+                             attempts=lease.attempts)
+            try:
+                live, failed = crawl_lease(args, queue, lease, store, metrics, pipeline_options, fetch_func)
+                settled = queue.complete(lease, live, failed)
+            except LeaseLost:
+                log(f"?? 구간 {lease.start_code}~{lease.end_code}을(를) 잃었습니다. (임대 기한 초과 또는 프런티어 재확인 대기)")
+                lease = None
+                continue
+            except CircuitOpenError as e:
+                # 구간은 finally에서 반납한다. (확인한 위치부터 다른 작업자 / 다음 실행이 이어받음)
+                log(f"?? {e} 작업자를 멈추고 구간 {lease.start_code}~{lease.end_code}을(를) {lease.position}부터 반납합니다.")
+                run_logger.event('circuit_open', start=lease.start_code, position=lease.position)
+                break
+            lease = None
+            summary = metrics.summary(run="plan_goods_worker", worker=worker_id, next_code=queue.frontier, live=live)
+            run_logger.event('shard_summary', **summary)
+            totals['shards'] += 1
+            totals['items'] += summary['items']
+            totals['live'] += live
+            log(f"?? 구간 완료 #{totals['shards']}: 물품 {live}건 / 실패 {failed}건 / 초당 {summary['items_per_sec']}건")
+            if settled and settled[0] == 'rolled':
+                log(f"?? 이전 날짜 끝: 다음 날짜 {settled[1]}부터 조회합니다.")
+            elif settled:
+                log(f"?? 프런티어 도달: {args.idle_wait}초 뒤 {settled[1]}부터 다시 확인합니다.")
+    except KeyboardInterrupt:
+        log("?? 중단 요청: 조회 중인 구간은 다른 작업자가 바로 이어받도록 반납합니다.")
+    finally:
+        if lease is not None:
+            store.flush()
+            queue.release(lease)
+        session.close()
+        if parse_pool is not None:
+            parse_pool.shutdown()
+        if cache is not None:
+            cache.evict()
+            cache.close()
+        log(f"?? 작업자 {worker_id} 종료: 구간 {totals['shards']}개 / {totals['items']}건 / 물품 {totals['live']}건 "
+            f"(다음 프런티어 {queue.frontier})")
+        append_history(METRICS_HISTORY_FILE, dict(run="plan_goods_worker", worker=worker_id, **totals))
+        queue.close()
+        run_logger.close()
+
+def worker_argv(argv, worker_no):
+    """--worker-procs 자식 프로세스 명령행 (--worker-procs 빼고 작업자 이름 추가)"""
+    child = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == "--worker-procs":
+            skip = True
+        elif not arg.startswith("--worker-procs="):
+            child.append(arg)
+    return child + ["--worker-id", f"{socket.gethostname()}-{os.getpid()}-{worker_no}"]
+
+def run_worker_procs(args):
+    """[추가됨] --worker-procs N: 작업자 프로세스 N개를 띄우고 모두 끝날 때까지 기다린다."""
+    # 시작 번호는 부모가 한 번만 기록한다.
+    queue = LeaseQueue(args.queue_db, shard_size=args.shard_size)
+    if queue.seed(args.start_number or read_param_start(args.param_file)) is None:
+        print("[경고] 큐가 비어 있습니다. 시작 번호(또는 --param-file)를 입력하세요.")
+        sys.exit(1)
+    queue.close()
+    script = os.path.abspath(__file__)
+    procs = [subprocess.Popen([sys.executable, script] + worker_argv(sys.argv[1:], i))
+             for i in range(args.worker_procs)]
+    codes = []
+    for proc in procs:
+        while True:
+            try:
+                codes.append(proc.wait())
+                break
+            except KeyboardInterrupt:
+                # Ctrl+C는 자식에게도 전달된다. 자식이 구간을 반납하고 끝날 때까지 기다린다.
+                continue
+    return max(codes) if codes else 0
 
 # --- 메인 실행부 ---
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="S2B 물품 연속 조회")
+    parser.add_argument("start_number", nargs="?", help="조회 시작 번호")
+    parser.add_argument("count", nargs="?", help=f"조회 개수 (기본 {DEFAULT_COUNT})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시 요청 수")
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS, help="초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--parser", choices=sorted(PARSERS), default=DEFAULT_PARSER, help="상세 페이지 파서 백엔드")
+    parser.add_argument("--parse-processes", type=int, default=0, help="파싱을 별도 프로세스 N개에서 실행 (0이면 파싱 스레드 1개)")
+    parser.add_argument("--cache-dir", help=f"원본 응답 캐시 폴더 (지정 시 캐시 사용, 기본 위치: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=500, help="캐시 최대 용량(MB)")
+    parser.add_argument("--cache-max-days", type=int, default=DEFAULT_MAX_AGE_DAYS, help="캐시 보관 기간(일)")
+    parser.add_argument("--replay", action="store_true", help="네트워크 없이 캐시된 응답만으로 파싱/리포트 재생성")
+    parser.add_argument("--probe", action="store_true", help="빈 구간 건너뛰기 + 최신 번호(프런티어) 도달 시 중단")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="[probe] 순차 조회 창 크기")
+    parser.add_argument("--dead-run", type=int, default=DEFAULT_DEAD_RUN, help="[probe] 건너뛰기를 시작할 연속 빈 번호 수")
+    parser.add_argument("--max-gap", type=int, default=DEFAULT_MAX_GAP, help="[probe] 마지막 물품 이후 이 간격까지 없으면 프런티어로 판단")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help="[probe] 같은 번호에서 이 횟수만큼 실행이 멈추면 그 번호를 건너뜀 (--param-file에 기록)")
+    parser.add_argument("--param-file", help="실행 후 다음 시작 번호를 기록할 파라미터 파일 (예: plan_goods_param.txt)")
+    parser.add_argument("--retry-rounds", type=int, default=DEFAULT_RETRY_ROUNDS, help="배치 끝에서 일시 오류 번호를 다시 조회하는 횟수")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="결과 저장소(SQLite) 경로")
+    parser.add_argument("--report-range", nargs=2, metavar=("START", "END"), help="조회 없이 저장소의 번호 구간으로 리포트 생성")
+    parser.add_argument("--report-date", metavar="YYYYMMDD", help="조회 없이 저장소의 등록일자로 리포트 생성")
+    parser.add_argument("--report-file", help="리포트 파일명 (--report-range / --report-date 사용 시)")
+    parser.add_argument("--batch-report", action="store_true",
+                        help="배치마다 이번 구간 HTML 리포트 생성 (기본: 저장소에만 기록, 재생 모드는 항상 생성)")
+    parser.add_argument("--thumbs", action="store_true", help="리포트 이미지를 로컬 캐시에 받아 썸네일로 참조 (Pillow 있으면 축소 저장)")
+    parser.add_argument("--image-dir", help=f"[thumbs] 이미지 캐시 폴더 (기본: 리포트 폴더/{DEFAULT_IMAGE_DIR})")
+    parser.add_argument("--image-workers", type=int, default=DEFAULT_IMAGE_WORKERS, help="[thumbs] 이미지 동시 다운로드 수")
+    parser.add_argument("--worker", action="store_true", help="큐에서 번호 구간을 임대받아 계속 조회 (연속 작업자 모드)")
+    parser.add_argument("--worker-procs", type=int, default=1, help="[worker] 작업자 프로세스 수")
+    parser.add_argument("--worker-id", help="[worker] 작업자 이름 (기본: 호스트명-PID)")
+    parser.add_argument("--queue-db", default=DEFAULT_QUEUE_PATH, help=f"[worker] 구간 임대 큐(SQLite) 경로 (기본 {DEFAULT_QUEUE_PATH})")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="[worker] 한 번에 임대받는 번호 수")
+    parser.add_argument("--lease-ttl", type=int, default=DEFAULT_LEASE_TTL, help="[worker] 임대 기한(초), 기록이 없으면 다른 작업자가 넘겨받음")
+    parser.add_argument("--idle-wait", type=int, default=DEFAULT_IDLE_WAIT, help="[worker] 프런티어 도달 후 다시 확인할 때까지 쉬는 시간(초)")
+    parser.add_argument("--max-shards", type=int, default=0, help="[worker] 이 개수만큼 구간을 처리하면 종료 (0이면 계속)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="[worker] 프런티어에 도달하면 쉬지 않고 종료")
+    parser.add_argument("--profile", action="store_true", help="단계별 소요 시간을 Chrome trace JSON(<결과파일명>_trace.json)으로 저장")
+    parser.add_argument("--cprofile", action="store_true", help="실행 전체를 cProfile로 측정 (<결과파일명>_cprofile.prof / .txt)")
+    args = parser.parse_args()
+
+    # [추가됨] 결과 저장소 (번호 기준 upsert)
+    store = ResultStore(args.db)
+
+    # [추가됨] 리포트 모드: 조회 없이 저장소에서 바로 리포트를 만든다.
+    if args.report_range or args.report_date:
+        if args.report_range:
+            report_start, report_end = args.report_range
+            query = dict(start_code=report_start, end_code=report_end, reg_date=args.report_date)
+            report_file = args.report_file or f"plan_goods_{report_start}_{report_end}_report.html"
+        else:
+            report_start = args.report_date
+            query = dict(reg_date=args.report_date)
+            report_file = args.report_file or f"plan_goods_{args.report_date}_report.html"
+        image_resolver = prepare_images(args, store.iter_results(**query), report_file) if args.thumbs else None
+        # 저장소 커서를 그대로 흘려보내므로 행 수와 관계없이 메모리는 일정하다.
+        written = create_html_report(store.iter_results(**query), report_start, None, report_file, image_resolver)
+        store.close()
+        print(f"?? 저장소({args.db})에서 {written}건 리포트 작성")
+        sys.exit(0)
+
+    # [추가됨] 연속 작업자 모드: 리포트는 --report-date / --report-range로 따로 만든다.
+    if args.worker:
+        if args.replay:
+            print("오류: --replay는 --worker와 함께 쓸 수 없습니다.")
+            sys.exit(1)
+        if args.worker_procs > 1:
+            store.close()
+            sys.exit(run_worker_procs(args))
+        run_worker(args, store)
+        store.close()
+        sys.exit(0)
+
+    if not args.start_number:
         print("=" * 60)
         print("[경고] 조회할 시작 번호를 입력하지 않았습니다.")
         sys.exit(1)
 
-    start_number_str = sys.argv[1]
+    start_number_str = args.start_number
     
-    if len(sys.argv) >= 3:
+    if args.count is not None:
         try:
-            search_count = int(sys.argv[2])
+            search_count = int(args.count)
         except ValueError:
             print("오류: 조회 횟수는 숫자여야 합니다.")
             sys.exit(1)
@@ -273,31 +468,192 @@ if __name__ == "__main__":
     base_file_name = f"plan_goods_{start_number_str}_{search_count}"
     
     html_file = f"{base_file_name}.html"
-    log_file  = f"{base_file_name}_log.txt"
-
-    # [중요] 표준 출력(print)을 가로채서 화면과 log 파일 양쪽에 기록하도록 설정
-    sys.stdout = DualLogger(log_file)
-    sys.stderr = sys.stdout # 에러 메시지도 로그 파일에 기록
+    log_file  = f"{base_file_name}_log.jsonl"
+    trace_file = f"{base_file_name}_trace.json"
 
     if not start_number_str.isdigit():
         print("오류: 시작 번호는 숫자만 입력해야 합니다.")
         sys.exit(1)
         
     start_number = int(start_number_str)
-    all_results = []
+    # [수정됨] 번호 목록을 미리 만들지 않고 파이프라인이 필요한 만큼만 꺼낸다.
+    codes = (str(start_number + i) for i in range(search_count))
+
+    # [수정됨] 구조화 로그 (이벤트를 모아서 기록) + 실행 지표
+    run_logger = RunLogger(log_file, run="plan_goods", start=start_number_str, count=search_count,
+                           probe=args.probe, workers=args.workers, rps=args.rps, parser=args.parser)
+    metrics = RunMetrics()
+
+    # [추가됨] 프로파일링 (--profile: 단계별 trace, --cprofile: 함수별 누적 시간)
+    if args.profile:
+        enable_tracing()
+    profiler = CProfileCollector() if args.cprofile else None
+    if profiler:
+        profiler.start()
     
-    print(f"?? [{start_number_str}] 부터 {search_count}건 조회를 시작합니다...")
-    print(f"?? 로그 파일 저장: {log_file}")
+    log(f"?? [{start_number_str}] 부터 {search_count}건 조회를 시작합니다...")
+    # [추가됨] 원본 응답 캐시 (재생 모드는 캐시만 사용하고 요청 속도 제한 없음)
+    cache = None
+    if args.cache_dir or args.replay:
+        cache = ResponseCache(args.cache_dir or DEFAULT_CACHE_DIR, max_bytes=args.cache_max_mb * 1024 * 1024,
+                              max_age_days=args.cache_max_days, offline=args.replay)
+    if args.replay:
+        args.rps = 0
+        log(f"?? 재생 모드: 캐시({cache.cache_dir})만 사용합니다.")
+    else:
+        log(f"?? 동시 요청: {args.workers}개 / 초당 최대 {args.rps}건")
+    log(f"?? 로그 파일 저장: {log_file}")
     print("-" * 50)
 
-    for i in range(search_count):
-        current_code = str(start_number + i)
-        print(f"[{i+1}/{search_count}] 조회중... (번호: {current_code})", end='\r')
-        data = extract_s2b_info(current_code)
-        all_results.append(data)
+    # [수정됨] 완료 순서대로 진행 상황 출력 (콘솔 전용, 일정 간격으로만 다시 그림)
+    progress = ProgressRenderer(search_count)
+    # [수정됨] 결과는 모아 두지 않고 도착하는 대로 저장소에 기록한다. 요약에 필요한 값만 센다.
+    # next: 시작 번호부터 빠짐없이 처리한 건수 (호스트 장애로 멈출 때 다음 시작 번호)
+    tally = {'done': 0, 'live': 0, 'first': None, 'last': None, 'next': 0}
+
+    # [추가됨] 재시도 후에도 일시 오류로 실패한 번호는 모아 두었다가 배치 끝에서 다시 조회한다.
+    failed_queue = FailedQueue()
+    # [추가됨] finished: 처리한 번호 표시 (시작 번호 기준 위치), retry_codes: 다시 조회를 기다리는 번호
+    finished = bytearray(search_count)
+    retry_codes = set()
+
+    def on_result(index, data):
+        # 파이프라인 기록 단계 (한 스레드에서만 호출됨)
+        # [수정됨] 재생 모드에서 캐시에 없던 번호는 저장소에 실패로 남기지 않는다. (이전 실행 결과를 덮어쓰지 않도록)
+        if not data.get('cache_miss'):
+            with span('store', code=data['code']):
+                store.add(data)
+        metrics.record_items()
+        if not data.get('success'):
+            run_logger.event('fetch_failed', code=data['code'], error_class=data.get('error_class'),
+                             error_msg=data.get('error_msg'))
+            if data.get('error_class'):
+                failed_queue.add(data['code'], data['error_class'])
+                retry_codes.add(data['code'])
+        else:
+            retry_codes.discard(data['code'])
+            if is_live(data):
+                tally['live'] += 1
+        code = int(data['code'])
+        if 0 <= code - start_number < search_count:
+            finished[code - start_number] = 1
+            while tally['next'] < search_count and finished[tally['next']]:
+                tally['next'] += 1
+        if tally['first'] is None or code < tally['first']:
+            tally['first'] = code
+        if tally['last'] is None or code > tally['last']:
+            tally['last'] = code
+        tally['done'] += 1
+        progress.update(tally['done'], f"(번호: {data['code']})")
+
+    breaker = CircuitBreaker(on_open=lambda t: log(f"?? 연속 오류로 {t:.0f}초 동안 요청을 멈춥니다."))
+    fetch_func = partial(fetch_s2b_detail, cache=cache, breaker=breaker, metrics=metrics)
+    parse_func = partial(parse_s2b_detail, parser=args.parser)
+    if profiler:
+        fetch_func = profiler.wrap(fetch_func)
+        if not args.parse_processes:
+            parse_func = profiler.wrap(parse_func)
+    session = create_session(args.workers)
+    limiter = RateLimiter(args.rps, burst=args.workers)
+    parse_pool = create_parse_pool(args.parse_processes)
+    pipeline_options = dict(workers=args.workers, session=session, limiter=limiter, on_result=on_result,
+                            parse_func=parse_func, parse_pool=parse_pool, parse_workers=max(1, args.parse_processes))
+
+    def fetch_batch(batch_codes):
+        # probe 창(작은 묶음)은 결과 리스트가 필요하다.
+        return fetch_all(batch_codes, fetch_func, **pipeline_options)
+
+    next_code = None
+    aborted = False
+    prober = None
+    # [추가됨] 이전 실행들이 일시 오류로 멈춘 번호와 횟수 (파라미터 파일)
+    prev_stall = read_param_stall(args.param_file)
+    stall = None
+    try:
+        if args.probe:
+            # [추가됨] 번호 공간 탐색: 빈 구간은 건너뛰고 프런티어에서 멈춘다.
+            prober = CodeProber(fetch_batch, window=args.window, dead_run=args.dead_run, max_gap=args.max_gap,
+                                attempts=dict([prev_stall]) if prev_stall else None, max_attempts=args.max_attempts)
+            next_code, frontier = prober.run(start_number_str, search_count)
+            progress.finish(tally['done'])
+            log(f"?? 요청 {prober.used}건 / 물품 {prober.live}건 / 다음 시작 번호 {next_code}"
+                  + (" (프런티어 도달)" if frontier else ""))
+            for code in prober.skipped:
+                log(f"?? {code}: {args.max_attempts}회 연속 실패로 건너뜁니다. (저장소에는 실패로 남음)")
+                run_logger.event('code_skipped', code=code, attempts=args.max_attempts)
+            if prober.stalled_code:
+                count = prev_stall[1] + 1 if prev_stall and prev_stall[0] == prober.stalled_code else 1
+                stall = (prober.stalled_code, count)
+        else:
+            # [수정됨] 조회 -> 파싱 -> 저장 파이프라인 (결과를 리스트로 모으지 않음)
+            stream_all(codes, fetch_func, **pipeline_options)
+            next_code = str(start_number + search_count)
+
+        for retry_round in range(0 if args.replay else args.retry_rounds):
+            failed = failed_queue.drain()
+            if not failed:
+                break
+            progress.finish(tally['done'])
+            log(f"?? 실패 {len(failed)}건 다시 조회 ({retry_round + 1}회차)")
+            # 다시 조회한 결과는 저장소에서 이전 실패 결과를 덮어쓴다.
+            stream_all([code for code, _ in failed], fetch_func, **pipeline_options)
+    except CircuitOpenError as e:
+        # [추가됨] 호스트 장애: 남은 번호는 요청하지 않고, 다음 실행이 확인하지 못한 첫 번호부터 다시 조회하게 한다.
+        aborted = True
+        progress.finish(tally['done'])
+        if next_code is None:
+            next_code = prober.resume_code if prober is not None else str(start_number + tally['next'])
+        next_code = str(min([int(next_code)] + [int(code) for code in retry_codes]))
+        # 호스트 장애는 번호 탓이 아니므로 멈춘 횟수를 늘리지 않는다. (이전 기록은 그대로 둔다)
+        if stall is None:
+            stall = prev_stall
+        log(f"?? {e} 배치를 중단합니다. 다음 실행은 {next_code}부터 다시 조회합니다.")
+        run_logger.event('circuit_open', next_code=next_code)
+    session.close()
+    if parse_pool is not None:
+        parse_pool.shutdown()
+    progress.finish(tally['done'])
     
-    print(f"\n{'-' * 50}")
-    print("수집 완료! 결과 리포트를 생성합니다.")
+
+    print('-' * 50)
+    log("수집 완료!")
+
+    if cache is not None:
+        if not args.replay:
+            cache.evict()
+        cache.close()
+
+    if args.param_file and not args.replay:
+        update_param_file(args.param_file, next_code, search_count, stall)
     
     # 생성한 html_file 이름을 인자로 전달
-    create_html_report(all_results, start_number_str, search_count, html_file)
\ No newline at end of file
+    # [수정됨] 리포트는 저장소에서 이번 구간을 조회해 바로 파일로 흘려 쓴다. (이전 실행 결과 중 성공한 것도 반영)
+    # [수정됨] 배치 리포트는 --batch-report일 때만 만든다. (결과는 저장소에 있고 --report-date로 언제든 만들 수 있음)
+    written = 0
+    if args.batch_report or args.replay:
+        report_query = dict(start_code=tally['first'], end_code=tally['last'])
+        image_resolver = None
+        if args.thumbs and tally['done']:
+            with span('images'):
+                image_resolver = prepare_images(args, store.iter_results(**report_query), html_file)
+        report_rows = store.iter_results(**report_query) if tally['done'] else []
+        with span('report', rows=search_count):
+            written = create_html_report(report_rows, start_number_str, search_count, html_file, image_resolver)
+    else:
+        log(f"?? 결과는 저장소({args.db})에 기록했습니다. (배치 리포트: --batch-report, 날짜별 리포트: --report-date)")
+    store.close()
+
+    # [추가됨] 실행 지표 요약: 로그 마지막 이벤트 + 실행 이력 파일
+    summary = metrics.summary(run="plan_goods", start=start_number_str, next_code=next_code,
+                              live=tally['live'], report_rows=written, aborted=aborted)
+    run_logger.event('run_summary', **summary)
+    append_history(METRICS_HISTORY_FILE, summary)
+    log(f"?? {format_summary(summary)}")
+    if args.profile:
+        TRACER.write(trace_file)
+        log(f"?? 단계별 시간: {format_stage_totals()}")
+        log(f"?? trace 저장: {trace_file} (chrome://tracing 또는 ui.perfetto.dev에서 열기)")
+    if profiler:
+        prof_file, top_file = profiler.dump(f"{base_file_name}_cprofile")
+        log(f"?? cProfile 저장: {prof_file} / 상위 함수: {top_file}")
+    run_logger.close()
\ No newline at end of file
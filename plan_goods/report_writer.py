@@ -0,0 +1,233 @@
+"""
+plan_goods HTML 리포트 생성
+
+- 행을 받는 즉시 파일에 JSON 배열 원소로 기록하므로 행 수와 관계없이 파이썬 메모리는 일정하다.
+- 브라우저에서는 데이터 배열을 한 번 정렬(O(n log n))/필터링하고,
+  현재 페이지에서 화면에 보이는 행만 그리는 가상 스크롤로 10만 행도 멈추지 않는다.
+"""
+import json
+
+# 데이터 행 형식: [번호, 성공여부(1/0), 이미지URL, 제목, 카테고리, 등록번호, 상세링크, 오류메시지]
+HEAD_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: 'Malgun Gothic', 'Dotum', sans-serif; padding: 20px; background-color: #f9f9f9; }}
+        h2 {{ color: #333; }}
+        .info-text {{ margin-bottom: 10px; color: #666; }}
+        .toolbar {{ margin-bottom: 10px; display: flex; gap: 10px; align-items: center; flex-wrap: wrap; }}
+        .toolbar input {{ padding: 6px 10px; width: 300px; border: 1px solid #ccc; }}
+        .toolbar button, .toolbar select {{ padding: 5px 10px; }}
+        .grid {{ background-color: #fff; box-shadow: 0 0 10px rgba(0,0,0,0.1); }}
+        .row {{ display: grid; grid-template-columns: 150px 1fr 20% 20%; border-bottom: 1px solid #ccc; }}
+        .row > div {{ padding: 10px; text-align: center; display: flex; align-items: center; justify-content: center;
+                      border-right: 1px solid #ccc; overflow: hidden; }}
+        .head > div {{ background-color: #4a90e2; color: white; font-weight: bold; padding: 15px 10px;
+                       cursor: pointer; user-select: none; }}
+        .head > div:hover {{ background-color: #357abd; }}
+        .viewport {{ height: 75vh; overflow-y: auto; position: relative; }}
+        .spacer {{ position: relative; }}
+        .body-row {{ position: absolute; left: 0; right: 0; height: {row_height}px; box-sizing: border-box; }}
+        .body-row:hover {{ background-color: #f1f1f1; }}
+        .fail {{ background-color: #fff0f0; grid-template-columns: 1fr; }}
+        .fail > div {{ color: red; }}
+        .product-img {{ width: 127px; height: 127px; object-fit: contain; display: block; margin: 0 auto; border: 1px solid #eee; }}
+        .text-left {{ justify-content: flex-start !important; text-align: left !important; padding-left: 20px !important; }}
+        .no-data {{ color: #ccc; font-size: 0.9em; }}
+        .empty {{ color: #999; }}
+        a {{ text-decoration: none; color: #1a0dab; font-weight: bold; }}
+        a:hover {{ text-decoration: underline; }}
+    </style>
+</head>
+<body>
+    <h2>S2B 물품 연속 조회 결과</h2>
+    <div class="info-text">
+        - 시작번호: <b>{start_code}</b><br>
+        - 조회개수: <b id="totalCount">{count_text}</b><br>
+        <span style="font-size:0.9em; color:#888;">※ 헤더를 클릭하면 정렬, 검색창에 입력하면 제목/카테고리/등록번호로 필터링합니다.</span>
+    </div>
+    <div class="toolbar">
+        <input id="filterInput" type="search" placeholder="검색 (제목 / 카테고리 / 등록번호)">
+        <select id="pageSize">
+            <option value="100">100개씩</option>
+            <option value="500" selected>500개씩</option>
+            <option value="2000">2000개씩</option>
+            <option value="0">전체</option>
+        </select>
+        <button id="prevPage">이전</button>
+        <span id="pageInfo"></span>
+        <button id="nextPage">다음</button>
+    </div>
+    <div class="grid">
+        <div class="row head">
+            <div data-col="2">이미지</div>
+            <div data-col="3">제목</div>
+            <div data-col="4">카테고리</div>
+            <div data-col="5">S2B등록번호</div>
+        </div>
+        <div class="viewport" id="viewport"><div class="spacer" id="spacer"></div></div>
+    </div>
+<script>
+var DATA = ["""
+
+TAIL_TEMPLATE = """];
+(function () {{
+    var ROW_HEIGHT = {row_height};
+    var BUFFER = 10;
+    var collator = new Intl.Collator('ko', {{ numeric: true, sensitivity: 'base' }});
+    var view = DATA.map(function (_, i) {{ return i; }});
+    var sortCol = -1, sortDir = 1, page = 0;
+    var viewport = document.getElementById('viewport');
+    var spacer = document.getElementById('spacer');
+
+    function pageSize() {{ return parseInt(document.getElementById('pageSize').value, 10) || view.length || 1; }}
+    function pageCount() {{ return Math.max(1, Math.ceil(view.length / pageSize())); }}
+
+    function cell(cls, child) {{
+        var div = document.createElement('div');
+        if (cls) div.className = cls;
+        if (typeof child === 'string') div.textContent = child; else if (child) div.appendChild(child);
+        return div;
+    }}
+
+    function buildRow(d) {{
+        var row = document.createElement('div');
+        if (!d[1]) {{
+            row.className = 'row body-row fail';
+            row.appendChild(cell('', '[' + d[0] + '] 조회 실패: ' + d[7]));
+            return row;
+        }}
+        row.className = 'row body-row';
+        var img;
+        if (d[2]) {{
+            img = document.createElement('img');
+            img.className = 'product-img';
+            img.loading = 'lazy';
+            img.src = d[2];
+        }} else {{
+            img = cell('no-data', '이미지 없음');
+        }}
+        row.appendChild(cell('', img));
+        var title = d[3] || (!d[4] && !d[5] ? '(정보 없음)' : '');
+        row.appendChild(cell('text-left' + (d[3] ? '' : ' empty'), title));
+        row.appendChild(cell('', d[4]));
+        var link = document.createElement('a');
+        link.href = d[6];
+        link.target = '_blank';
+        link.title = '상세보기';
+        link.textContent = d[5];
+        row.appendChild(cell('', link));
+        return row;
+    }}
+
+    // 현재 페이지에서 화면에 보이는 행만 그린다.
+    function render() {{
+        var size = pageSize();
+        var start = page * size;
+        var rows = Math.min(size, view.length - start);
+        spacer.style.height = (Math.max(rows, 0) * ROW_HEIGHT) + 'px';
+        var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - BUFFER);
+        var last = Math.min(rows, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + BUFFER);
+        var frag = document.createDocumentFragment();
+        for (var i = first; i < last; i++) {{
+            var row = buildRow(DATA[view[start + i]]);
+            row.style.top = (i * ROW_HEIGHT) + 'px';
+            frag.appendChild(row);
+        }}
+        spacer.textContent = '';
+        spacer.appendChild(frag);
+        document.getElementById('pageInfo').textContent = (page + 1) + ' / ' + pageCount() + ' 페이지';
+        document.getElementById('totalCount').textContent = view.length + ' / ' + DATA.length + '개';
+    }}
+
+    function resetPage() {{ page = 0; viewport.scrollTop = 0; render(); }}
+
+    function applyFilter() {{
+        var q = document.getElementById('filterInput').value.trim().toLowerCase();
+        view = [];
+        for (var i = 0; i < DATA.length; i++) {{
+            var d = DATA[i];
+            if (!q || (d[0] + ' ' + d[3] + ' ' + d[4] + ' ' + d[5]).toLowerCase().indexOf(q) >= 0) view.push(i);
+        }}
+        if (sortCol >= 0) sortView();
+        resetPage();
+    }}
+
+    function sortView() {{
+        view.sort(function (a, b) {{
+            return sortDir * collator.compare(String(DATA[a][sortCol] || ''), String(DATA[b][sortCol] || '')) || a - b;
+        }});
+    }}
+
+    Array.prototype.forEach.call(document.querySelectorAll('.head > div'), function (th) {{
+        th.addEventListener('click', function () {{
+            var col = parseInt(th.getAttribute('data-col'), 10);
+            sortDir = (col === sortCol) ? -sortDir : 1;
+            sortCol = col;
+            sortView();
+            resetPage();
+        }});
+    }});
+
+    var timer = null;
+    document.getElementById('filterInput').addEventListener('input', function () {{
+        clearTimeout(timer);
+        timer = setTimeout(applyFilter, 200);
+    }});
+    document.getElementById('pageSize').addEventListener('change', resetPage);
+    document.getElementById('prevPage').addEventListener('click', function () {{ if (page > 0) {{ page--; viewport.scrollTop = 0; render(); }} }});
+    document.getElementById('nextPage').addEventListener('click', function () {{ if (page < pageCount() - 1) {{ page++; viewport.scrollTop = 0; render(); }} }});
+    viewport.addEventListener('scroll', function () {{ window.requestAnimationFrame(render); }});
+    window.addEventListener('resize', render);
+    render();
+}})();
+</script>
+</body>
+</html>
+"""
+
+ROW_HEIGHT = 150
+
+
+def _row_json(data, image_resolver=None):
+    """결과 1건을 한 줄 JSON 배열로 변환 (</script> 조기 종료 방지)"""
+    if data.get('success'):
+        image_url = data.get('image_url') or ""
+        if image_url and image_resolver:
+            image_url = image_resolver(image_url)
+        row = [data['code'], 1, image_url, data.get('font_content_1') or "",
+               data.get('navi_text') or "", data.get('font_content_2') or "", data.get('detail_link') or "", ""]
+    else:
+        row = [data['code'], 0, "", "", "", "", "", data.get('error_msg') or ""]
+    return json.dumps(row, ensure_ascii=False, separators=(',', ':')).replace("</", "<\\/")
+
+
+# [수정됨] 파일명을 외부에서 받도록 매개변수 추가 (file_name_to_save)
+def create_html_report(data_list, start_code, search_count, file_name_to_save, image_resolver=None):
+    """
+    HTML 파일 생성 함수
+    data_list는 리스트 또는 제너레이터(저장소 조회 결과 등) 모두 가능하며 한 번만 순회한다.
+    search_count가 None이면 제목에 건수를 표시하지 않는다. 기록한 행 수를 반환한다.
+    [추가됨] image_resolver(원격 URL) -> 리포트에 넣을 이미지 경로 (--thumbs 로컬 이미지 캐시용)
+    """
+    if search_count:
+        title = f"S2B 결과 ({start_code} 외 {search_count - 1}건)"
+        count_text = f"{search_count}개"
+    else:
+        title = f"S2B 결과 ({start_code})"
+        count_text = "-"
+
+    written = 0
+    with open(file_name_to_save, "w", encoding="utf-8") as f:
+        f.write(HEAD_TEMPLATE.format(title=title, start_code=start_code, count_text=count_text, row_height=ROW_HEIGHT))
+        for data in data_list:
+            if written:
+                f.write(",\n")
+            f.write(_row_json(data, image_resolver))
+            written += 1
+        f.write(TAIL_TEMPLATE.format(row_height=ROW_HEIGHT))
+
+    print(f"\n? 결과 파일 생성 완료: {file_name_to_save}")
+    return written
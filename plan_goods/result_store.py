@@ -0,0 +1,118 @@
+"""
+plan_goods 조회 결과 저장소 (SQLite)
+
+- 견적(물품) 번호를 키로 결과를 저장하며, 결과가 도착하는 대로 모아서(batch) upsert 한다.
+- 이미 성공한 결과는 이후의 조회 실패 결과로 덮어쓰지 않는다.
+- 리포트는 번호 구간 또는 등록일자로 저장소에서 조회해 만든다.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from code_probe import DATE_LEN
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(REPO_DIR, "plan_goods_results.db")
+DEFAULT_BATCH_SIZE = 100
+
+COLUMNS = ('code', 'reg_date', 'success', 'navi_text', 'font_content_1', 'font_content_2',
+           'image_url', 'detail_link', 'error_msg', 'fetched_at')
+
+UPSERT_SQL = f"""
+    INSERT INTO goods ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})
+    ON CONFLICT(code) DO UPDATE SET
+        {', '.join(f'{c} = excluded.{c}' for c in COLUMNS if c != 'code')}
+    WHERE excluded.success = 1 OR goods.success = 0
+"""
+
+
+class ResultStore:
+    def __init__(self, db_path=DEFAULT_DB_PATH, batch_size=DEFAULT_BATCH_SIZE):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.pending = []
+        self.lock = threading.Lock()
+        # [수정됨] 여러 작업자 프로세스(--worker)가 같은 파일에 기록하므로 잠금을 충분히 기다린다.
+        self.db = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS goods (
+                code TEXT PRIMARY KEY,
+                reg_date TEXT NOT NULL,
+                success INTEGER NOT NULL,
+                navi_text TEXT,
+                font_content_1 TEXT,
+                font_content_2 TEXT,
+                image_url TEXT,
+                detail_link TEXT,
+                error_msg TEXT,
+                fetched_at TEXT NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_goods_reg_date ON goods(reg_date, code)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_goods_reg_no ON goods(font_content_2)")
+        self.db.commit()
+
+    def add(self, result):
+        """결과 1건을 버퍼에 넣고 batch_size가 차면 기록 (여러 스레드에서 호출 가능)"""
+        row = (
+            result['code'],
+            result['code'][:DATE_LEN],
+            1 if result.get('success') else 0,
+            result.get('navi_text'),
+            result.get('font_content_1'),
+            result.get('font_content_2'),
+            result.get('image_url'),
+            result.get('detail_link'),
+            result.get('error_msg'),
+            datetime.now().isoformat(timespec='seconds'),
+        )
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.pending:
+            return
+        with self.db:
+            self.db.executemany(UPSERT_SQL, self.pending)
+        self.pending = []
+
+    def iter_results(self, start_code=None, end_code=None, reg_date=None):
+        """번호 구간(양끝 포함) 또는 등록일자로 결과를 번호 순서대로 반환 (parse_s2b_detail 결과 형식)"""
+        self.flush()
+        conditions, params = [], []
+        if start_code is not None:
+            conditions.append("code >= ?")
+            params.append(str(start_code))
+        if end_code is not None:
+            conditions.append("code <= ?")
+            params.append(str(end_code))
+        if reg_date is not None:
+            conditions.append("reg_date = ?")
+            params.append(str(reg_date))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # 읽기 전용 연결로 커서를 조금씩 읽어 메모리에 전체를 올리지 않는다.
+        reader = sqlite3.connect(self.db_path)
+        try:
+            cursor = reader.execute(f"SELECT {', '.join(COLUMNS)} FROM goods {where} ORDER BY code", params)
+            while True:
+                rows = cursor.fetchmany(500)
+                if not rows:
+                    break
+                for row in rows:
+                    data = dict(zip(COLUMNS, row))
+                    data['success'] = bool(data['success'])
+                    yield data
+        finally:
+            reader.close()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.db.close()
@@ -35,24 +35,19 @@ echo "읽은 파라미터 -> goods_num: $CURRENT_NUM, count: $COUNT_VAL"
 echo "작업시작 (Python 실행)"
 
 # 파이썬 스크립트에 파라미터 전달
-python ./plan_goods/plan_goods.py "$CURRENT_NUM" "$COUNT_VAL"
+# --probe      : 빈 번호 구간은 건너뛰고, 최신 등록 번호(프런티어)에 도달하면 멈춘다.
+# --param-file : 다음 시작 번호를 파이썬이 직접 계산해 기록한다.
+#                (프런티어 도달 시 무작정 +count 하지 않고 마지막 물품 다음 번호를 기록)
+# 배치 HTML 리포트(--batch-report)는 만들지 않는다. 결과는 저장소(Action 캐시)와 archive/(커밋)에 남고,
+# 리포트가 필요하면 --report-date / --report-range로 만든다. (리포트까지 커밋하면 같은 결과를 두 번 보관)
+python ./plan_goods/plan_goods.py "$CURRENT_NUM" "$COUNT_VAL" --probe --param-file "$PARAM_FILE"
 
 echo "작업끝"
 
 # -----------------------------------------------------------
-# 3. 값 계산 (+ count) 및 파일 업데이트
+# 3. 갱신된 파라미터 확인
 # -----------------------------------------------------------
+NEXT_NUM=$(grep "^goods_num=" "$PARAM_FILE" | cut -d'=' -f2 | tr -d '[:space:]')
 
-# [핵심 변경 사항]
-# 기존 값에 count 값만큼 더하기
-NEXT_NUM=$((CURRENT_NUM + COUNT_VAL))
-
-echo "다음 파라미터 계산: $CURRENT_NUM + $COUNT_VAL = $NEXT_NUM"
-
-# 파일 내용을 새로 작성
-# 1. goods_num은 계산된 새 값으로 저장
-echo "goods_num=$NEXT_NUM" > "$PARAM_FILE"
-# 2. count는 기존 값 그대로 유지 (또는 필요시 변경 가능)
-echo "count=$COUNT_VAL" >> "$PARAM_FILE"
-
+echo "다음 파라미터: $CURRENT_NUM -> $NEXT_NUM"
 echo "파일 업데이트 완료: $PARAM_FILE"
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+계약현황 목록 엑셀 내보내기(excelSection='Y') 응답 읽기 (sell_goods --bulk)
+
+- 응답 형식은 Content-Type이 아니라 본문 앞부분(매직 바이트)으로 판별한다.
+    xlsx: PK\\x03\\x04 (zip) / xls: OLE2 복합 문서 / html: <table>로 된 "엑셀"
+- 행은 한 줄씩 꺼내므로(xlsx는 openpyxl read_only) 구간 전체를 받아도 표 전체를 DataFrame으로 만들지 않는다.
+- 머리글 이름으로 열을 찾아 HTML 페이지 수집(parse_page)과 같은 행 형식으로 바꾼다.
+    {'No', '계약구분', '계약번호', '계약명', '금액', '계약대상자', '기관명', '계약일'}
+- 내보내기를 지원하지 않는 응답(일반 목록 페이지, 알 수 없는 형식, xlrd 없는 xls)은 UnsupportedExport를 던진다.
+  호출한 쪽은 HTML 페이지 수집으로 대신한다.
+"""
+import io
+import re
+from datetime import date, datetime
+
+from bs4 import BeautifulSoup
+from openpyxl import load_workbook
+
+try:
+    import xlrd
+    HAS_XLRD = True
+except ImportError:
+    HAS_XLRD = False
+
+XLSX_MAGIC = b"PK\x03\x04"
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# 머리글을 찾을 때 확인하는 앞쪽 행 수 (제목/조회 조건 줄이 먼저 나오는 경우)
+HEADER_SEARCH_ROWS = 20
+
+# 결과 열 -> 내보내기 파일에서 쓰일 수 있는 머리글
+COLUMN_ALIASES = {
+    'No': ('No', 'NO', '번호', '순번'),
+    '계약구분': ('계약구분', '계약방법'),
+    '계약번호': ('계약번호',),
+    '계약명': ('계약명', '건명'),
+    '금액': ('금액', '계약금액'),
+    '계약대상자': ('계약대상자', '계약상대자', '업체명'),
+    '기관명': ('기관명', '수요기관', '수요기관명'),
+    '계약일': ('계약일', '계약일자'),
+}
+REQUIRED_COLUMNS = ('계약번호', '계약명')
+
+
+class UnsupportedExport(Exception):
+    """내보내기 파일이 아닌 응답 (HTML 페이지 수집으로 대신해야 함)"""
+
+
+def detect_format(content):
+    """'xlsx' / 'xls' / 'html' / None"""
+    head = content[:1024]
+    if head.startswith(XLSX_MAGIC):
+        return 'xlsx'
+    if head.startswith(XLS_MAGIC):
+        return 'xls'
+    lowered = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if lowered.startswith(b"<") and (b"<table" in content[:65536].lower() or b"<html" in lowered):
+        return 'html'
+    return None
+
+
+def _cell_text(value):
+    """셀 값을 목록 페이지와 같은 문자열로 (숫자 금액은 천 단위 쉼표, 날짜는 YYYY-MM-DD)"""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int):
+        return str(value)
+    return str(value).strip()
+
+
+def _header_map(cells):
+    """머리글 행이면 {결과 열: 위치}, 아니면 None"""
+    names = [re.sub(r"\s+", "", _cell_text(cell)) for cell in cells]
+    mapping = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                mapping[column] = index
+                break
+    return mapping if all(column in mapping for column in REQUIRED_COLUMNS) else None
+
+
+def _to_rows(row_iter):
+    """행(셀 목록) 이터레이터에서 머리글을 찾고 결과 행(dict)을 하나씩 반환"""
+    mapping = None
+    for count, cells in enumerate(row_iter):
+        if mapping is None:
+            mapping = _header_map(cells)
+            if mapping is None and count >= HEADER_SEARCH_ROWS:
+                break
+            continue
+        cells = list(cells)
+        item = {}
+        for column in COLUMN_ALIASES:
+            index = mapping.get(column)
+            item[column] = _cell_text(cells[index]) if index is not None and index < len(cells) else ""
+        if not re.sub(r"[^0-9]", "", item['계약번호']):
+            continue  # 합계 / 빈 줄
+        if item['금액'].isdigit():
+            item['금액'] = f"{int(item['금액']):,}"
+        yield item
+    if mapping is None:
+        raise UnsupportedExport("계약번호 머리글이 있는 표가 없습니다.")
+
+
+def _xlsx_rows(content):
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        for cells in workbook.worksheets[0].iter_rows(values_only=True):
+            yield cells
+    finally:
+        workbook.close()
+
+
+def _xls_rows(content):
+    if not HAS_XLRD:
+        raise UnsupportedExport("xls 형식을 읽으려면 xlrd가 필요합니다.")
+    book = xlrd.open_workbook(file_contents=content, on_demand=True)
+    sheet = book.sheet_by_index(0)
+    for index in range(sheet.nrows):
+        cells = []
+        for cell in sheet.row(index):
+            if cell.ctype == xlrd.XL_CELL_DATE:
+                cells.append(xlrd.xldate.xldate_as_datetime(cell.value, book.datemode))
+            else:
+                cells.append(cell.value)
+        yield cells
+
+
+def _html_rows(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for table in soup.find_all('table'):
+        # 한 줄 머리글에 계약번호와 기관명이 함께 있는 표만 내보내기 표로 본다. (목록 페이지는 두 줄 머리글)
+        rows = table.find_all('tr')
+        if any(_header_map([c.get_text(strip=True) for c in tr.find_all(['td', 'th'])]) is not None
+               and '기관명' in tr.get_text() for tr in rows[:HEADER_SEARCH_ROWS]):
+            for tr in rows:
+                yield [c.get_text(strip=True) for c in tr.find_all(['td', 'th'])]
+            return
+
+
+def iter_export_rows(content, decode=None):
+    """
+    내보내기 응답(bytes)의 행을 결과 행 형식으로 하나씩 반환
+    decode(content) -> str 은 HTML 형식일 때만 쓴다. (기본: utf-8, 깨진 글자는 바꿈)
+    """
+    kind = detect_format(content)
+    if kind == 'xlsx':
+        rows = _xlsx_rows(content)
+    elif kind == 'xls':
+        rows = _xls_rows(content)
+    elif kind == 'html':
+        html = decode(content) if decode else content.decode('utf-8', errors='replace')
+        rows = _html_rows(html)
+    else:
+        raise UnsupportedExport(f"알 수 없는 응답 형식입니다. (앞부분: {content[:16]!r})")
+    return _to_rows(rows)
+
+
+def group_by_date(rows, dates):
+    """
+    계약번호 앞 8자리(계약일자)로 나눠 {날짜: [행...]} (dates에 없는 날짜의 행은 버림)
+    No는 페이지 수집과 같이 날짜마다 1부터 다시 매긴다. (파일의 No는 구간 전체 기준)
+    """
+    grouped = {d: [] for d in dates}
+    for item in rows:
+        day = re.sub(r"[^0-9]", "", item['계약번호'])[:8]
+        if day in grouped:
+            item['No'] = str(len(grouped[day]) + 1)
+            grouped[day].append(item)
+    return grouped
@@ -0,0 +1,128 @@
+"""
+sell_goods 날짜별 추가 전용(append-only) 체크포인트
+
+s2b_result_<날짜>.jsonl 한 줄이 한 페이지의 수집 결과이다.
+    {"page": 3, "rows": [...], "total": 30, "ts": "..."}
+한 페이지 행 수를 지정해 수집했으면 page_size가 함께 남는다. (이어받을 때 같은 크기로 요청해야 페이지 번호가 맞는다)
+    {"page": 3, "rows": [...], "total": 300, "page_size": 100, "ts": "..."}
+날짜 수집이 끝나면 완료 표시 줄이 추가된다.
+    {"done": true, "total": 235, "ts": "..."}
+엑셀 내보내기(--bulk)로 받은 날짜는 전체 행과 완료 표시를 한 줄로 기록한다.
+    {"page": 1, "rows": [...], "total": 235, "done": true, "source": "export", "ts": "..."}
+
+- 매 페이지는 한 줄 쓰기 + flush + fsync 로 기록되어, 중간에 프로세스가 죽어도 이미 쓴 페이지는 남는다.
+- 쓰다 만 마지막 줄(개행 없음)은 처음 기록하기 직전에 잘라낸다. (쓰는 쪽만 파일을 고친다)
+- 읽기(tail / iter_pages)는 개행이 없는 마지막 줄을 건너뛸 뿐 파일을 바꾸지 않는다.
+  (수집 중인 체크포인트를 xls_sum / archive 등이 읽어도 아직 쓰는 중인 줄을 잘라내지 않도록)
+- 이어받기(resume)는 파일 끝 한 줄만 읽는다.
+- 엑셀은 날짜 수집이 끝났을 때(또는 --export 요청 시) 한 번만 만든다.
+"""
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+TAIL_READ_SIZE = 64 * 1024
+
+
+def checkpoint_path(base_dir, date_str):
+    return os.path.join(base_dir, f"s2b_result_{date_str}.jsonl")
+
+
+class PageCheckpoint:
+    def __init__(self, path):
+        self.path = path
+        self._repaired = False
+
+    def _repair(self):
+        """쓰다 만 마지막 줄을 잘라낸다."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            pos = size
+            while pos > 0:
+                step = min(TAIL_READ_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step)
+                idx = chunk.rfind(b"\n")
+                if idx >= 0:
+                    f.truncate(pos + idx + 1)
+                    return
+            f.truncate(0)
+
+    def tail(self):
+        """마지막으로 다 기록된 한 줄(dict)을 반환, 없으면 None (쓰는 중인 마지막 줄은 건너뜀)"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            buf = b""
+            pos = f.tell()
+            while pos > 0:
+                step = min(TAIL_READ_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = buf.split(b"\n")[:-1]  # 마지막 조각은 개행이 없는(쓰는 중인) 줄이거나 빈 문자열
+                while lines and not lines[-1].strip():
+                    lines.pop()
+                if len(lines) > 1 or (lines and pos == 0):
+                    return json.loads(lines[-1].decode("utf-8"))
+        return None
+
+    def _append(self, record):
+        if not self._repaired:
+            self._repair()
+            self._repaired = True
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append_page(self, page_no, rows, total, page_size=None):
+        record = {'page': page_no, 'rows': rows, 'total': total}
+        if page_size:
+            record['page_size'] = page_size
+        record['ts'] = datetime.now().isoformat(timespec='seconds')
+        self._append(record)
+
+    def mark_done(self, total):
+        self._append({'done': True, 'total': total, 'ts': datetime.now().isoformat(timespec='seconds')})
+
+    def write_date(self, rows, source='export'):
+        """[추가됨] 날짜 전체 행을 완료 표시와 함께 한 줄로 기록 (중간에 죽어도 일부만 남지 않는다)"""
+        self._append({'page': 1, 'rows': rows, 'total': len(rows), 'done': True, 'source': source,
+                      'ts': datetime.now().isoformat(timespec='seconds')})
+
+    def iter_pages(self):
+        """페이지 번호 순서로 (페이지, 행 목록)을 반환. 같은 페이지가 여러 번 있으면 마지막 기록을 쓴다."""
+        if not os.path.exists(self.path):
+            return
+        pages = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 아직 쓰는 중인 마지막 줄
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if 'page' in record:
+                    pages[record['page']] = record['rows']
+        for page_no in sorted(pages):
+            yield page_no, pages[page_no]
+
+    def export_xlsx(self, output_xlsx):
+        """체크포인트 전체를 엑셀 1개로 내보내고 행 수를 반환"""
+        rows = [row for _, page_rows in self.iter_pages() for row in page_rows]
+        pd.DataFrame(rows).to_excel(output_xlsx, index=False)
+        return len(rows)
@@ -0,0 +1,157 @@
+"""
+수집한 계약 집계 (pandas 열 단위 연산)
+
+xls_sum.py와 같은 입력(s2b_result_*.xlsx / 체크포인트 jsonl)을 읽어 contract_schema 형식으로 한 번 변환한 뒤
+기관별 / 계약대상자별 / 날짜별 / 계약구분별 합계와 금액 상위 계약을 구한다.
+
+- xls_sum.py --parquet로 만든 날짜별 parquet(combined/)가 있고 입력이 그대로면 원본 대신 그 파일을 읽는다.
+  (이미 중복 제거 + 형식 변환된 파일이라 가장 빠르다.)
+- 그 외 날짜는 xls_sum과 같은 방법으로 읽고 합친다. (계약번호 기준 중복 제거)
+- 모든 집계는 groupby / nlargest 열 연산이며 행마다 문자열을 해석하지 않는다.
+
+    python contract_analytics.py [--input-dir ./] [--combined-dir ./combined/] [--since YYYYMMDD] [--until YYYYMMDD]
+                                 [--by agency,supplier,day,type] [--top 20] [--out 집계.xlsx]
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from contract_schema import AMOUNT_COLUMN, DATE_COLUMN, KEY_COLUMN, memory_bytes, normalize
+from xls_sum import MANIFEST_NAME, group_inputs, load_manifest, merge_frames, output_paths, read_input
+
+DEFAULT_TOP = 20
+# --by 이름 -> 묶을 열
+GROUPS = {
+    'agency': '기관명',
+    'supplier': '계약대상자',
+    'day': DATE_COLUMN,
+    'type': '계약구분',
+}
+SUMMARY_COLUMNS = ('건수', '금액합계', '평균금액', '최대금액')
+
+
+def _combined_parquet(combined_dir, manifest, date, paths):
+    """xls_sum이 만든 날짜별 parquet가 지금 입력과 같은 입력으로 만들어졌으면 그 경로"""
+    if not combined_dir:
+        return None
+    parquet_path = output_paths(combined_dir, date)[1]
+    entry = manifest['dates'].get(date)
+    if not entry or not entry.get('parquet') or not os.path.exists(parquet_path):
+        return None
+    names = sorted(os.path.basename(p) for p in paths)
+    if sorted(entry['inputs']) != names:
+        return None
+    for path in paths:
+        signature = manifest['files'].get(os.path.basename(path))
+        stat = os.stat(path)
+        if not signature or signature['mtime'] != stat.st_mtime or signature['size'] != stat.st_size:
+            return None
+    return parquet_path
+
+
+def load_contracts(input_dir="./", combined_dir=None, since=None, until=None):
+    """
+    기간 [since, until] (YYYYMMDD, 양끝 포함) 계약을 contract_schema 형식 DataFrame으로 반환
+    날짜 단위로 xls_sum과 같이 합친 뒤(중복 제거) 전체를 한 번에 변환한다.
+    """
+    manifest = load_manifest(os.path.join(combined_dir, MANIFEST_NAME)) if combined_dir else {'files': {}, 'dates': {}}
+    frames = []
+    for date, paths in sorted(group_inputs(input_dir).items()):
+        if (since and date < since) or (until and date > until):
+            continue
+        parquet_path = _combined_parquet(combined_dir, manifest, date, paths)
+        if parquet_path:
+            try:
+                frames.append(pd.read_parquet(parquet_path))
+                continue
+            except ImportError:
+                pass  # pyarrow 없음: 원본 입력을 읽는다.
+        frames.append(merge_frames([read_input(p) for p in paths]))
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return normalize(pd.DataFrame())
+    # 날짜마다 category 값 목록이 달라 concat하면 문자열로 돌아가므로 합친 뒤에 한 번 더 변환한다. (변환된 열은 그대로)
+    df = pd.concat([frame.astype({c: 'string' for c in frame.select_dtypes('category').columns})
+                    for frame in frames], ignore_index=True)
+    return normalize(df)
+
+
+def totals_by(df, column):
+    """열 값별 건수 / 금액합계 / 평균금액 / 최대금액 (금액합계 큰 순, 날짜별은 날짜순)"""
+    grouped = df.groupby(column, observed=True, sort=False)[AMOUNT_COLUMN]
+    result = grouped.agg(['count', 'sum', 'mean', 'max'])
+    result.columns = list(SUMMARY_COLUMNS)
+    result['평균금액'] = result['평균금액'].round().astype('int64')
+    if column == DATE_COLUMN:
+        return result.sort_index()
+    return result.sort_values('금액합계', ascending=False, kind='stable')
+
+
+def by_agency(df):
+    return totals_by(df, GROUPS['agency'])
+
+
+def by_supplier(df):
+    return totals_by(df, GROUPS['supplier'])
+
+
+def by_day(df):
+    return totals_by(df, GROUPS['day'])
+
+
+def by_type(df):
+    return totals_by(df, GROUPS['type'])
+
+
+def top_contracts(df, n=DEFAULT_TOP):
+    """금액 상위 n건 (같은 금액이면 계약번호순)"""
+    top = df.sort_values([AMOUNT_COLUMN, KEY_COLUMN], ascending=[False, True], kind='stable').head(n)
+    return top[[KEY_COLUMN, DATE_COLUMN, '계약명', AMOUNT_COLUMN, '기관명', '계약대상자', '계약구분']] \
+        .reset_index(drop=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="수집한 계약 집계")
+    parser.add_argument("--input-dir", default="./", help="결과 파일(xlsx/jsonl)이 있는 폴더")
+    parser.add_argument("--combined-dir", default="./combined/", help="xls_sum 출력 폴더 (날짜별 parquet가 있으면 사용)")
+    parser.add_argument("--since", metavar="YYYYMMDD", help="이 날짜부터")
+    parser.add_argument("--until", metavar="YYYYMMDD", help="이 날짜까지")
+    parser.add_argument("--by", default=",".join(GROUPS), help=f"집계 기준 (쉼표로 구분: {', '.join(GROUPS)})")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="금액 상위 계약 수 (0이면 생략)")
+    parser.add_argument("--out", help="집계 결과를 시트별로 저장할 엑셀 파일")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    started = time.perf_counter()
+    df = load_contracts(args.input_dir, args.combined_dir, args.since, args.until)
+    loaded = time.perf_counter()
+    print(f" [적재] {len(df)}건 / 메모리 {memory_bytes(df) / 1024:.0f}KB ({(loaded - started) * 1000:.0f}ms)")
+    if df.empty:
+        return
+
+    sheets = {}
+    for name in [n.strip() for n in args.by.split(",") if n.strip()]:
+        if name not in GROUPS:
+            print(f" [건너뜀] 알 수 없는 집계 기준: {name}")
+            continue
+        sheets[name] = totals_by(df, GROUPS[name])
+    if args.top:
+        sheets['top'] = top_contracts(df, args.top)
+    print(f" [집계] {len(sheets)}개 ({(time.perf_counter() - loaded) * 1000:.1f}ms)")
+
+    for name, result in sheets.items():
+        print(f"\n== {name} ({len(result)}행) ==")
+        print(result.head(args.top or DEFAULT_TOP).to_string())
+    if args.out:
+        with pd.ExcelWriter(args.out) as writer:
+            for name, result in sheets.items():
+                result.to_excel(writer, sheet_name=name, index=(name != 'top'))
+        print(f"\n [저장] {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+sell_goods 계약 행 형식 (원문 문자열 -> 타입이 있는 열)
+
+수집 결과(체크포인트 jsonl / 엑셀)는 목록 페이지 원문을 그대로 문자열로 저장한다. (예: 금액 "2,450,000")
+합계나 묶음 집계를 할 때마다 행마다 문자열을 다시 해석하지 않도록, 읽을 때 한 번에 열 단위로 변환한다.
+
+    열          원문 예               변환
+    No          "12"                  int32
+    계약구분    "1인 수의"            category
+    계약번호    "202601030900101"     문자열 (번호이므로 그대로)
+    계약명      "..."                 문자열
+    금액        "2,450,000"           int64 (원, 비었거나 숫자가 없으면 0)
+                "-1,000"              -1000 (맨 앞 '-'는 음수, 감액 계약 등)
+    계약대상자  "(주)..."             category
+    기관명      "...초등학교"         category
+    계약일      "2026-01-03"          datetime64 (해석할 수 없으면 NaT)
+    계약일자    (계약번호 앞 8자리)   datetime64 (계약일이 비어도 날짜별 집계에 쓰는 열, 변환 시 추가)
+
+같은 값이 반복되는 기관명/계약대상자/계약구분은 category로 바꾸므로 메모리도 원문보다 훨씬 작다.
+normalize()는 이미 변환된 열은 그대로 두므로 여러 번 불러도 된다.
+"""
+import pandas as pd
+
+KEY_COLUMN = '계약번호'
+DATE_COLUMN = '계약일자'
+AMOUNT_COLUMN = '금액'
+
+# 열 -> 변환 후 dtype
+SCHEMA = {
+    'No': 'int32',
+    '계약구분': 'category',
+    '계약번호': 'string',
+    '계약명': 'string',
+    '금액': 'int64',
+    '계약대상자': 'category',
+    '기관명': 'category',
+    '계약일': 'datetime64[ns]',
+    '계약일자': 'datetime64[ns]',
+}
+CATEGORY_COLUMNS = ('계약구분', '계약대상자', '기관명')
+
+
+def _digits(series):
+    return series.astype('string').str.replace(r'[^0-9]', '', regex=True)
+
+
+def _signed_digits(series):
+    """숫자와 맨 앞 '-'만 남긴다. ('-1,000' -> '-1000', '1-2' -> '12')"""
+    text = series.astype('string').str.strip()
+    return text.str[:1].where(text.str[:1] == '-', '') + _digits(text)
+
+
+def to_int(series, dtype='int64'):
+    """'2,450,000' / '-1,000' 같은 문자열 열 -> 정수 열 (숫자가 없으면 0)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.fillna(0).astype(dtype)
+    return pd.to_numeric(_signed_digits(series), errors='coerce').fillna(0).astype(dtype)
+
+
+def to_date(series):
+    """'2026-01-03' / '20260103' / 계약번호 -> 날짜 열 (앞 8자리 숫자 기준, 해석할 수 없으면 NaT)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(_digits(series).str[:8], format='%Y%m%d', errors='coerce')
+
+
+def normalize(df):
+    """
+    원문 계약 행 DataFrame -> SCHEMA 형식의 새 DataFrame (열 순서는 SCHEMA 순, 없는 열은 빈 값으로 추가)
+    계약번호가 없는 행(합계 / 빈 줄)은 버린다.
+    """
+    out = pd.DataFrame(index=df.index)
+    for column, dtype in SCHEMA.items():
+        source = df[column] if column in df.columns else pd.Series(pd.NA, index=df.index, dtype='string')
+        if column == DATE_COLUMN:
+            source = df[DATE_COLUMN] if DATE_COLUMN in df.columns else out[KEY_COLUMN]
+            out[column] = to_date(source)
+        elif dtype.startswith('int'):
+            out[column] = to_int(source, dtype)
+        elif dtype.startswith('datetime'):
+            out[column] = to_date(source)
+        elif dtype == 'category':
+            out[column] = source if isinstance(source.dtype, pd.CategoricalDtype) else \
+                source.astype('string').str.strip().astype('category')
+        else:
+            out[column] = source.astype('string').str.strip()
+    out = out[out[KEY_COLUMN].fillna("").str.len() > 0]
+    return out.reset_index(drop=True)
+
+
+def memory_bytes(df):
+    """DataFrame 실제 메모리 사용량 (문자열 내용 포함)"""
+    return int(df.memory_usage(deep=True).sum())
@@ -1,11 +1,14 @@
+import argparse
+import threading
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import os
+import sys
 import urllib3
 import random
 import re
+from functools import partial
 from datetime import datetime, timedelta
 
 # SSL 경고 숨기기
@@ -16,10 +19,45 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # ==========================================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-URL = "https://www.s2b.kr/S2BNCustomer/tcmo001.do"
+# S2B_BASE_URL 환경변수로 접속 주소를 바꿀 수 있다. (예: 벤치마크용 로컬 서버 bench/stub_server.py)
+S2B_HOST = os.environ.get("S2B_BASE_URL", "https://www.s2b.kr").rstrip("/")
+LIST_PATH = "/S2BNCustomer/tcmo001.do"
+URL = f"{S2B_HOST}{LIST_PATH}"
 RENEW_INTERVAL = 2    
-LONG_PAUSE_INTERVAL = 10  
+# 파싱/기록 중에 미리 요청해 두는 다음 페이지 수 (날짜 경계에서 버려지는 요청도 최대 이만큼)
+PREFETCH_PAGES = 1
+# [추가됨] 한 페이지 행 수를 지정하는 폼 항목 이름 (--rows-param, 서버가 무시하면 기본 행 수로 응답)
+DEFAULT_ROWS_PARAM = "pageSize"
+ROWS_PARAM = DEFAULT_ROWS_PARAM
 PARAM_FILE = os.path.join(BASE_DIR, "sell_goods_param.txt")
+# 체크포인트/엑셀/로그를 저장할 폴더 (--out-dir, 파라미터 파일 위치는 바뀌지 않음)
+OUT_DIR = BASE_DIR
+# [추가됨] --replay 결과를 쓰는 OUT_DIR 하위 폴더 (실제 수집 결과와 섞이지 않도록)
+REPLAY_DIR_NAME = "replay"
+
+# 저장소 루트의 공용 모듈(common/) 사용
+sys.path.insert(0, os.path.dirname(BASE_DIR))
+from common.encoding import decode_body
+from common.http_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_AGE_DAYS, ResponseCache
+from common.pipeline import Pipeline
+from common.retry import CircuitBreaker, FailedQueue, request_with_retry
+from common.profiling import TRACER, CProfileCollector, enable_tracing, format_stage_totals, span
+from common.runlog import RunLogger, RunMetrics, append_history, format_summary
+from common.throttle import DEFAULT_CEILING, DEFAULT_FLOOR, DEFAULT_START, AdaptiveThrottle
+from checkpoint import PageCheckpoint, checkpoint_path
+from bulk_export import UnsupportedExport, group_by_date, iter_export_rows
+
+# 백필(여러 날짜 동시 수집) 기본값: 날짜 작업자 수 / 전체 초당 요청 수 (10초에 1건)
+DEFAULT_DATE_WORKERS = 3
+DEFAULT_BACKFILL_RPS = 0.1
+
+# [추가됨] 엑셀 내보내기(--bulk): 요청 1번에 담을 날짜 수(백필) / 응답 대기 시간(초)
+DEFAULT_BULK_DAYS = 1
+EXPORT_TIMEOUT = 120
+# 문자셋 판별 key (HTML 형식 내보내기는 목록 페이지와 문자셋이 다를 수 있다)
+EXPORT_KEY = LIST_PATH + "#excel"
+# 서버가 내보내기를 지원하지 않는다고 확인되면 이후 요청은 바로 HTML 페이지 수집으로 넘어간다.
+EXPORT_STATE = {'supported': None}
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -27,17 +65,18 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/120.0.0.0 Safari/537.36"
 ]
 
-log_file_handle = None
+# 실행 지표 이력 (실행마다 요약 한 줄 추가)
+METRICS_HISTORY_NAME = "sell_goods_metrics_history.jsonl"
 
-def log(msg):
-    """콘솔 및 파일 로그 기록"""
-    print(msg)
-    if log_file_handle:
-        try:
-            timestamp = datetime.now().strftime("[%H:%M:%S] ")
-            log_file_handle.write(timestamp + str(msg) + "\n")
-            log_file_handle.flush()
-        except: pass
+# [수정됨] 메시지마다 write+flush 하던 텍스트 로그 대신 구조화 로그(common/runlog.py)를 사용한다.
+run_logger = None
+
+def log(msg, **fields):
+    """콘솔 출력 + 실행 로그(JSONL) 기록 (로그 파일을 열기 전에는 콘솔에만 출력)"""
+    if run_logger is not None:
+        run_logger.info(msg, **fields)
+    else:
+        print(msg, flush=True)
 
 def update_param_file(date_str, page_no):
     """파라미터 파일(txt) 업데이트"""
@@ -61,9 +100,15 @@ def get_real_browser_headers():
         "Connection": "keep-alive"
     }
 
-def fetch_page_data(session, date_str, page_no):
-    """특정 페이지 데이터를 수집하고 날짜 검증"""
-    time.sleep(random.uniform(10.0, 20.0)) # 요청 간 대기 시간
+def fetch_page_html(session, date_str, page_no, cache=None, throttle=None, breaker=None, metrics=None,
+                    rows_per_page=None):
+    """
+    [추가됨] 특정 페이지 원본을 (bytes, Content-Type)으로 받아온다. 실패하면 None (파이프라인 조회 단계, cache: 원본 응답 캐시)
+    [추가됨] rows_per_page를 주면 ROWS_PARAM 폼 항목으로 한 페이지 행 수를 요청한다.
+    [수정됨] 고정 대기(10~20초) 대신 throttle(AdaptiveThrottle)이 서버 응답 상태에 맞춰 요청 간격을 정한다.
+    [수정됨] 일시적인 오류는 재시도(지수 백오프)하고, breaker(CircuitBreaker)가 호스트 장애 시 요청을 멈춘다.
+    metrics(RunMetrics)를 넘기면 요청별 지연/바이트/오류 종류를 기록한다.
+    """
     data = {
         'forwardName': 'list03',
         'pageNo': str(page_no),
@@ -73,163 +118,597 @@ def fetch_page_data(session, date_str, page_no):
         'search_yn': 'Y',
         'excelSection': 'N'
     }
+    if rows_per_page:
+        data[ROWS_PARAM] = str(rows_per_page)
     
     try:
         headers = get_real_browser_headers()
-        res = session.post(URL, data=data, headers=headers, verify=False, timeout=30)
-        res.encoding = 'euc-kr'
+        res = request_with_retry(session, 'POST', URL, cache=cache, breaker=breaker, throttle=throttle,
+                                 metrics=metrics, on_retry=log_retry, data=data, headers=headers, verify=False, timeout=30)
         
         if res.status_code != 200:
             log(f"    ? 서버 응답 에러 (Status: {res.status_code})")
-            return None, None
-
-        soup = BeautifulSoup(res.text, 'html.parser')
-        target_table = None
-        for t in soup.find_all('table'):
-            t_text = t.get_text()
-            if '계약명' in t_text and '계약번호' in t_text:
-                if len(t.find_all('tr')) > 2:
-                    target_table = t
-                    break
+            return None
+        return res.content, res.headers.get('Content-Type')
+
+    except Exception as e:
+        log(f"    ? 예외 발생: {e}")
+        return None
+
+def fetch_export(session, start_date, end_date, cache=None, throttle=None, breaker=None, metrics=None):
+    """
+    [추가됨] 목록 엔드포인트의 엑셀 내보내기(excelSection='Y')로 날짜 구간 전체를 한 번에 받는다.
+    반환: (bytes, Content-Type) / 실패하면 None
+    """
+    data = {
+        'forwardName': 'list03',
+        'pageNo': '1',
+        'tender_date_start': start_date,
+        'tender_date_end': end_date,
+        'process_yn': 'Y',
+        'search_yn': 'Y',
+        'excelSection': 'Y'
+    }
+
+    try:
+        headers = get_real_browser_headers()
+        res = request_with_retry(session, 'POST', URL, cache=cache, breaker=breaker, throttle=throttle,
+                                 metrics=metrics, on_retry=log_retry, data=data, headers=headers, verify=False,
+                                 timeout=EXPORT_TIMEOUT)
+
+        if res.status_code != 200:
+            log(f"    ? 내보내기 응답 에러 (Status: {res.status_code})")
+            return None
+        return res.content, res.headers.get('Content-Type')
+
+    except Exception as e:
+        log(f"    ? 예외 발생: {e}")
+        return None
+
+def parse_page_html(fetched, date_str, page_no=None):
+    """
+    [추가됨] fetch_page_html 결과를 (행 목록, 계속 여부, 페이지 정보)로 변환 (파이프라인 파싱 단계)
+    페이지 정보는 parse_page_info() 참고. 실패한 페이지는 (None, None, {})
+    """
+    if fetched is None:
+        return None, None, {}
+    try:
+        content, content_type = fetched
+        # [수정됨] euc-kr 고정 대신 헤더 / 지난번 문자셋 / <meta> 순으로 판별 (common/encoding.py)
+        with span('encoding', page=page_no):
+            html = decode_body(content, LIST_PATH, content_type)
+        # [수정됨] 단계별 프로파일링을 위해 파싱을 parse_page()로 분리
+        with span('parse', page=page_no):
+            items, is_continue = parse_page(html, date_str)
+            return items, is_continue, parse_page_info(html)
+    except Exception as e:
+        log(f"    ? 예외 발생: {e}")
+        return None, None, {}
+
+# "총 1,234건" (숫자가 <b> 등으로 감싸져 있어도 됨) / 페이지 링크 goPage(12), fnPage('12'), ...pageNo=12
+TOTAL_PATTERN = re.compile(r'총\s*(?:<[^>]*>\s*)*([\d,]+)\s*(?:<[^>]*>\s*)*건')
+PAGE_LINK_PATTERN = re.compile(r'(?:Page\w*\(\s*[\'"]?|pageNo=)(\d+)')
+
+def parse_page_info(html):
+    """[추가됨] 목록 페이지의 전체 건수와 페이지 링크 중 가장 큰 번호 {'total', 'last_page'} (없으면 None)"""
+    match = TOTAL_PATTERN.search(html)
+    pages = [int(n) for n in PAGE_LINK_PATTERN.findall(html)]
+    return {'total': int(match.group(1).replace(",", "")) if match else None,
+            'last_page': max(pages) if pages else None}
+
+def parse_page(html, date_str):
+    """
+    목록 페이지 HTML에서 계약 행을 추출
+    반환: (행 목록, 계속 여부) - 다른 날짜의 계약번호가 나오면 그 앞까지의 행과 False
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    target_table = None
+    for t in soup.find_all('table'):
+        t_text = t.get_text()
+        if '계약명' in t_text and '계약번호' in t_text:
+            if len(t.find_all('tr')) > 2:
+                target_table = t
+                break
+
+    if not target_table:
+        log("    [경고] 데이터 테이블을 찾을 수 없습니다.")
+        return [], True
+
+    page_rows = []
+    all_trs = target_table.find_all('tr')
+
+    i = 0
+    while i < len(all_trs):
+        tds = all_trs[i].find_all('td')
+        if not tds or not tds[0].get_text(strip=True).isdigit():
+            i += 1
+            continue
+
+        if i + 1 >= len(all_trs): break
+        tds2 = all_trs[i+1].find_all('td')
+
+        try:
+            raw_contract_no = tds[2].get_text(strip=True)
+            clean_no = re.sub(r'[^0-9]', '', raw_contract_no)
+
+            if not clean_no.startswith(date_str):
+                return page_rows, False 
+
+            item = {
+                'No': tds[0].get_text(strip=True),
+                '계약구분': tds[1].get_text(strip=True),
+                '계약번호': raw_contract_no,
+                '계약명': tds[3].get_text(strip=True),
+                '금액': tds[4].get_text(strip=True),
+                '계약대상자': tds[5].get_text(strip=True),
+                '기관명': tds2[1].get_text(strip=True) if len(tds2) > 1 else "",
+                '계약일': tds2[3].get_text(strip=True) if len(tds2) > 3 else ""
+            }
+            page_rows.append(item)
+        except: pass
+        i += 2
+
+    return page_rows, True
+
+def log_retry(attempt, error_class, delay):
+    log(f"    ? 일시 오류({error_class}) - {delay:.1f}초 후 재시도 ({attempt}회)",
+        error_class=error_class, attempt=attempt)
+
+def create_breaker():
+    return CircuitBreaker(on_open=lambda t: log(f" !! 연속 오류로 {t:.0f}초 동안 요청을 멈춥니다."))
+
+def next_day(date_str):
+    return (datetime.strptime(date_str, "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+
+def crawl_date(target_date, start_page, cache=None, save_param=None, throttle=None, breaker=None, metrics=None,
+               replay=False, prefix="", rows_per_page=None):
+    """
+    한 날짜를 start_page부터 날짜 경계까지 수집 (체크포인트 이어받기 포함)
+    save_param(날짜, 페이지)는 진행 위치 기록용 (백필에서는 None)
+    [추가됨] 첫 응답의 "총 N건"으로 마지막 페이지를 미리 계산해 그 페이지까지만 요청한다. (빈 페이지 확인 요청 없음)
+    rows_per_page는 한 페이지 행 수 요청값 (이어받을 때는 체크포인트에 남은 크기를 쓴다)
+    반환: True(날짜 완료) / False(중단, 다음 실행에서 이어받기)
+    """
+    def dlog(msg, **fields):
+        log(prefix + msg, date=target_date, **fields)
+
+    def save(date_str, page_no):
+        if save_param:
+            save_param(date_str, page_no)
+
+    output_xlsx = os.path.join(OUT_DIR, f"s2b_result_{target_date}.xlsx")
+    if replay and os.path.exists(checkpoint_path(OUT_DIR, target_date)):
+        # 재생 출력 폴더의 체크포인트는 지난 재생 결과: 이어받지 않고 처음부터 다시 만든다.
+        os.remove(checkpoint_path(OUT_DIR, target_date))
+    # [수정] 페이지마다 엑셀 전체를 다시 쓰지 않고 체크포인트에 한 줄씩 추가한다.
+    checkpoint = PageCheckpoint(checkpoint_path(OUT_DIR, target_date))
+
+    # 이어받기: 체크포인트 마지막 줄만 읽는다.
+    total_count = 0
+    tail = None if replay else checkpoint.tail()
+    if tail and tail.get('done'):
+        dlog(f" >> [연결] {target_date}는 이미 수집 완료({tail['total']}건). 엑셀만 다시 내보냅니다.")
+        if tail['total']:
+            checkpoint.export_xlsx(output_xlsx)
+        save(next_day(target_date), 1)
+        return True
+    if tail:
+        total_count = tail['total']
+        if tail['page'] >= start_page:
+            start_page = tail['page'] + 1
+        # 페이지 번호가 어긋나지 않도록 처음과 같은 페이지 크기로 이어받는다.
+        rows_per_page = tail.get('page_size')
+        dlog(f" >> [연결] 체크포인트 {tail['page']}페이지까지 {total_count}건 확인. {start_page}페이지부터 이어서 수집.")
+    elif start_page > 1:
+        # 체크포인트 없이 파라미터 파일의 페이지부터 시작: 그 페이지 번호는 기본 크기 기준이다.
+        rows_per_page = None
+
+    def finish_date():
+        # 날짜 수집 완료: 완료 표시 후 엑셀은 이때 한 번만 만든다.
+        checkpoint.mark_done(total_count)
+        if total_count:
+            with span('export', date=target_date):
+                exported = checkpoint.export_xlsx(output_xlsx)
+            dlog(f" [저장] {os.path.basename(output_xlsx)} ({exported}건)")
+
+    # [수정됨] 조회 -> 파싱 -> 기록 파이프라인: 다음 페이지 요청(대기 포함)이 이전 페이지의 파싱/기록과 겹친다.
+    # 조회는 한 스레드가 순서대로 하고, 기록은 페이지 순서를 지킨다.
+    # 날짜 경계나 실패를 만나면 파이프라인을 멈추고 미리 받아 둔 다음 페이지는 버린다.
+    # [추가됨] last_page: 첫 응답의 전체 건수로 계산한 마지막 페이지 (planned가 설정되면 확정)
+    state = {'session': requests.Session(), 'requests': 0, 'page': start_page, 'done': None,
+             'total': None, 'last_page': None, 'link_page': None, 'planned': threading.Event()}
+
+    def pages():
+        page_no = start_page
+        while True:
+            yield page_no
+            if page_no == start_page:
+                # 첫 페이지로 마지막 페이지를 알 때까지는 다음 페이지를 미리 요청하지 않는다.
+                while not state['planned'].wait(0.2):
+                    if pipeline.stopped:
+                        return
+            if state['last_page'] is not None and page_no >= state['last_page']:
+                return
+            page_no += 1
+
+    def plan(current_page, items, is_continue, info):
+        # 날짜 경계가 없는 첫 페이지는 꽉 찬 페이지이므로 그 행 수가 실제 페이지 크기이다.
+        state['total'] = info.get('total')
+        state['link_page'] = info.get('last_page')
+        if state['total'] is not None and items and is_continue:
+            size = len(items)
+            state['last_page'] = max(current_page, -(-state['total'] // size))
+            dlog(f" >> [계획] 총 {state['total']:,}건 / {state['last_page']}페이지 (한 페이지 {size}건)")
+        state['planned'].set()
+
+    def progress(current_page):
+        if state['total']:
+            return f", {min(100.0, total_count * 100 / state['total']):.0f}%"
+        last_page = state['last_page'] or state['link_page']
+        return f", {current_page}/{last_page}페이지" if last_page else ""
+
+    def fetch(page_no):
+        if throttle is not None:
+            dlog(f" >> [요청] {page_no}페이지... (요청 간격 {throttle.delay:.1f}초)")
+        else:
+            dlog(f" >> [요청] {page_no}페이지...")
+        # [수정됨] 대기는 throttle이 맡으므로 주기적인 긴 휴식 없이 세션만 갱신한다.
+        if not replay and state['requests'] and state['requests'] % RENEW_INTERVAL == 0:
+            state['session'] = requests.Session()
+        state['requests'] += 1
+        return fetch_page_html(state['session'], target_date, page_no, cache, throttle, breaker, metrics,
+                               rows_per_page)
+
+    def sink(current_page, parsed):
+        nonlocal total_count
+        items, is_continue, info = parsed
+        if not state['planned'].is_set():
+            plan(current_page, items, is_continue, info)
+
+        if items:
+            total_count += len(items)
+            with span('checkpoint', page=current_page, rows=len(items)):
+                checkpoint.append_page(current_page, items, total_count, rows_per_page)
+            if metrics is not None:
+                metrics.record_items(len(items))
+            dlog(f"    └ {len(items)}건 수집됨 (누적 {total_count}건{progress(current_page)})")
         
-        if not target_table:
-            log("    [경고] 데이터 테이블을 찾을 수 없습니다.")
-            return [], True
+        # 날짜 경계 도달 (+1일 갱신 및 종료)
+        if is_continue is False:
+            pipeline.stop()
+            dlog(f" !! 날짜 경계 도달. {target_date} 수집 완료.")
+            finish_date()
+            save(next_day(target_date), 1)
+            state['done'] = True
+            return
 
-        page_rows = []
-        all_trs = target_table.find_all('tr')
+        if items is None:
+            pipeline.stop()
+            save(target_date, current_page)
+            state['done'] = False
+            return
         
-        i = 0
-        while i < len(all_trs):
-            tds = all_trs[i].find_all('td')
-            if not tds or not tds[0].get_text(strip=True).isdigit():
-                i += 1
-                continue
-            
-            if i + 1 >= len(all_trs): break
-            tds2 = all_trs[i+1].find_all('td')
-            
-            try:
-                raw_contract_no = tds[2].get_text(strip=True)
-                clean_no = re.sub(r'[^0-9]', '', raw_contract_no)
-
-                if not clean_no.startswith(date_str):
-                    return page_rows, False 
-
-                item = {
-                    'No': tds[0].get_text(strip=True),
-                    '계약구분': tds[1].get_text(strip=True),
-                    '계약번호': raw_contract_no,
-                    '계약명': tds[3].get_text(strip=True),
-                    '금액': tds[4].get_text(strip=True),
-                    '계약대상자': tds[5].get_text(strip=True),
-                    '기관명': tds2[1].get_text(strip=True) if len(tds2) > 1 else "",
-                    '계약일': tds2[3].get_text(strip=True) if len(tds2) > 3 else ""
-                }
-                page_rows.append(item)
-            except: pass
-            i += 2
-            
-        return page_rows, True
+        # [수정] 데이터가 없을 때, 그냥 종료하지 않고 날짜를 +1일 해줌
+        if len(items) == 0:
+            pipeline.stop()
+            dlog(f"    ? {target_date}에 데이터가 없습니다. 다음 날짜로 넘어갑니다.")
+            finish_date()
+            save(next_day(target_date), 1)
+            state['done'] = True
+            return
+
+        # [추가됨] 계산한 마지막 페이지까지 받았으면 빈 페이지를 확인하지 않고 끝낸다.
+        if state['last_page'] is not None and current_page >= state['last_page']:
+            dlog(f" !! 마지막 페이지({current_page}) 도달. {target_date} 수집 완료.")
+            finish_date()
+            save(next_day(target_date), 1)
+            state['done'] = True
+            return
+
+        save(target_date, current_page + 1)
+        state['page'] = current_page + 1
+
+    pipeline = Pipeline(fetch, partial(parse_page_html, date_str=target_date), sink,
+                        fetch_workers=1, max_inflight=PREFETCH_PAGES + 1, ordered=True)
+    try:
+        pipeline.run(pages())
+        return bool(state['done'])
 
     except Exception as e:
-        log(f"    ? 예외 발생: {e}")
-        return None, None
+        dlog(f" [에러] {e}")
+        save(target_date, state['page'])
+        return False
+
+def crawl_bulk(dates, cache=None, throttle=None, breaker=None, metrics=None, prefix=""):
+    """
+    [추가됨] --bulk: 날짜 목록(연속)을 엑셀 내보내기 요청 1번으로 받아 날짜별 체크포인트(완료)와 엑셀을 만든다.
+    반환: 내보내기로 끝낸 날짜 set - 나머지 날짜는 호출한 쪽이 crawl_date(HTML 페이지 수집)로 수집한다.
+    체크포인트가 이미 있는 날짜(완료 / 페이지 수집 도중)는 이어받기를 위해 건드리지 않는다.
+    내보내기를 지원하지 않는 응답이면 이후 호출은 요청 없이 바로 빈 set을 반환한다.
+    """
+    if EXPORT_STATE['supported'] is False:
+        return set()
+    fresh = [d for d in dates if PageCheckpoint(checkpoint_path(OUT_DIR, d)).tail() is None]
+    if not fresh:
+        return set()
+
+    start_date, end_date = fresh[0], fresh[-1]
+    log(f"{prefix} >> [내보내기] {start_date} ~ {end_date} 엑셀 요청..."
+        + (f" (요청 간격 {throttle.delay:.1f}초)" if throttle is not None else ""))
+    fetched = fetch_export(requests.Session(), start_date, end_date, cache, throttle, breaker, metrics)
+    if fetched is None:
+        return set()
+    content, content_type = fetched
+    try:
+        with span('parse', start=start_date, end=end_date, bytes=len(content)):
+            rows = iter_export_rows(content, lambda body: decode_body(body, EXPORT_KEY, content_type))
+            grouped = group_by_date(rows, fresh)
+    except UnsupportedExport as e:
+        EXPORT_STATE['supported'] = False
+        log(f"{prefix} [내보내기] 지원하지 않는 응답입니다. ({e}) HTML 페이지 수집으로 대신합니다.")
+        return set()
+    except Exception as e:
+        log(f"{prefix} [내보내기] 파일을 읽지 못했습니다. ({e}) HTML 페이지 수집으로 대신합니다.")
+        return set()
+    EXPORT_STATE['supported'] = True
+
+    for date_str in fresh:
+        date_rows = grouped[date_str]
+        checkpoint = PageCheckpoint(checkpoint_path(OUT_DIR, date_str))
+        with span('checkpoint', date=date_str, rows=len(date_rows)):
+            checkpoint.write_date(date_rows)
+        if metrics is not None:
+            metrics.record_items(len(date_rows))
+        if date_rows:
+            output_xlsx = os.path.join(OUT_DIR, f"s2b_result_{date_str}.xlsx")
+            with span('export', date=date_str):
+                checkpoint.export_xlsx(output_xlsx)
+            log(f"{prefix} [저장] {os.path.basename(output_xlsx)} ({len(date_rows)}건, 엑셀 내보내기)", date=date_str)
+        else:
+            log(f"{prefix}    ? {date_str}에 데이터가 없습니다. (엑셀 내보내기)", date=date_str)
+    return set(fresh)
+
+def backfill(start_date, end_date, date_workers, throttle=None, cache=None, replay=False, retry_rounds=1, metrics=None,
+             profiler=None, bulk_days=0, rows_per_page=None):
+    """
+    start_date ~ end_date(포함)를 여러 날짜 작업자로 동시에 수집
+    모든 작업자가 하나의 throttle(전체 요청 간격)과 서킷 브레이커를 공유하며, 날짜별 진행은 각 체크포인트에 남는다.
+    [추가됨] bulk_days를 주면 bulk_days개 날짜씩 엑셀 내보내기 요청 1번으로 받고, 받지 못한 날짜만 페이지 수집한다.
+    중단된 날짜는 모든 날짜가 끝난 뒤 retry_rounds회까지 체크포인트에서 이어서 다시 수집한다.
+    파라미터 파일(단일 날짜 진행 위치)은 건드리지 않는다.
+    """
+    today_str = datetime.now().strftime("%Y%m%d")
+    dates = []
+    current = start_date
+    while current <= end_date and current < today_str:
+        dates.append(current)
+        current = next_day(current)
+
+    breaker = create_breaker()
+    failed_queue = FailedQueue()
+    queue_lock = threading.Lock()
+    # 작업 단위: 날짜 묶음 (내보내기를 쓰지 않으면 날짜 1개씩)
+    pending = [dates[i:i + bulk_days] for i in range(0, len(dates), bulk_days)] if bulk_days else [[d] for d in dates]
+    results = {}
+
+    def worker():
+        while True:
+            with queue_lock:
+                if not pending:
+                    return
+                chunk = pending.pop(0)
+            exported = set()
+            if bulk_days and not replay:
+                exported = crawl_bulk(chunk, cache=cache, throttle=throttle, breaker=breaker, metrics=metrics,
+                                      prefix=f"[{chunk[0]}~{chunk[-1]}]")
+            for date_str in chunk:
+                if date_str in exported:
+                    results[date_str] = True
+                    continue
+                done = crawl_date(date_str, 1, cache=cache, throttle=throttle, breaker=breaker, metrics=metrics,
+                                  replay=replay, prefix=f"[{date_str}]", rows_per_page=rows_per_page)
+                results[date_str] = done
+                if not done:
+                    failed_queue.add(date_str)
+
+    def run_workers():
+        target = profiler.wrap(worker) if profiler else worker
+        threads = [threading.Thread(target=target, daemon=True) for _ in range(max(1, min(date_workers, len(pending))))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    log(f" [백필] {len(dates)}개 날짜 / 작업자 {date_workers}개")
+    run_workers()
+    for retry_round in range(0 if replay else retry_rounds):
+        failed = sorted(date_str for date_str, _ in failed_queue.drain())
+        if not failed:
+            break
+        log(f" [백필] 중단된 날짜 {len(failed)}개 다시 수집 ({retry_round + 1}회차): {', '.join(failed)}")
+        pending.extend([date_str] for date_str in failed)
+        run_workers()
+
+    unfinished = [d for d in dates if not results.get(d)]
+    log(f" [백필] 완료 {len(dates) - len(unfinished)}개 / 미완료 {len(unfinished)}개"
+        + (f" ({', '.join(unfinished)}) - 다시 실행하면 체크포인트에서 이어받습니다." if unfinished else ""))
+    return unfinished
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="S2B 계약 현황 수집")
+    parser.add_argument("--date", help="수집 날짜 YYYYMMDD (기본: 파라미터 파일)")
+    parser.add_argument("--page", type=int, help="시작 페이지 (기본: 파라미터 파일)")
+    parser.add_argument("--cache-dir", help=f"원본 응답 캐시 폴더 (지정 시 캐시 사용, 기본 위치: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=500, help="캐시 최대 용량(MB)")
+    parser.add_argument("--cache-max-days", type=int, default=DEFAULT_MAX_AGE_DAYS, help="캐시 보관 기간(일)")
+    parser.add_argument("--replay", action="store_true", help=f"네트워크 없이 캐시된 응답만으로 재파싱 (결과는 {REPLAY_DIR_NAME}/ 폴더에, 파라미터 파일은 변경하지 않음)")
+    parser.add_argument("--export", action="store_true", help="수집 없이 해당 날짜 체크포인트를 엑셀로 내보내기")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), help="날짜 구간(YYYYMMDD, 양끝 포함)을 동시에 수집")
+    parser.add_argument("--date-workers", type=int, default=DEFAULT_DATE_WORKERS, help="[backfill] 동시에 수집할 날짜 수")
+    parser.add_argument("--rps", type=float, default=DEFAULT_BACKFILL_RPS, help="[backfill] 전체 작업자 공용 최대 초당 요청 수")
+    parser.add_argument("--retry-rounds", type=int, default=1, help="[backfill] 중단된 날짜를 마지막에 다시 수집하는 횟수")
+    parser.add_argument("--min-delay", type=float, default=DEFAULT_FLOOR, help="요청 간격 하한(초) - 서버가 빠를 때 여기까지 줄임 (기본은 예전 고정 대기 수준, 낮추면 더 빠르게 수집)")
+    parser.add_argument("--max-delay", type=float, default=DEFAULT_CEILING, help="요청 간격 상한(초) - 오류가 계속될 때 여기까지 늘림")
+    parser.add_argument("--start-delay", type=float, default=DEFAULT_START, help="시작 요청 간격(초)")
+    parser.add_argument("--rows-per-page", type=int, default=0, help="한 페이지 행 수 요청 (0이면 사이트 기본, 서버가 허용하는 만큼만 적용)")
+    parser.add_argument("--rows-param", default=DEFAULT_ROWS_PARAM, help=f"한 페이지 행 수 폼 항목 이름 (기본 {DEFAULT_ROWS_PARAM})")
+    parser.add_argument("--bulk", action="store_true", help="엑셀 내보내기로 날짜 전체를 요청 1번에 받기 (지원하지 않으면 페이지 수집)")
+    parser.add_argument("--bulk-days", type=int, default=DEFAULT_BULK_DAYS, help="[backfill + bulk] 내보내기 요청 1번에 담을 날짜 수")
+    parser.add_argument("--out-dir", help="체크포인트/엑셀/로그 저장 폴더 (기본: sell_goods 폴더)")
+    parser.add_argument("--profile", action="store_true", help="단계별 소요 시간을 Chrome trace JSON(s2b_trace_*.json)으로 저장")
+    parser.add_argument("--cprofile", action="store_true", help="실행 전체를 cProfile로 측정 (s2b_cprofile_*.prof / .txt)")
+    return parser.parse_args()
+
+def open_cache(args):
+    if args.cache_dir or args.replay:
+        return ResponseCache(args.cache_dir or DEFAULT_CACHE_DIR, max_bytes=args.cache_max_mb * 1024 * 1024,
+                             max_age_days=args.cache_max_days, offline=args.replay)
+    return None
+
+def create_throttle(args, rps=None):
+    """재생 모드는 대기 없음(None). rps가 주어지면 간격 하한을 1/rps 이상으로 둔다."""
+    if args.replay:
+        return None
+    floor = args.min_delay
+    if rps:
+        floor = max(floor, 1.0 / rps)
+    return AdaptiveThrottle(floor=floor, ceiling=args.max_delay, start=max(args.start_delay, floor))
+
+def close_cache(cache, replay):
+    if cache is not None:
+        if not replay:
+            cache.evict()
+        cache.close()
+
+def start_profiling(args):
+    """--profile이면 단계별 trace 기록을 켜고, --cprofile이면 측정기를 시작해 반환"""
+    if args.profile:
+        enable_tracing()
+    profiler = CProfileCollector() if args.cprofile else None
+    if profiler:
+        profiler.start()
+    return profiler
+
+def finish_run(metrics, name, profiler=None, **extra):
+    """
+    실행 지표 요약을 로그 마지막 이벤트와 실행 이력 파일에 남기고 로그를 닫는다.
+    name은 trace/cProfile 파일 이름에 쓰인다. (예: 20260119_1)
+    """
+    global run_logger
+    summary = metrics.summary(run="sell_goods", **extra)
+    log(f" [지표] {format_summary(summary)}")
+    append_history(os.path.join(OUT_DIR, METRICS_HISTORY_NAME), summary)
+    if TRACER.enabled:
+        trace_file = os.path.join(OUT_DIR, f"s2b_trace_{name}.json")
+        TRACER.write(trace_file)
+        log(f" [프로파일] 단계별 시간: {format_stage_totals()}")
+        log(f" [프로파일] trace 저장: {os.path.basename(trace_file)} (chrome://tracing 또는 ui.perfetto.dev에서 열기)")
+    if profiler:
+        prof_file, top_file = profiler.dump(os.path.join(OUT_DIR, f"s2b_cprofile_{name}"))
+        log(f" [프로파일] cProfile 저장: {os.path.basename(prof_file)} / 상위 함수: {os.path.basename(top_file)}")
+    if run_logger is not None:
+        run_logger.event('run_summary', **summary)
+        run_logger.close()
+        run_logger = None
 
 def main():
-    global log_file_handle
+    global run_logger, OUT_DIR, ROWS_PARAM
+    args = parse_args()
+    ROWS_PARAM = args.rows_param
+    if args.out_dir:
+        OUT_DIR = os.path.abspath(args.out_dir)
+    if args.replay:
+        # [수정됨] 재생 결과는 replay/ 하위 폴더에 쓴다. (실제 수집 체크포인트/엑셀은 건드리지 않음)
+        OUT_DIR = os.path.join(OUT_DIR, REPLAY_DIR_NAME)
+    if args.out_dir or args.replay:
+        os.makedirs(OUT_DIR, exist_ok=True)
+    metrics = RunMetrics()
+    profiler = start_profiling(args)
+
+    # [추가됨] 여러 날짜 백필
+    if args.backfill:
+        start_date, end_date = args.backfill
+        run_logger = RunLogger(os.path.join(OUT_DIR, f"s2b_backfill_{start_date}_{end_date}.jsonl"),
+                               run="sell_goods", mode="backfill", start=start_date, end=end_date)
+        print("="*60)
+        log(f" [시작] S2B 백필: {start_date} ~ {end_date}")
+        print("="*60)
+        cache = open_cache(args)
+        unfinished = backfill(start_date, end_date, args.date_workers, create_throttle(args, args.rps), cache=cache,
+                              replay=args.replay, retry_rounds=args.retry_rounds, metrics=metrics, profiler=profiler,
+                              bulk_days=max(1, args.bulk_days) if args.bulk else 0,
+                              rows_per_page=args.rows_per_page or None)
+        close_cache(cache, args.replay)
+        log(" [완료] 프로세스 종료")
+        finish_run(metrics, f"backfill_{start_date}_{end_date}", profiler,
+                   mode="backfill", start=start_date, end=end_date, unfinished=unfinished)
+        return
 
-    if not os.path.exists(PARAM_FILE):
+    if not os.path.exists(PARAM_FILE) and not (args.date and args.page):
         print(f"오류: {PARAM_FILE} 파일이 없습니다.")
         return
 
     try:
-        with open(PARAM_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-            target_date = re.search(r'search_day=(\d+)', content).group(1)
-            start_page = int(re.search(r'page=(\d+)', content).group(1))
+        if args.date and args.page:
+            target_date, start_page = args.date, args.page
+        else:
+            with open(PARAM_FILE, "r", encoding="utf-8") as f:
+                content = f.read()
+                target_date = args.date or re.search(r'search_day=(\d+)', content).group(1)
+                start_page = args.page or int(re.search(r'page=(\d+)', content).group(1))
     except Exception as e:
         print(f"파라미터 읽기 오류: {e}")
         return
-    
+
+    # [추가됨] 날짜별 체크포인트(jsonl)를 엑셀로 내보내기만 하고 종료
+    if args.export:
+        checkpoint = PageCheckpoint(checkpoint_path(OUT_DIR, target_date))
+        output_xlsx = os.path.join(OUT_DIR, f"s2b_result_{target_date}.xlsx")
+        count = checkpoint.export_xlsx(output_xlsx)
+        print(f" [내보내기] {os.path.basename(output_xlsx)} ({count}건)")
+        return
+
+    def save_param(date_str, page_no):
+        # 재생 모드에서는 실제 수집 위치(파라미터 파일)를 건드리지 않는다.
+        if not args.replay:
+            update_param_file(date_str, page_no)
+
     # [수정] 오늘 또는 오늘 이후 날짜면 실행 안 함
     today_str = datetime.now().strftime("%Y%m%d")
     if int(target_date) >= int(today_str):
         print(f" [중단] {target_date}는 오늘 또는 미래 날짜이므로 수집하지 않습니다.")
         return
 
-    output_xlsx = os.path.join(BASE_DIR, f"s2b_result_{target_date}_{start_page}.xlsx")
-    output_log = os.path.join(BASE_DIR, f"s2b_result_{target_date}_{start_page}.log")
+    cache = open_cache(args)
 
-    try:
-        log_file_handle = open(output_log, "a", encoding="utf-8")
-    except: pass
+    # [수정됨] 실행 로그는 JSONL (이벤트를 모아서 기록)
+    output_log = os.path.join(OUT_DIR, f"s2b_log_{target_date}_{start_page}.jsonl")
+    run_logger = RunLogger(output_log, run="sell_goods", date=target_date, page=start_page, replay=args.replay)
 
-    log("="*60)
+    print("="*60)
     log(f" [시작] S2B 정밀 크롤러")
     log(f" 대상 날짜: {target_date} / 시작 페이지: {start_page}")
-    log(f" 저장 파일: {os.path.basename(output_xlsx)}")
-    log("="*60)
-    
-    all_results = []
-    if os.path.exists(output_xlsx):
-        try:
-            all_results = pd.read_excel(output_xlsx).to_dict('records')
-            log(f" >> [연결] 기존 파일 데이터 {len(all_results)}건 로드 완료.")
-        except: pass
-
-    session = requests.Session()
-    current_page = start_page
-    request_count = 0
-    
-    try:
-        while True:
-            log(f" >> [요청] {current_page}페이지...")
-            items, is_continue = fetch_page_data(session, target_date, current_page)
-            
-            if items:
-                all_results.extend(items)
-                log(f"    └ {len(items)}건 수집됨 (누적 {len(all_results)}건)")
-                pd.DataFrame(all_results).to_excel(output_xlsx, index=False)
-            
-            # 날짜 경계 도달 (+1일 갱신 및 종료)
-            if is_continue is False:
-                log(f" !! 날짜 경계 도달. {target_date} 수집 완료.")
-                curr_dt = datetime.strptime(target_date, "%Y%m%d")
-                new_date = (curr_dt + timedelta(days=1)).strftime("%Y%m%d")
-                update_param_file(new_date, 1)
-                break
-
-            if items is None:
-                update_param_file(target_date, current_page)
-                break
-            
-            # [수정] 데이터가 없을 때, 그냥 종료하지 않고 날짜를 +1일 해줌
-            if len(items) == 0:
-                log(f"    ? {target_date}에 데이터가 없습니다. 다음 날짜로 넘어갑니다.")
-                curr_dt = datetime.strptime(target_date, "%Y%m%d")
-                new_date = (curr_dt + timedelta(days=1)).strftime("%Y%m%d")
-                update_param_file(new_date, 1)
-                break
+    log(f" 체크포인트: {os.path.basename(checkpoint_path(OUT_DIR, target_date))} / 엑셀(날짜 완료 시): s2b_result_{target_date}.xlsx")
+    if args.replay:
+        log(f" 재생 모드: 캐시({cache.cache_dir})만 사용 / 출력 폴더: {OUT_DIR}")
+    print("="*60)
 
-            update_param_file(target_date, current_page + 1)
-            current_page += 1
-            request_count += 1
-            
-            if request_count % LONG_PAUSE_INTERVAL == 0:
-                time.sleep(random.uniform(60, 90))
-                session = requests.Session()
-            elif request_count % RENEW_INTERVAL == 0:
-                session = requests.Session()
-                time.sleep(random.uniform(5, 8))
+    throttle = create_throttle(args)
+    breaker = create_breaker()
+    # [추가됨] 엑셀 내보내기로 날짜 전체를 한 번에 받고, 받지 못하면 페이지 수집으로 대신한다.
+    if args.bulk and not args.replay and target_date in crawl_bulk([target_date], cache=cache, throttle=throttle,
+                                                                   breaker=breaker, metrics=metrics):
+        save_param(next_day(target_date), 1)
+        done = True
+    else:
+        done = crawl_date(target_date, start_page, cache=cache, save_param=save_param, throttle=throttle,
+                          breaker=breaker, metrics=metrics, replay=args.replay, rows_per_page=args.rows_per_page or None)
 
-    except Exception as e:
-        log(f" [에러] {e}")
-        update_param_file(target_date, current_page)
+    close_cache(cache, args.replay)
 
-    log("="*60)
+    print("="*60)
     log(" [완료] 프로세스 종료")
-    if log_file_handle: log_file_handle.close()
+    finish_run(metrics, f"{target_date}_{start_page}", profiler, date=target_date, start_page=start_page, completed=done)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,48 +1,185 @@
-import pandas as pd
+"""
+페이지별로 분리된 결과 파일을 날짜별로 합친다. (증분 처리)
+
+- 입력: s2b_result_<날짜>_<시작페이지>.xlsx / s2b_result_<날짜>.xlsx / s2b_result_<날짜>.jsonl(체크포인트)
+- 입력 파일 목록과 수정 시각/크기/해시를 manifest.json에 기록해 두고, 입력이 바뀐 날짜만 다시 만든다.
+  (수정 시각과 크기가 같으면 해시를 다시 계산하지 않는다.)
+- 다시 만드는 날짜의 파일은 프로세스 풀에서 동시에 읽는다.
+- 여러 시작 페이지에서 이어받으며 생긴 중복 행은 계약번호 기준으로 제거한다.
+- --parquet를 주면 xlsx 옆에 parquet도 만든다. (pyarrow 필요)
+  parquet는 contract_schema 형식(금액 int64, 날짜 datetime, 기관명 등 category)으로 변환해 저장한다. (contract_analytics 입력)
+
+    python xls_sum.py [--input-dir ./] [--output-dir ./combined/] [--workers N] [--parquet] [--full]
+"""
+import argparse
 import glob
+import hashlib
+import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from checkpoint import PageCheckpoint
+from contract_schema import normalize
+
+KEY_COLUMN = '계약번호'
+ORDER_COLUMN = 'No'
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK = 1024 * 1024
+
+
+def file_hash(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def read_input(path):
+    """입력 파일 1개를 DataFrame으로 읽는다. (모든 값은 원문 문자열 그대로)"""
+    if path.endswith(".jsonl"):
+        rows = [row for _, page_rows in PageCheckpoint(path).iter_pages() for row in page_rows]
+        return pd.DataFrame(rows, dtype=str)
+    return pd.read_excel(path, dtype=str)
+
+
+def merge_frames(frames):
+    """날짜 하나의 입력들을 합치고 계약번호 기준 중복 제거 후 No 순서로 정렬"""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    if KEY_COLUMN in df.columns:
+        df = df.drop_duplicates(subset=KEY_COLUMN, keep='first')
+    else:
+        df = df.drop_duplicates()
+    if ORDER_COLUMN in df.columns:
+        order = pd.to_numeric(df[ORDER_COLUMN], errors='coerce')
+        df = df.iloc[order.argsort(kind='stable')]
+    return df.reset_index(drop=True)
+
+
+def group_inputs(input_dir):
+    """날짜(파일명의 8자리 숫자)별 입력 파일 목록"""
+    date_groups = {}
+    file_list = glob.glob(os.path.join(input_dir, "*.xlsx")) + glob.glob(os.path.join(input_dir, "s2b_result_*.jsonl"))
+    for file_path in sorted(file_list):
+        filename = os.path.basename(file_path)
+        if filename.startswith("~$"):
+            continue  # 엑셀이 열려 있을 때 생기는 임시 파일
+        match = re.search(r'\d{8}', filename)
+        if match:
+            date_groups.setdefault(match.group(), []).append(file_path)
+    return date_groups
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {'files': {}, 'dates': {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_signature(path, previous):
+    """(mtime, size, hash) 기록. 수정 시각/크기가 이전과 같으면 이전 해시를 그대로 쓴다."""
+    stat = os.stat(path)
+    if previous and previous['mtime'] == stat.st_mtime and previous['size'] == stat.st_size:
+        return previous
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': file_hash(path)}
+
+
+def output_paths(output_dir, date):
+    base = os.path.join(output_dir, f"s2b_result_{date}")
+    return base + ".xlsx", base + ".parquet"
+
+
+def write_outputs(df, date, output_dir, parquet):
+    xlsx_path, parquet_path = output_paths(output_dir, date)
+    df.to_excel(xlsx_path, index=False)
+    if parquet:
+        try:
+            normalize(df).to_parquet(parquet_path, index=False)
+        except ImportError:
+            print("   (parquet 저장에는 pyarrow가 필요합니다. xlsx만 저장합니다.)")
+            return False
+    return True
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="날짜별 결과 파일 합치기 (증분)")
+    parser.add_argument("--input-dir", default="./", help="결과 파일(xlsx/jsonl)이 있는 폴더")
+    parser.add_argument("--output-dir", default="./combined/", help="합쳐진 파일이 저장될 폴더")
+    parser.add_argument("--workers", type=int, default=None, help="파일을 동시에 읽을 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--parquet", action="store_true", help="xlsx와 함께 parquet 파일도 생성")
+    parser.add_argument("--full", action="store_true", help="manifest를 무시하고 모든 날짜를 다시 생성")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("페이지별로 분리된 엑셀파일을 날짜별로 합칩니다.")
+
+    # 1. 설정
+    output_path = args.output_dir
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+    manifest_path = os.path.join(output_path, MANIFEST_NAME)
+    manifest = {'files': {}, 'dates': {}} if args.full else load_manifest(manifest_path)
+
+    # 2. 대상 파일 목록을 날짜별로 그룹화하고 바뀐 날짜 찾기
+    date_groups = group_inputs(args.input_dir)
+    files = {}
+    changed_dates = []
+    for date, paths in sorted(date_groups.items()):
+        names = [os.path.basename(p) for p in paths]
+        for path, name in zip(paths, names):
+            files[name] = file_signature(path, manifest['files'].get(name))
+        previous = manifest['dates'].get(date)
+        xlsx_path, parquet_path = output_paths(output_path, date)
+        current = {name: files[name]['hash'] for name in names}
+        if (previous is None or previous['inputs'] != current or not os.path.exists(xlsx_path)
+                or (args.parquet and not previous.get('parquet'))):
+            changed_dates.append(date)
+
+    print(f"날짜 {len(date_groups)}개 중 변경 {len(changed_dates)}개")
+    if not changed_dates:
+        manifest['files'] = files
+        save_manifest(manifest_path, manifest)
+        print("모든 날짜별 통합 작업이 완료되었습니다.")
+        return
+
+    # 3. 바뀐 날짜의 입력 파일을 프로세스 풀에서 동시에 읽기
+    to_read = [path for date in changed_dates for path in date_groups[date]]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        frames = dict(zip(to_read, pool.map(read_input, to_read)))
+
+    # 4. 날짜별로 합치기 실행 (계약번호 중복 제거)
+    for date in changed_dates:
+        paths = date_groups[date]
+        raw_count = sum(len(frames[p]) for p in paths)
+        final_df = merge_frames([frames[p] for p in paths])
+        wrote_parquet = write_outputs(final_df, date, output_path, args.parquet)
+        manifest['dates'][date] = {
+            'inputs': {os.path.basename(p): files[os.path.basename(p)]['hash'] for p in paths},
+            'rows': len(final_df),
+            'parquet': bool(args.parquet and wrote_parquet),
+        }
+        print(f"{date}: 파일 {len(paths)}개 / {raw_count}행 -> 중복 제거 후 {len(final_df)}행 (s2b_result_{date}.xlsx)")
+
+    manifest['files'] = files
+    save_manifest(manifest_path, manifest)
+    print("모든 날짜별 통합 작업이 완료되었습니다.")
 
 
-print("페이지별로 분리된 엑셀파일을 날짜별로 합칩니다.")
-
-# 1. 설정
-input_path = './'  # 엑셀 파일들이 있는 폴더 경로
-output_path = './combined/'  # 합쳐진 파일이 저장될 폴더
-if not os.path.exists(output_path):
-    os.makedirs(output_path)
-
-# 2. 대상 파일 목록 가져오기 (xlsx 기준)
-file_list = glob.glob(os.path.join(input_path, "*.xlsx"))
-
-# 3. 날짜별로 파일 그룹화
-date_groups = {}
-for file_path in file_list:
-    filename = os.path.basename(file_path)
-    
-    # 파일명에서 8자리 숫자(날짜) 추출 (예: 20251101)
-    match = re.search(r'\d{8}', filename)
-    if match:
-        date = match.group()
-        if date not in date_groups:
-            date_groups[date] = []
-        date_groups[date].append(file_path)
-
-# 4. 그룹별로 합치기 실행
-for date, files in date_groups.items():
-    print(f"{date} 날짜 파일 합치는 중: {len(files)}개")
-    
-    combined_data = []
-    for file in files:
-        df = pd.read_excel(file)
-        combined_data.append(df)
-    
-    # 데이터 통합
-    final_df = pd.concat(combined_data, ignore_index=True)
-    
-    # 결과 저장 (예: s2b_result_20251101.xlsx)
-    output_filename = f"s2b_result_{date}.xlsx"
-    final_df.to_excel(os.path.join(output_path, output_filename), index=False)
-    print(f"-> 생성 완료: {output_filename}")
-
-print("모든 날짜별 통합 작업이 완료되었습니다.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()